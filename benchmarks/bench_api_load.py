@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+API压测
+对接近生产规模的数据库（由 seed_load_data.py 生成，也可使用线上数据库副本）启动API服务，
+Bangumi上游由本地桩服务代替，按加权场景并发请求：
+- resources       GET /api/v1/animes/{id}/resources
+- availability    GET /api/v1/animes/{id}/episodes/availability
+- search          GET /api/v1/animes/search
+- subscriptions   GET /api/v1/subscriptions
+- subscribe       POST + DELETE /api/v1/subscriptions/{id}（经由Bangumi上游获取番剧信息）
+番剧按热度的幂律分布选取，输出各接口的 p50/p95/p99 延迟、吞吐量与错误数，结果可保存为JSON并与之前的结果对比
+
+用法:
+    python benchmarks/seed_load_data.py data/load/ikuyo.db
+    python benchmarks/bench_api_load.py data/load/ikuyo.db --concurrency 32 --duration 60 --output load.json
+    python benchmarks/bench_api_load.py data/load/ikuyo.db --no-response-cache --compare load.json
+    python benchmarks/bench_api_load.py data/load/ikuyo.db --url http://127.0.0.1:8000   # 压测已启动的服务
+"""
+
+import argparse
+import asyncio
+import http.server
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import seed_load_data  # noqa: E402
+from bench_crawl import git_revision  # noqa: E402
+
+DEFAULT_MIX = "resources=40,availability=25,search=15,subscriptions=15,subscribe=5"
+API_PREFIX = "/api/v1"
+
+
+class StubBangumiServer:
+    """Bangumi API桩服务：按ID确定性地生成番剧详情、章节与每日放送，可附加固定延迟模拟上游"""
+
+    def __init__(self, calendar_ids: List[int], latency: float = 0.0):
+        self.calendar_ids = calendar_ids
+        self.latency = latency
+        self.requests = 0
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @staticmethod
+    def subject(subject_id: int) -> dict:
+        weekday = subject_id % 7 + 1
+        return {
+            "id": subject_id,
+            "name": f"Load Test Anime {subject_id}",
+            "name_cn": f"压测番剧{subject_id}",
+            "air_date": f"20{10 + subject_id % 15}-{subject_id % 12 + 1:02d}-01",
+            "air_weekday": weekday,
+            "eps": 12 + subject_id % 13,
+            "rating": {"score": round(5 + (subject_id % 45) / 10, 1), "total": subject_id % 5000},
+            "images": {"large": f"https://lain.bgm.tv/pic/cover/l/{subject_id}.jpg"},
+            "summary": "压测用番剧简介。" * 10,
+        }
+
+    @staticmethod
+    def episodes(subject_id: int, limit: int, offset: int) -> dict:
+        total = 12 + subject_id % 13
+        data = [
+            {
+                "id": subject_id * 1000 + ep,
+                "subject_id": subject_id,
+                "type": 0,
+                "ep": ep,
+                "sort": ep,
+                "name": f"Episode {ep}",
+                "name_cn": f"第{ep}话",
+                "airdate": "",
+            }
+            for ep in range(offset + 1, min(total, offset + limit) + 1)
+        ]
+        return {"data": data, "total": total, "limit": limit, "offset": offset}
+
+    def calendar(self) -> list:
+        return [
+            {
+                "weekday": {"id": day + 1},
+                "items": [self.subject(i) for i in self.calendar_ids[day::7]],
+            }
+            for day in range(7)
+        ]
+
+    def _handler(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                url = urlsplit(self.path)
+                query = parse_qs(url.query)
+                body = None
+                if url.path == "/calendar":
+                    body = server.calendar()
+                elif url.path.startswith("/v0/subjects/"):
+                    body = server.subject(int(url.path.rsplit("/", 1)[1]))
+                elif url.path == "/v0/episodes" and "subject_id" in query:
+                    body = server.episodes(
+                        int(query["subject_id"][0]),
+                        int(query.get("limit", ["100"])[0]),
+                        int(query.get("offset", ["0"])[0]),
+                    )
+                payload = json.dumps(body if body is not None else {"title": "Not Found"}).encode("utf-8")
+                self.send_response(200 if body is not None else 404)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class Targets:
+    """从数据库读取压测目标：番剧（按热度排序）、用户和搜索词"""
+
+    def __init__(self, db_path: str, seed: int):
+        rng = random.Random(seed)
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        self.bangumi_ids = [row[0] for row in conn.execute(
+            "SELECT bangumi_id FROM anime WHERE bangumi_id IS NOT NULL ORDER BY mikan_id"
+        )]
+        self.user_ids = [row[0] for row in conn.execute("SELECT DISTINCT user_id FROM user_subscriptions")]
+        titles = [row[0] for row in conn.execute("SELECT title FROM anime")]
+        conn.close()
+        if not self.bangumi_ids:
+            raise RuntimeError(f"数据库中没有番剧: {db_path}")
+
+        # 热度：打乱后按排名的幂律分布取样
+        rng.shuffle(self.bangumi_ids)
+        self.weights = [1.0 / (rank + 1) ** 0.8 for rank in range(len(self.bangumi_ids))]
+        self._cum_weights = list(_accumulate(self.weights))
+        self.search_terms = sorted({title[:2] for title in titles if title} | {title[:4] for title in titles[:200]})
+
+    def hot_bangumi_id(self, rng: random.Random) -> int:
+        return rng.choices(self.bangumi_ids, cum_weights=self._cum_weights)[0]
+
+
+def _accumulate(values):
+    total = 0.0
+    for value in values:
+        total += value
+        yield total
+
+
+async def scenario_resources(client, rng, targets):
+    bangumi_id = targets.hot_bangumi_id(rng)
+    params = {}
+    if rng.random() < 0.5:
+        params["episode"] = rng.randint(1, 12)
+    return [("resources", await client.get(f"{API_PREFIX}/animes/{bangumi_id}/resources", params=params))]
+
+
+async def scenario_availability(client, rng, targets):
+    bangumi_id = targets.hot_bangumi_id(rng)
+    return [("availability", await client.get(f"{API_PREFIX}/animes/{bangumi_id}/episodes/availability"))]
+
+
+async def scenario_search(client, rng, targets):
+    params = {"q": rng.choice(targets.search_terms), "page": rng.choice([1, 1, 1, 2])}
+    return [("search", await client.get(f"{API_PREFIX}/animes/search", params=params))]
+
+
+async def scenario_subscriptions(client, rng, targets):
+    if not targets.user_ids:
+        return []
+    headers = {"X-User-Id": rng.choice(targets.user_ids)}
+    params = {"sort": rng.choice(["subscribed_at", "rating", "air_date", "name"]), "page": 1, "limit": 20}
+    return [("subscriptions", await client.get(f"{API_PREFIX}/subscriptions", params=params, headers=headers))]
+
+
+async def scenario_subscribe(client, rng, targets):
+    # 压测专用用户，订阅后立即取消，不改变数据集
+    headers = {"X-User-Id": f"load-test-{rng.getrandbits(48):012x}"}
+    bangumi_id = targets.hot_bangumi_id(rng)
+    url = f"{API_PREFIX}/subscriptions/{bangumi_id}"
+    created = await client.post(url, headers=headers)
+    return [("subscribe", created), ("unsubscribe", await client.delete(url, headers=headers))]
+
+
+SCENARIOS = {
+    "resources": scenario_resources,
+    "availability": scenario_availability,
+    "search": scenario_search,
+    "subscriptions": scenario_subscriptions,
+    "subscribe": scenario_subscribe,
+}
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"未知场景: {name}（可选 {', '.join(SCENARIOS)}）")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def drive(base_url: str, targets: Targets, args) -> dict:
+    """闭环压测：concurrency个虚拟用户循环发送请求，预热阶段的结果不计入"""
+    import httpx
+
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    measure_start = time.perf_counter() + args.warmup
+    deadline = measure_start + args.duration
+
+    async def user(index: int, client: "httpx.AsyncClient"):
+        rng = random.Random(args.seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            scenario = SCENARIOS[rng.choices(names, weights)[0]]
+            start = time.perf_counter()
+            try:
+                responses = await scenario(client, rng, targets)
+            except httpx.HTTPError as e:
+                if start >= measure_start:
+                    errors[type(e).__name__] += 1
+                continue
+            if start < measure_start:
+                continue
+            # 同一场景内的多个请求顺序发送，各自的耗时由响应的elapsed给出
+            for endpoint, response in responses:
+                latencies[endpoint].append(response.elapsed.total_seconds())
+                statuses[endpoint][str(response.status_code)] += 1
+                if response.status_code >= 500 or (
+                    response.status_code >= 400 and endpoint in ("subscribe", "unsubscribe")
+                ):
+                    errors[endpoint] += 1
+            if args.think_time:
+                await asyncio.sleep(rng.expovariate(1 / args.think_time))
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        await asyncio.gather(*(user(i, client) for i in range(args.concurrency)))
+
+    endpoints = {
+        endpoint: summarize_latencies(values, args.duration, statuses[endpoint], errors.get(endpoint, 0))
+        for endpoint, values in sorted(latencies.items())
+    }
+    all_values = [value for values in latencies.values() for value in values]
+    overall = summarize_latencies(all_values, args.duration, {}, sum(errors.values()))
+    overall.pop("statuses")
+    return {"endpoints": endpoints, "overall": overall, "transport_errors": {
+        name: count for name, count in errors.items() if name not in latencies
+    }}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """最近秩百分位"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize_latencies(values: List[float], duration: float, statuses: dict, errors: int) -> dict:
+    ordered = sorted(values)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / duration, 2),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2) if ordered else 0.0,
+        "statuses": dict(statuses),
+    }
+
+
+def prepare_workdir(db_path: str, upstream_url: str, response_cache: bool) -> str:
+    """创建临时工作目录：数据库链接到压测库，Bangumi上游指向桩服务，关闭缓存预热与预刷新"""
+    import yaml
+
+    workdir = tempfile.mkdtemp(prefix="ikuyo-load-bench-")
+    os.makedirs(os.path.join(workdir, "data", "database"))
+    os.symlink(os.path.abspath(db_path), os.path.join(workdir, "data", "database", "ikuyo.db"))
+    with open(os.path.join(PROJECT_ROOT, "config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config.setdefault("bangumi", {})["base_url"] = upstream_url
+    config["bangumi"]["http2"] = False
+    cache_config = config.setdefault("cache", {})
+    cache_config.setdefault("warmup", {})["enabled"] = False
+    cache_config.setdefault("refresh_ahead", {})["enabled"] = False
+    config.setdefault("response_cache", {})["enabled"] = response_cache
+    with open(os.path.join(workdir, "config.yaml"), "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+    return workdir
+
+
+def start_server(workdir: str, workers: int) -> tuple:
+    """在工作目录中启动uvicorn，等待健康检查通过，返回 (进程, 地址)"""
+    import socket
+
+    import httpx
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+    log = open(os.path.join(workdir, "server.log"), "w")
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "ikuyo.api.app:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=workdir,
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            if httpx.get(f"{base_url}{API_PREFIX}/health", timeout=2).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    stop_server(process)
+    with open(os.path.join(workdir, "server.log"), "r") as f:
+        raise RuntimeError(f"API服务启动失败:\n{f.read()[-4000:]}")
+
+
+def stop_server(process) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def print_report(report: dict, baseline: dict = None) -> None:
+    base = baseline["endpoints"] if baseline else {}
+
+    def delta(current, previous):
+        if not previous:
+            return ""
+        return f" ({(current - previous) / previous * 100:+.1f}%)"
+
+    dataset = report["dataset"]
+    print(
+        f"版本: {report['revision']}, 数据: {dataset.get('anime', '?')} 番剧 / {dataset.get('resources', '?')} 资源 / "
+        f"{dataset.get('subscriptions', '?')} 订阅, 并发: {report['concurrency']}, 时长: {report['duration']}s, "
+        f"响应缓存: {'开启' if report['response_cache'] else '关闭'}"
+    )
+    settings = ("dataset", "mix", "concurrency", "workers", "response_cache")
+    if baseline and any(baseline.get(key) != report[key] for key in settings):
+        print("注意: 数据集、场景比例或压测参数与对比结果不同，数据不可直接比较")
+    print(f"{'接口':<16}{'请求数':>8}{'错误':>6}{'rps':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for endpoint, result in rows:
+        previous = base.get(endpoint) or (baseline.get("overall") if baseline and endpoint == "overall" else {})
+        print(
+            f"{endpoint:<16}{result['requests']:>8}{result['errors']:>6}{result['rps']:>10}"
+            f"{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+            f"{delta(result['p95_ms'], previous.get('p95_ms'))}"
+        )
+    if report.get("transport_errors"):
+        print(f"连接错误: {report['transport_errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API压测")
+    parser.add_argument("db", help="压测数据库（seed_load_data.py 生成或线上数据库副本）")
+    parser.add_argument("--url", help="压测已启动的服务，不启动本地服务与Bangumi桩")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn工作进程数")
+    parser.add_argument("--concurrency", type=int, default=32, help="并发虚拟用户数")
+    parser.add_argument("--duration", type=float, default=30, help="计入统计的压测时长（秒）")
+    parser.add_argument("--warmup", type=float, default=5, help="预热时长（秒），不计入统计")
+    parser.add_argument("--think-time", type=float, default=0.0, help="虚拟用户平均请求间隔（秒）")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"场景权重，默认 {DEFAULT_MIX}")
+    parser.add_argument("--no-response-cache", action="store_true", help="关闭HTTP响应缓存，直接压测数据库查询")
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="Bangumi桩的响应延迟（秒）")
+    parser.add_argument("--timeout", type=float, default=30, help="单个请求超时（秒）")
+    parser.add_argument("--seed", type=int, default=1, help="请求序列随机种子")
+    parser.add_argument("--output", help="将结果写入JSON文件")
+    parser.add_argument("--compare", help="与之前保存的JSON结果对比")
+    args = parser.parse_args()
+
+    targets = Targets(args.db, args.seed)
+    response_cache = not args.no_response_cache
+
+    if args.url:
+        result = asyncio.run(drive(args.url.rstrip("/"), targets, args))
+        upstream_requests = None
+    else:
+        with StubBangumiServer(targets.bangumi_ids[:140], args.upstream_latency) as upstream:
+            workdir = prepare_workdir(args.db, upstream.base_url, response_cache)
+            try:
+                process, base_url = start_server(workdir, args.workers)
+                try:
+                    result = asyncio.run(drive(base_url, targets, args))
+                finally:
+                    stop_server(process)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            upstream_requests = upstream.requests
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "dataset": seed_load_data.load_info(args.db) or {"path": os.path.abspath(args.db)},
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "workers": None if args.url else args.workers,
+        "response_cache": response_cache if not args.url else None,
+        "mix": args.mix,
+        "upstream_requests": upstream_requests,
+        **result,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
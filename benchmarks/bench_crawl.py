@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+离线爬取基准
+在本地HTTP服务上回放Mikan页面夹具（首页、BangumiCoverFlowByDayOfWeek季度接口、番剧详情页），
+驱动 MikanSpider 及完整的 ITEM_PIPELINES 写入临时SQLite数据库，
+输出 pages/sec、items/sec、峰值RSS和各阶段耗时，结果可保存为JSON并与之前的结果对比
+
+用法:
+    python benchmarks/bench_crawl.py --rounds 3 --output crawl.json
+    python benchmarks/bench_crawl.py --fixtures path/to/recorded --compare crawl.json
+    python benchmarks/bench_crawl.py --replay   # 先录制一轮到响应存储，关闭本地服务后回放
+
+每轮爬取在独立子进程中运行（Twisted reactor不可重启，且便于统计峰值RSS）
+"""
+
+import argparse
+import http.server
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mikan_fixtures  # noqa: E402
+
+SEASON_YEAR = 2024
+SEASON_NAME = "夏"
+
+
+class FixtureServer:
+    """在后台线程中提供夹具页面的本地HTTP服务，页面中的站点绝对链接改写为本地地址"""
+
+    def __init__(self, fixtures_dir: str):
+        self.fixtures_dir = fixtures_dir
+        self.pages = {}
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._load()
+
+    def _load(self):
+        def read(*parts):
+            with open(os.path.join(self.fixtures_dir, *parts), "r", encoding="utf-8") as f:
+                return f.read().replace(mikan_fixtures.SOURCE_BASE_URL, self.base_url).encode("utf-8")
+
+        self.pages["/Home"] = read(mikan_fixtures.HOME_FILE)
+        self.pages["/Home/BangumiCoverFlowByDayOfWeek"] = read(mikan_fixtures.SEASON_FILE)
+        for name in os.listdir(os.path.join(self.fixtures_dir, mikan_fixtures.DETAIL_DIR)):
+            if name.endswith(".html"):
+                self.pages[f"/Home/Bangumi/{name[:-5]}"] = read(mikan_fixtures.DETAIL_DIR, name)
+
+    def _handler(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                body = server.pages.get(self.path.split("?", 1)[0])
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def prepare_workdir(base_url: str, store_path: str = None) -> str:
+    """
+    创建临时工作目录：配置指向本地服务，关闭共享指标推送
+    未指定 store_path 时关闭响应存储，每轮都从本地服务下载
+    """
+    import yaml
+
+    workdir = tempfile.mkdtemp(prefix="ikuyo-crawl-bench-")
+    os.makedirs(os.path.join(workdir, "data", "database"), exist_ok=True)
+    with open(os.path.join(PROJECT_ROOT, "config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config["site"] = {
+        "base_url": base_url,
+        "allowed_domains": ["127.0.0.1"],
+        "start_urls": [f"{base_url}/Home"],
+    }
+    config["mikan"] = {"base_url": base_url}
+    config.setdefault("metrics", {})["enabled"] = False
+    config.setdefault("crawler", {})["response_store"] = {
+        "enabled": store_path is not None,
+        "path": store_path or "",
+        "retention_days": 0,
+    }
+    with open(os.path.join(workdir, "config.yaml"), "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+    return workdir
+
+
+def run_child(args) -> None:
+    """子进程：在当前目录（临时工作目录）执行一次完整爬取，结果以JSON写到stdout"""
+    import logging
+    import resource
+
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+
+    import ikuyo.core.models  # noqa: F401  注册数据表
+    from ikuyo.core.config import load_config
+    from ikuyo.core.database import create_db_and_tables
+    from ikuyo.crawler.spiders.mikan import MikanSpider
+
+    create_db_and_tables()
+
+    settings = get_project_settings()
+    settings.set("LOG_LEVEL", "WARNING")
+    if not args.throttle:
+        # 基准测量的是爬虫自身的处理能力，关闭礼貌性延迟
+        settings.set("DOWNLOAD_DELAY", 0)
+        settings.set("AUTOTHROTTLE_ENABLED", False)
+        middlewares = settings.getdict("DOWNLOADER_MIDDLEWARES")
+        middlewares["ikuyo.crawler.middlewares.AdaptiveRateLimitMiddleware"] = None
+        settings.set("DOWNLOADER_MIDDLEWARES", middlewares)
+    if args.replay:
+        settings.set("RESPONSE_STORE_REPLAY", True)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    spider_kwargs = {"config": load_config(), "mode": args.mode, "task_id": None}
+    if args.mode == "season":
+        spider_kwargs.update(year=SEASON_YEAR, season=SEASON_NAME)
+
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(MikanSpider)
+    process.crawl(crawler, **spider_kwargs)
+    start = time.perf_counter()
+    process.start()
+    elapsed = time.perf_counter() - start
+
+    stats = crawler.stats.get_stats()
+    pages = stats.get("response_received_count", 0)
+    items = stats.get("item_scraped_count", 0)
+    # Linux下ru_maxrss单位为KB，macOS为字节
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+    print(json.dumps({
+        "elapsed_seconds": round(elapsed, 3),
+        "pages": pages,
+        "items": items,
+        "dropped": stats.get("item_dropped_count", 0),
+        "pages_per_sec": round(pages / elapsed, 2) if elapsed else 0,
+        "items_per_sec": round(items / elapsed, 2) if elapsed else 0,
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "stages": crawler.spider.stage_timer.summary(),
+    }))
+
+
+def run_round(base_url: str, args, store_path: str = None, replay: bool = False) -> dict:
+    """启动子进程执行一轮爬取，每轮使用全新的数据库"""
+    workdir = prepare_workdir(base_url, store_path)
+    try:
+        env = dict(os.environ, SCRAPY_SETTINGS_MODULE="ikuyo.crawler.settings")
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+        command = [sys.executable, os.path.abspath(__file__), "--child", "--mode", args.mode]
+        if args.throttle:
+            command.append("--throttle")
+        if replay:
+            command.append("--replay")
+        result = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"爬取子进程失败:\n{result.stderr[-4000:]}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def summarize(rounds: list) -> dict:
+    """各轮结果取中位数"""
+    summary = {
+        key: round(statistics.median(r[key] for r in rounds), 3)
+        for key in ("elapsed_seconds", "pages_per_sec", "items_per_sec", "peak_rss_mb")
+    }
+    summary["pages"] = rounds[0]["pages"]
+    summary["items"] = rounds[0]["items"]
+    stages = sorted({stage for r in rounds for stage in r["stages"]})
+    summary["stage_seconds"] = {
+        stage: round(
+            statistics.median(r["stages"].get(stage, {}).get("total_seconds", 0.0) for r in rounds), 4
+        )
+        for stage in stages
+    }
+    return summary
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def print_report(report: dict, baseline: dict = None) -> None:
+    summary = report["summary"]
+    base = baseline["summary"] if baseline else {}
+
+    def delta(current, previous):
+        if not previous:
+            return ""
+        change = (current - previous) / previous * 100
+        return f" ({change:+.1f}% vs {baseline.get('revision', '?')})"
+
+    print(
+        f"版本: {report['revision']}, 夹具: {report['fixtures'].get('source')}, "
+        f"模式: {report['mode']}{'（回放）' if report.get('replay') else ''}, 轮数: {len(report['rounds'])}"
+    )
+    if baseline and (
+        baseline.get("fixtures") != report["fixtures"] or baseline.get("mode") != report["mode"]
+    ):
+        print("注意: 夹具或爬取模式与对比结果不同，数据不可直接比较")
+    print(f"页面: {summary['pages']}, 数据项: {summary['items']}, 耗时: {summary['elapsed_seconds']}s")
+    for key, label in (
+        ("pages_per_sec", "pages/sec"),
+        ("items_per_sec", "items/sec"),
+        ("peak_rss_mb", "peak RSS (MB)"),
+    ):
+        print(f"{label:<16}{summary[key]:>12}{delta(summary[key], base.get(key))}")
+    print("阶段耗时 (s):")
+    base_stages = base.get("stage_seconds", {})
+    for stage, seconds in sorted(summary["stage_seconds"].items(), key=lambda item: -item[1]):
+        print(f"  {stage:<40}{seconds:>10}{delta(seconds, base_stages.get(stage))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线爬取基准")
+    parser.add_argument("--fixtures", help="夹具目录（录制或生成），默认临时生成合成夹具")
+    parser.add_argument("--anime", type=int, default=40, help="合成夹具的番剧数")
+    parser.add_argument("--groups", type=int, default=6, help="合成夹具每部番剧的字幕组数")
+    parser.add_argument("--resources", type=int, default=24, help="合成夹具每个字幕组的资源数")
+    parser.add_argument("--mode", choices=["homepage", "season"], default="season", help="爬取模式")
+    parser.add_argument("--rounds", type=int, default=3, help="爬取轮数")
+    parser.add_argument("--throttle", action="store_true", help="保留配置中的下载延迟、AutoThrottle与自适应限速")
+    parser.add_argument(
+        "--replay", action="store_true", help="先录制一轮到响应存储，关闭本地服务后各轮只从存储回放"
+    )
+    parser.add_argument("--output", help="将结果写入JSON文件")
+    parser.add_argument("--compare", help="与之前保存的JSON结果对比")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    generated_dir = None
+    fixtures_dir = args.fixtures
+    if not fixtures_dir:
+        generated_dir = fixtures_dir = tempfile.mkdtemp(prefix="ikuyo-mikan-fixtures-")
+        mikan_fixtures.generate(fixtures_dir, args.anime, args.groups, args.resources)
+
+    store_dir = tempfile.mkdtemp(prefix="ikuyo-response-store-") if args.replay else None
+    store_path = os.path.join(store_dir, "responses.db") if store_dir else None
+    try:
+        rounds = []
+        with FixtureServer(fixtures_dir) as server:
+            base_url = server.base_url
+            if args.replay:
+                recorded = run_round(base_url, args, store_path)
+                print(f"录制: {recorded['pages']} 页面, {recorded['items']} 数据项", file=sys.stderr)
+            else:
+                for _ in range(args.rounds):
+                    rounds.append(run_round(base_url, args))
+        if args.replay:
+            # 本地服务已关闭，回放轮次不可能访问网络
+            for _ in range(args.rounds):
+                result = run_round(base_url, args, store_path, replay=True)
+                # 只保存200响应（如404的robots.txt不保存），页面数可能少于录制轮次，数据项应一致
+                if result["items"] != recorded["items"]:
+                    raise RuntimeError(
+                        f"回放的数据项数与录制不一致: {result['items']} vs {recorded['items']}"
+                    )
+                rounds.append(result)
+        for index, result in enumerate(rounds):
+            print(
+                f"第{index + 1}轮: {result['elapsed_seconds']}s, "
+                f"{result['pages_per_sec']} pages/sec, {result['items_per_sec']} items/sec",
+                file=sys.stderr,
+            )
+
+        report = {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "mode": args.mode,
+            "throttle": args.throttle,
+            "replay": args.replay,
+            "fixtures": mikan_fixtures.load_info(fixtures_dir),
+            "rounds": rounds,
+            "summary": summarize(rounds),
+        }
+
+        baseline = None
+        if args.compare:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        print_report(report, baseline)
+
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+    finally:
+        if generated_dir:
+            shutil.rmtree(generated_dir, ignore_errors=True)
+        if store_dir:
+            shutil.rmtree(store_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+详情页解析基准
+在录制或合成的番剧详情页上对比两种解析方式的CPU耗时，并校验两者输出一致：
+- legacy：逐字段的全文档CSS/XPath查询与逐行Selector取值（原 MikanSpider 实现，保留在本文件中作为基线）
+- current：MikanSpider 当前的详情页解析（parse_anime_detail 使用的字段与资源提取）
+HTML解析（构建lxml树）的耗时单独统计，两种方式共用同一棵树
+current 不进入资源表格的子树：详情字段只出现在资源表格中时两者有意不一致，
+这类情形不计入 mismatches，由 table_cases 单独校验（legacy 取到表格内容，current 忽略）
+
+用法:
+    python benchmarks/bench_detail_parse.py
+    python benchmarks/bench_detail_parse.py --fixtures path/to/recorded --repeat 20 --output detail.json
+    python benchmarks/bench_detail_parse.py --resources 400 --compare detail.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mikan_fixtures  # noqa: E402
+from bench_crawl import git_revision  # noqa: E402
+
+
+# ---- 基线：原逐字段查询实现 ----
+
+def legacy_fields(response) -> dict:
+    title = response.css("title::text").get()
+    if title and title.startswith("Mikan Project - "):
+        title = title.replace("Mikan Project - ", "")
+
+    broadcast_day = None
+    for text in response.css("*::text").getall():
+        if text and "放送日期：" in text:
+            broadcast_day = text.replace("放送日期：", "").strip()
+            break
+
+    broadcast_start = None
+    for text in response.css("*::text").getall():
+        if text and "放送开始：" in text:
+            time_part = text.replace("放送开始：", "").strip()
+            if time_part:
+                broadcast_start = time_part
+                break
+
+    return {
+        "title": title,
+        "bangumi_url": response.css('a[href*="bgm.tv/subject/"]::attr(href)').get(),
+        "broadcast_day": broadcast_day,
+        "broadcast_start": broadcast_start,
+        "official_website": _legacy_official_website(response),
+        "description": _legacy_description(response),
+    }
+
+
+def _legacy_official_website(response):
+    official_links = response.xpath(
+        '//a[contains(text(), "官方网站") or contains(following-sibling::text(), "官方网站")]/@href'
+    ).getall()
+    for text_node in response.xpath('//text()[contains(., "官方网站")]'):
+        links = text_node.xpath("..").xpath(".//a/@href").getall()
+        if links:
+            return links[0]
+    if official_links:
+        return official_links[0]
+
+    official_sections = response.xpath('//p[contains(text(), "官方网站")]//a/@href').getall()
+    if official_sections:
+        return official_sections[0]
+
+    for link in response.css('a[href^="http"]::attr(href)').getall():
+        if not any(domain in link for domain in ["bgm.tv", "mikanani.me", "bangumi.tv"]):
+            return link
+
+    for domain in ["aniplex.co.jp", "tbs.co.jp", "mbs.jp", "tokyo-mx.jp", "at-x.com", "animax.co.jp"]:
+        link = response.css(f'a[href*="{domain}"]::attr(href)').get()
+        if link:
+            return link
+    return None
+
+
+def _legacy_description(response):
+    for selector in [
+        ".header2-desc::text",
+        ".bangumi-info p::text",
+        ".description::text",
+        ".summary::text",
+        'meta[name="description"]::attr(content)',
+    ]:
+        description = response.css(selector).get()
+        if description and len(description.strip()) > 10:
+            if "蜜柑计划" not in description and "Mikan Project" not in description:
+                return description.strip()
+    return None
+
+
+def legacy_resources(spider, response, mikan_id) -> list:
+    resources = []
+    for group_element in response.css("div.subgroup-text"):
+        group_id = group_element.attrib.get("id")
+        group_name = group_element.css("a::text").get()
+        if not group_id or not group_name:
+            continue
+        resource_table = group_element.xpath("following-sibling::table[contains(@class, 'table')][1]")
+        if resource_table:
+            for row in resource_table.css("tbody tr"):
+                cols = row.css("td")
+                # 原实现在不足五列时访问第5列抛出IndexError，该行被丢弃
+                if len(cols) >= 5:
+                    resource = spider._parse_resource_row(_legacy_row_fields(cols), mikan_id, group_id, 0)
+                    if resource:
+                        resources.append(resource)
+    return resources
+
+
+def _legacy_row_fields(cols) -> dict:
+    """原实现中每一列都经由Selector的CSS查询取值"""
+    title_element = cols[0].css("a.magnet-link-wrap")
+    return {
+        "title": title_element.css("::text").get() or cols[0].css("::text").get(),
+        "size": cols[1].css("::text").get(),
+        "date": cols[2].css("::text").get(),
+        "magnet_link": cols[0].css("a.js-magnet::attr(data-clipboard-text)").get(),
+        "torrent_href": cols[3].css("a::attr(href)").get(),
+        "play_href": cols[4].css("a::attr(href)").get(),
+    }
+
+
+# ---- 当前实现 ----
+
+def current_fields(response) -> dict:
+    from ikuyo.crawler.detail_parser import parse_detail_page
+
+    page = parse_detail_page(response.selector.root)
+    page.pop("subtitle_groups")
+    return page
+
+
+def current_resources(spider, response, mikan_id) -> list:
+    from ikuyo.crawler.detail_parser import parse_detail_page
+
+    groups = parse_detail_page(response.selector.root)["subtitle_groups"]
+    return list(spider._iter_resources(groups, mikan_id, 0))
+
+
+def current_detail(spider, response, mikan_id):
+    """完整的详情页解析：字段与资源在同一次遍历结果上提取"""
+    from ikuyo.crawler.detail_parser import parse_detail_page
+
+    page = parse_detail_page(response.selector.root)
+    return page, list(spider._iter_resources(page["subtitle_groups"], mikan_id, 0))
+
+
+def legacy_detail(spider, response, mikan_id):
+    return legacy_fields(response), legacy_resources(spider, response, mikan_id)
+
+
+# ---- 基准 ----
+
+def load_pages(fixtures_dir: str) -> list:
+    from scrapy.http import HtmlResponse
+
+    pages = []
+    detail_dir = os.path.join(fixtures_dir, mikan_fixtures.DETAIL_DIR)
+    for name in sorted(os.listdir(detail_dir)):
+        if not name.endswith(".html"):
+            continue
+        with open(os.path.join(detail_dir, name), "rb") as f:
+            body = f.read()
+        url = f"{mikan_fixtures.SOURCE_BASE_URL}/Home/Bangumi/{name[:-5]}"
+        pages.append((int(name[:-5]), url, body))
+    if not pages:
+        raise RuntimeError(f"夹具目录中没有详情页: {detail_dir}")
+    return [(mikan_id, HtmlResponse(url=url, body=body, encoding="utf-8")) for mikan_id, url, body in pages]
+
+
+def make_spider():
+    from ikuyo.core.config import load_config
+    from ikuyo.crawler.spiders.mikan import MikanSpider
+
+    spider = MikanSpider(config=load_config(os.path.join(PROJECT_ROOT, "config.yaml")), task_id=None)
+    # 基准只统计解析耗时，关闭逐行的资源解析日志
+    spider.logger.logger.disabled = True
+    return spider
+
+
+def _strip_volatile(resources: list) -> list:
+    return [{k: v for k, v in r.as_row().items() if k not in ("created_at", "updated_at")} for r in resources]
+
+
+def check_outputs(spider, pages) -> list:
+    """对比两种实现的输出，返回不一致的番剧ID"""
+    mismatches = []
+    for mikan_id, response in pages:
+        legacy_page, legacy_rows = legacy_detail(spider, response, mikan_id)
+        page, rows = current_detail(spider, response, mikan_id)
+        page = {k: v for k, v in page.items() if k != "subtitle_groups"}
+        if page != legacy_page or _strip_volatile(rows) != _strip_volatile(legacy_rows):
+            mismatches.append(mikan_id)
+    return mismatches
+
+
+# 详情字段只出现在资源表格中的页面：(情形, 字段, 资源行标题单元格内容)
+TABLE_CASES = [
+    ("broadcast_day_in_title", "broadcast_day", "[组] 番名 放送日期：星期一 [01]"),
+    ("bangumi_link_in_row", "bangumi_url", '<a href="https://bgm.tv/subject/123456">bgm</a>'),
+    ("external_link_in_row", "official_website", '<a href="https://example-mirror.net/file">镜像</a>'),
+]
+
+
+def _table_case_page(cell: str) -> str:
+    return (
+        "<html><head><title>Mikan Project - 番名</title></head><body>"
+        '<div class="central-container">'
+        '<div class="subgroup-text" id="100"><a href="/Home/PublishGroup/100">字幕组</a></div>'
+        '<table class="table table-striped tbl-border fadeIn"><tbody><tr>'
+        f"<td>{cell}</td><td>100MB</td><td>2024/07/01 12:00</td><td></td><td></td>"
+        "</tr></tbody></table></div></body></html>"
+    )
+
+
+def check_table_cases() -> list:
+    """
+    资源表格内容的有意变化：legacy 从表格中取到字段值，current 不进入表格，字段应为None
+    返回每种情形的两种取值及是否符合预期
+    """
+    from scrapy.http import HtmlResponse
+
+    cases = []
+    for name, field, cell in TABLE_CASES:
+        response = HtmlResponse(
+            url=f"{mikan_fixtures.SOURCE_BASE_URL}/Home/Bangumi/1",
+            body=_table_case_page(cell).encode("utf-8"),
+            encoding="utf-8",
+        )
+        legacy = legacy_fields(response)[field]
+        current = current_fields(response)[field]
+        cases.append(
+            {
+                "case": name,
+                "field": field,
+                "legacy": legacy,
+                "current": current,
+                "ok": legacy is not None and current is None,
+            }
+        )
+    return cases
+
+
+def cpu_per_page(func, spider, pages, repeat: int) -> float:
+    """每页CPU耗时（毫秒），取各轮中位数"""
+    rounds = []
+    for _ in range(repeat):
+        start = time.process_time()
+        for mikan_id, response in pages:
+            func(spider, response, mikan_id)
+        rounds.append((time.process_time() - start) / len(pages) * 1000)
+    return round(statistics.median(rounds), 3)
+
+
+def tree_parse_per_page(pages, repeat: int) -> float:
+    from parsel import Selector
+
+    rounds = []
+    for _ in range(repeat):
+        start = time.process_time()
+        for _, response in pages:
+            Selector(text=response.text)
+        rounds.append((time.process_time() - start) / len(pages) * 1000)
+    return round(statistics.median(rounds), 3)
+
+
+def detail_peak_memory(spider, pages) -> dict:
+    """
+    最大页面上 parse_anime_detail 的Python内存峰值（KB）：
+    streamed 为逐项消费（Pipeline处理完即可释放），materialized 为把全部Item收集成列表
+    """
+    import tracemalloc
+
+    from scrapy import Request
+
+    mikan_id, response = max(pages, key=lambda page: len(page[1].body))
+    response = response.replace(request=Request(response.url, meta={"mikan_id": mikan_id, "title": ""}))
+    response.selector  # lxml树不计入
+
+    def consume_streamed():
+        for _ in spider.parse_anime_detail(response):
+            pass
+
+    def consume_materialized():
+        list(spider.parse_anime_detail(response))
+
+    peaks = {}
+    for name, consume in (("streamed", consume_streamed), ("materialized", consume_materialized)):
+        tracemalloc.start()
+        consume()
+        peaks[f"{name}_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return {"mikan_id": mikan_id, **peaks}
+
+
+def run(fixtures_dir: str, repeat: int) -> dict:
+    pages = load_pages(fixtures_dir)
+    spider = make_spider()
+    for _, response in pages:
+        response.selector  # 预先构建lxml树，解析耗时单独统计
+
+    rows = sum(len(current_resources(spider, response, mikan_id)) for mikan_id, response in pages)
+    variants = {
+        "fields": (lambda s, r, m: legacy_fields(r), lambda s, r, m: current_fields(r)),
+        "detail": (legacy_detail, current_detail),
+    }
+    results = {}
+    for name, (legacy, current) in variants.items():
+        legacy_ms = cpu_per_page(legacy, spider, pages, repeat)
+        current_ms = cpu_per_page(current, spider, pages, repeat)
+        results[name] = {
+            "legacy_ms": legacy_ms,
+            "current_ms": current_ms,
+            "reduction": round(1 - current_ms / legacy_ms, 4) if legacy_ms else 0.0,
+        }
+    return {
+        "pages": len(pages),
+        "resource_rows": rows,
+        "tree_parse_ms": tree_parse_per_page(pages, repeat),
+        "results": results,
+        "detail_memory": detail_peak_memory(spider, pages),
+        "mismatches": check_outputs(spider, pages),
+        "table_cases": check_table_cases(),
+    }
+
+
+def print_report(report: dict, baseline: dict = None) -> None:
+    base = baseline["results"] if baseline else {}
+    print(
+        f"版本: {report['revision']}, 夹具: {report['fixtures'].get('source')}, "
+        f"页面: {report['pages']}, 资源行: {report['resource_rows']}, 重复: {report['repeat']} 轮"
+    )
+    print(f"HTML解析（构建lxml树）: {report['tree_parse_ms']} ms/页")
+    print(f"{'阶段':<10}{'legacy(ms/页)':>16}{'current(ms/页)':>16}{'降低':>10}")
+    labels = {"fields": "详情字段", "detail": "字段+资源"}
+    for name, result in report["results"].items():
+        line = (
+            f"{labels.get(name, name):<10}{result['legacy_ms']:>16}{result['current_ms']:>16}"
+            f"{result['reduction'] * 100:>9.1f}%"
+        )
+        previous = base.get(name, {}).get("current_ms")
+        if previous:
+            line += f"  (current {(result['current_ms'] - previous) / previous * 100:+.1f}% vs {baseline['revision']})"
+        print(line)
+    memory = report["detail_memory"]
+    print(
+        f"parse_anime_detail 内存峰值（番剧 {memory['mikan_id']}）: 逐项消费 {memory['streamed_kb']} KB, "
+        f"全部物化 {memory['materialized_kb']} KB"
+    )
+    if report["mismatches"]:
+        print(f"❌ 以下页面两种实现的输出不一致: {report['mismatches']}")
+    else:
+        print("✅ 两种实现的输出一致")
+    for case in report["table_cases"]:
+        mark = "✅" if case["ok"] else "❌"
+        print(
+            f"{mark} 资源表格内容（有意变化）{case['case']}: {case['field']} "
+            f"legacy={case['legacy']!r}, current={case['current']!r}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="详情页解析基准")
+    parser.add_argument("--fixtures", help="夹具目录（录制或生成），默认临时生成合成夹具")
+    parser.add_argument("--anime", type=int, default=20, help="合成夹具的番剧数")
+    parser.add_argument("--groups", type=int, default=6, help="合成夹具每部番剧的字幕组数")
+    parser.add_argument("--resources", type=int, default=24, help="合成夹具每个字幕组的资源数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复轮数")
+    parser.add_argument("--output", help="将结果写入JSON文件")
+    parser.add_argument("--compare", help="与之前保存的JSON结果对比")
+    args = parser.parse_args()
+
+    generated_dir = None
+    fixtures_dir = args.fixtures
+    if not fixtures_dir:
+        generated_dir = fixtures_dir = tempfile.mkdtemp(prefix="ikuyo-mikan-fixtures-")
+        mikan_fixtures.generate(fixtures_dir, args.anime, args.groups, args.resources)
+
+    try:
+        report = {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "fixtures": mikan_fixtures.load_info(fixtures_dir),
+            "repeat": args.repeat,
+            **run(fixtures_dir, args.repeat),
+        }
+    finally:
+        if generated_dir:
+            shutil.rmtree(generated_dir, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if report["mismatches"] or not all(case["ok"] for case in report["table_cases"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+资源列表序列化基准
+在临时目录中构造一个拥有大量资源的番剧，分别以Pydantic路径和快速JSON路径
+请求 /api/v1/animes/{id}/resources，输出 p50/p99 延迟
+
+用法:
+    python benchmarks/bench_resource_serialization.py --resources 5000 --rounds 50
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+BANGUMI_ID = 100001
+MIKAN_ID = 9001
+
+
+def prepare_workdir() -> str:
+    """创建临时工作目录：复制配置并关闭响应缓存，使每次请求都真正执行"""
+    import yaml
+
+    workdir = tempfile.mkdtemp(prefix="ikuyo-bench-")
+    os.makedirs(os.path.join(workdir, "data", "database"), exist_ok=True)
+    with open(os.path.join(PROJECT_ROOT, "config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config.setdefault("response_cache", {})["enabled"] = False
+    with open(os.path.join(workdir, "config.yaml"), "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+    return workdir
+
+
+def seed(resource_count: int, group_count: int = 20) -> None:
+    """写入一个番剧及其资源"""
+    from ikuyo.core.database import create_db_and_tables, get_session
+    from ikuyo.core.models import Anime, Resource, SubtitleGroup
+
+    create_db_and_tables()
+    resolutions = ["1080p", "720p", "2160p"]
+    subtitle_types = ["简体中文", "繁体中文", "中日双语"]
+    with get_session() as session:
+        session.add(Anime(mikan_id=MIKAN_ID, bangumi_id=BANGUMI_ID, title="基准测试番剧"))
+        for group_id in range(1, group_count + 1):
+            session.add(SubtitleGroup(id=group_id, name=f"字幕组{group_id}"))
+        for i in range(resource_count):
+            episode = i % 1000 + 1
+            session.add(
+                Resource(
+                    mikan_id=MIKAN_ID,
+                    subtitle_group_id=i % group_count + 1,
+                    episode_number=episode,
+                    title=f"[字幕组{i % group_count + 1}] 基准测试番剧 第{episode}集 "
+                    f"[{resolutions[i % 3]}][{subtitle_types[i % 3]}]",
+                    file_size="512.3MB",
+                    resolution=resolutions[i % 3],
+                    subtitle_type=subtitle_types[i % 3],
+                    magnet_url=f"magnet:?xt=urn:btih:{i:040x}",
+                    torrent_url=f"https://mikanani.me/Download/{i:040x}.torrent",
+                    release_date=1700000000 + i * 60,
+                )
+            )
+        session.commit()
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(client, url: str, rounds: int, warmup: int = 3):
+    """重复请求并返回各次耗时（毫秒）和响应体大小"""
+    for _ in range(warmup):
+        client.get(url)
+    samples = []
+    size = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        response = client.get(url)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.text
+        size = len(response.content)
+    return samples, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="资源列表序列化基准")
+    parser.add_argument("--resources", type=int, default=5000, help="资源数量")
+    parser.add_argument("--rounds", type=int, default=50, help="每种路径的请求次数")
+    parser.add_argument("--output", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    workdir = prepare_workdir()
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        seed(args.resources)
+
+        from fastapi.testclient import TestClient
+
+        from ikuyo.api import fast_json
+        from ikuyo.api.app import app
+        from ikuyo.api.routes import resources
+
+        url = f"/api/v1/animes/{BANGUMI_ID}/resources?limit=9999"
+        client = TestClient(app)
+        results = {}
+        for name, enabled in (("pydantic", False), ("fast_json", True)):
+            resources.FAST_JSON_ENABLED = enabled
+            samples, size = measure(client, url, args.rounds)
+            results[name] = {
+                "p50_ms": round(statistics.median(samples), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+                "mean_ms": round(statistics.mean(samples), 2),
+                "bytes": size,
+            }
+
+        report = {
+            "resources": args.resources,
+            "rounds": args.rounds,
+            "serializer": fast_json.SERIALIZER,
+            "python": sys.version.split()[0],
+            "results": results,
+        }
+        print(f"资源数: {args.resources}, 轮数: {args.rounds}, 序列化器: {report['serializer']}")
+        print(f"{'路径':<12}{'p50(ms)':>10}{'p99(ms)':>10}{'mean(ms)':>10}{'bytes':>10}")
+        for name, r in results.items():
+            print(f"{name:<12}{r['p50_ms']:>10}{r['p99_ms']:>10}{r['mean_ms']:>10}{r['bytes']:>10}")
+
+        if args.output:
+            with open(os.path.join(cwd, args.output), "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
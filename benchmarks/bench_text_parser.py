@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+标题解析基准
+对 text_parser 中每条资源都会调用的函数做微基准，同时校验输出：
+- 按固定种子生成数万条仿字幕组命名风格的标题，每条标题在构造时即已知集数、分辨率、字幕类型与发布时间
+- 计时：每个函数在整个语料上重复多轮，报告单次调用耗时（ns）的最小值与中位数
+- 准确率：与构造时的真实值比较
+- 黄金输出：所有输出的摘要与 benchmarks/golden/text_parser.json 比较，输出变化时以非零状态退出，
+  确认变化符合预期后使用 --update-golden 更新
+
+用法:
+    python benchmarks/bench_text_parser.py
+    python benchmarks/bench_text_parser.py --size 50000 --repeat 7 --output parser.json
+    python benchmarks/bench_text_parser.py --compare parser.json
+    python benchmarks/bench_text_parser.py --update-golden
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from ikuyo.utils import text_parser  # noqa: E402
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "text_parser.json")
+
+GROUPS = [
+    "ANi",
+    "LoliHouse",
+    "喵萌奶茶屋",
+    "北宇治字幕组",
+    "桜都字幕组",
+    "千夏字幕组",
+    "爱恋字幕社",
+    "极影字幕社",
+    "幻樱字幕组",
+    "SweetSub",
+    "NC-Raws",
+    "Lilith-Raws",
+    "芝士动物朋友",
+    "黒ネズミたち",
+    "Prejudice-Studio",
+    "猎户手抄部",
+    "织梦字幕组",
+    "澄空学园",
+]
+SHOWS = [
+    "石纪元 科学与未来",
+    "药屋少女的呢喃 第二季 / Kusuriya no Hitorigoto S2",
+    "86 不存在的战区",
+    "Re：从零开始的异世界生活 第三季",
+    "2.5次元的诱惑",
+    "进击的巨人 The Final Season",
+    "葬送的芙莉莲",
+    "我推的孩子 第二季",
+    "间谍过家家 Season 3",
+    "鬼灭之刃 柱训练篇",
+    "BanG Dream! It's MyGO!!!!!",
+    "无职转生Ⅱ ～到了异世界就拿出真本事～",
+    "败犬女主太多了！",
+    "物语系列 第外季&第怪季",
+    "名侦探柯南",
+    "海贼王",
+    "这是妳与我的最后战场，或是开创世界的圣战",
+    "义妹生活",
+]
+# 分辨率写法 -> 期望结果
+RESOLUTIONS = [
+    ("1080p", "1080p"),
+    ("1080P", "1080p"),
+    ("720p", "720p"),
+    ("2160p", "2160p"),
+    ("1920x1080", "1080p"),
+    ("1280X720", "720p"),
+    ("3840x2160", "2160p"),
+    ("4K", "4K"),
+    ("WebRip", "1080p"),
+    ("HDTV", "720p"),
+]
+# 字幕标记 -> 标准化后的期望类型
+SUBTITLES = [
+    ("简日双语", "中日双语"),
+    ("繁日双语", "中日双语"),
+    ("简繁内封", "简繁双语"),
+    ("简繁内封字幕", "简繁双语"),
+    ("简繁日内封", "简繁日"),
+    ("CHT", "繁体中文"),
+    ("CHS", "简体中文"),
+    ("GB", "简体中文"),
+    ("BIG5", "繁体中文"),
+    ("简体内嵌", "简体中文"),
+    ("繁体内嵌", "繁体中文"),
+    ("中日双语", "中日双语"),
+    ("RAW", "无字幕"),
+]
+# 编码、来源等附加标记，不影响期望结果
+EXTRAS = ["AAC", "HEVC-10bit AAC", "AVC AAC MP4", "x264 AAC", "MKV", "Baha", "Bilibili", "CR"]
+
+
+class Sample(NamedTuple):
+    title: str
+    date: str
+    episode: Optional[int]
+    resolution: Optional[str]
+    subtitle: str
+    timestamp: int
+
+
+def _episode_text(rng: random.Random, episode: int) -> str:
+    style = rng.randrange(9)
+    if style == 0:
+        return f" - {episode:02d} "
+    if style == 1:
+        return f"[{episode:02d}]"
+    if style == 2:
+        return f" 第{episode}话 "
+    if style == 3:
+        return f" 第{episode:02d}集 "
+    if style == 4:
+        return f" EP{episode:02d} "
+    if style == 5:
+        return f"[{episode:02d}v2]"
+    if style == 6:
+        return f" - {episode:02d}v2 "
+    if style == 7:
+        return f"【{episode:02d}】"
+    return f" - {episode:02d}["
+
+
+def build_corpus(size: int, seed: int = 20240701) -> List[Sample]:
+    """按固定种子生成带真实值的标题语料"""
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(size):
+        group = rng.choice(GROUPS)
+        show = rng.choice(SHOWS)
+        episode = rng.randint(1, 1200 if show in ("名侦探柯南", "海贼王") else 26)
+        resolution_text, resolution = rng.choice(RESOLUTIONS)
+        subtitle_text, subtitle = rng.choice(SUBTITLES)
+        extra = rng.choice(EXTRAS)
+
+        if rng.random() < 0.04:
+            # 合集：不应解析出单集集数
+            first = rng.choice([1, 13])
+            episode_text, episode = f"[{first:02d}-{first + 11:02d}]", None
+        else:
+            episode_text = _episode_text(rng, episode)
+
+        layout = rng.randrange(3)
+        if layout == 0:
+            title = f"[{group}] {show}{episode_text}[{resolution_text}][{extra}][{subtitle_text}]"
+        elif layout == 1:
+            title = f"【{group}】★新番★[{show}]{episode_text}[{subtitle_text}][{resolution_text}][{extra}]"
+        else:
+            title = f"[{group}] {show}{episode_text}({resolution_text} {extra})[{subtitle_text}]"
+        if rng.random() < 0.1:
+            # 末尾附带CRC哈希
+            title += f"[{rng.getrandbits(32):08X}]"
+
+        released = datetime.fromtimestamp(1704067200 + rng.randrange(0, 3 * 365 * 86400)).replace(second=0)
+        if rng.random() < 0.9:
+            date = released.strftime("%Y/%m/%d %H:%M")
+        else:
+            released = released.replace(hour=0, minute=0)
+            date = f"{released.month}/{released.day}/{released.year}"
+        samples.append(Sample(title, date, episode, resolution, subtitle, int(released.timestamp())))
+    return samples
+
+
+def _normalized_subtitle(title: str) -> Optional[str]:
+    raw = text_parser.extract_subtitle_type(title)
+    return text_parser.normalize_subtitle_type(raw) if raw else None
+
+
+# 被测函数：名称 -> (调用, 输入字段, 真实值字段)
+BENCHMARKS: Dict[str, tuple] = {
+    "extract_episode_number": (text_parser.extract_episode_number, "title", "episode"),
+    "extract_resolution": (text_parser.extract_resolution, "title", "resolution"),
+    "extract_subtitle_type": (text_parser.extract_subtitle_type, "title", None),
+    "normalize_subtitle_type": (_normalized_subtitle, "title", "subtitle"),
+    "parse_datetime_to_timestamp": (text_parser.parse_datetime_to_timestamp, "date", "timestamp"),
+}
+
+
+def time_function(func: Callable, inputs: List[str], repeat: int) -> Dict[str, float]:
+    """在整个语料上重复调用，返回单次调用耗时（ns）"""
+    func(inputs[0])  # 预热
+    per_call = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for value in inputs:
+            func(value)
+        per_call.append((time.perf_counter_ns() - start) / len(inputs))
+    return {"min_ns": round(min(per_call), 1), "median_ns": round(statistics.median(per_call), 1)}
+
+
+def digest(outputs: List) -> str:
+    payload = json.dumps(outputs, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def run(size: int, repeat: int, only: Optional[List[str]] = None) -> dict:
+    corpus = build_corpus(size)
+    results = {}
+    for name, (func, input_field, truth_field) in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        inputs = [getattr(sample, input_field) for sample in corpus]
+        outputs = [func(value) for value in inputs]
+        result = time_function(func, inputs, repeat)
+        result["digest"] = digest(outputs)
+        if truth_field:
+            correct = sum(
+                1 for output, sample in zip(outputs, corpus) if output == getattr(sample, truth_field)
+            )
+            result["accuracy"] = round(correct / len(corpus), 4)
+        results[name] = result
+    return {
+        "corpus_size": size,
+        "repeat": repeat,
+        "python": sys.version.split()[0],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def check_golden(report: dict) -> List[str]:
+    """与黄金输出比较，返回输出发生变化的函数"""
+    if not os.path.exists(GOLDEN_PATH):
+        print(f"未找到黄金输出 {GOLDEN_PATH}，使用 --update-golden 生成")
+        return []
+    with open(GOLDEN_PATH, "r", encoding="utf-8") as f:
+        golden = json.load(f)
+    if golden.get("corpus_size") != report["corpus_size"]:
+        print(f"语料规模与黄金输出不同（{golden.get('corpus_size')}），跳过输出校验")
+        return []
+    changed = []
+    for name, result in report["results"].items():
+        expected = golden["functions"].get(name)
+        if expected and expected["digest"] != result["digest"]:
+            changed.append(name)
+            accuracy = ""
+            if "accuracy" in result:
+                accuracy = f"，准确率 {expected.get('accuracy')} -> {result['accuracy']}"
+            print(f"❌ {name} 的输出与黄金输出不一致{accuracy}")
+    return changed
+
+
+def update_golden(report: dict) -> None:
+    os.makedirs(os.path.dirname(GOLDEN_PATH), exist_ok=True)
+    golden = {
+        "corpus_size": report["corpus_size"],
+        "functions": {
+            name: {key: result[key] for key in ("digest", "accuracy") if key in result}
+            for name, result in report["results"].items()
+        },
+    }
+    with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+        json.dump(golden, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print(f"已更新黄金输出: {GOLDEN_PATH}")
+
+
+def print_report(report: dict, baseline: Optional[dict] = None) -> None:
+    previous = baseline["results"] if baseline else {}
+    print(f"语料: {report['corpus_size']} 条标题, 重复: {report['repeat']} 轮, Python {report['python']}")
+    print(f"{'函数':<30}{'min(ns)':>10}{'median(ns)':>12}{'准确率':>10}")
+    for name, result in report["results"].items():
+        line = f"{name:<30}{result['min_ns']:>10}{result['median_ns']:>12}{result.get('accuracy', '-'):>10}"
+        if name in previous:
+            change = (result["median_ns"] - previous[name]["median_ns"]) / previous[name]["median_ns"] * 100
+            line += f"  ({change:+.1f}%)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="标题解析基准")
+    parser.add_argument("--size", type=int, default=30000, help="语料规模（黄金输出基于默认规模）")
+    parser.add_argument("--repeat", type=int, default=5, help="每个函数的重复轮数")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="只运行指定函数")
+    parser.add_argument("--output", help="将结果写入JSON文件")
+    parser.add_argument("--compare", help="与之前保存的JSON结果对比耗时")
+    parser.add_argument("--update-golden", action="store_true", help="用本次输出更新黄金输出")
+    args = parser.parse_args()
+
+    # 时间戳按本地时区解析，固定时区使黄金输出与运行环境无关
+    os.environ["TZ"] = "Asia/Shanghai"
+    time.tzset()
+
+    report = run(args.size, args.repeat, args.only)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.update_golden:
+        update_golden(report)
+        return
+    if check_golden(report):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Mikan页面夹具
+- generate：按固定随机种子生成与蜜柑计划页面结构一致的首页、季度接口和番剧详情页
+- record：从线上站点录制同样布局的夹具（需要网络）
+夹具目录布局：
+    Home.html                           首页
+    BangumiCoverFlowByDayOfWeek.html    季度接口响应
+    Bangumi/<mikan_id>.html             番剧详情页
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from html import escape
+from typing import List
+
+HOME_FILE = "Home.html"
+SEASON_FILE = "BangumiCoverFlowByDayOfWeek.html"
+DETAIL_DIR = "Bangumi"
+INFO_FILE = "fixture.json"
+SOURCE_BASE_URL = "https://mikanani.me"
+
+GROUP_NAMES = [
+    "ANi",
+    "LoliHouse",
+    "喵萌奶茶屋",
+    "北宇治字幕组",
+    "桜都字幕组",
+    "千夏字幕组",
+    "爱恋字幕社",
+    "极影字幕社",
+    "幻樱字幕组",
+    "SweetSub",
+    "NC-Raws",
+    "Lilith-Raws",
+]
+WEEKDAYS = ["星期日", "星期一", "星期二", "星期三", "星期四", "星期五", "星期六"]
+
+
+def _title(rng: random.Random, group: str, name: str, episode: int) -> str:
+    """按常见字幕组命名风格生成资源标题"""
+    style = rng.randrange(5)
+    resolution = rng.choice(["1080P", "1080p", "720p", "2160p", "1920x1080"])
+    if style == 0:
+        return f"[{group}] {name} - {episode:02d} [{resolution}][Baha][WEB-DL][AAC AVC][CHT][MP4]"
+    if style == 1:
+        return f"【{group}】★07月新番★[{name}][{episode:02d}][{resolution}][简日双语][招募翻译]"
+    if style == 2:
+        return f"[{group}] {name} / Title {episode} - {episode:02d} [WebRip {resolution} HEVC-10bit AAC][简繁内封字幕]"
+    if style == 3:
+        return f"[{group}][{name}][第{episode}话][{resolution}][MP4][GB][网盘]"
+    return f"[{group}] {name} [{episode:02d}][{resolution}][HEVC][繁日内嵌]"
+
+
+def _resource_row(rng: random.Random, title: str, release: float) -> str:
+    info_hash = "%040x" % rng.getrandbits(160)
+    size = f"{rng.uniform(150, 1500):.1f}MB"
+    date = time.strftime("%Y/%m/%d %H:%M", time.gmtime(release))
+    return (
+        "<tr>"
+        f'<td><a href="/Home/Episode/{info_hash}" target="_blank" class="magnet-link-wrap">{escape(title)}</a>'
+        f'<a data-clipboard-text="magnet:?xt=urn:btih:{info_hash}&amp;tr=http%3a%2f%2ft.nyaatracker.com%2fannounce" '
+        'class="js-magnet magnet-link">[复制磁连]</a></td>'
+        f"<td>{size}</td>"
+        f"<td>{date}</td>"
+        f'<td><a href="/Download/{time.strftime("%Y%m%d", time.gmtime(release))}/{info_hash}.torrent">'
+        '<img src="/images/download_icon.png"></a></td>'
+        f'<td><a class="js-play" href="/Home/Play/{info_hash}"><img src="/images/play_icon.png"></a></td>'
+        "</tr>"
+    )
+
+
+def detail_page(rng: random.Random, mikan_id: int, name: str, groups: int, resources: int) -> str:
+    """番剧详情页"""
+    weekday = rng.choice(WEEKDAYS)
+    start = 1719792000 + rng.randrange(0, 90) * 86400
+    sections: List[str] = []
+    for group_index in range(groups):
+        group_id = 100 + (mikan_id * 7 + group_index * 13) % 900
+        group = GROUP_NAMES[(mikan_id + group_index) % len(GROUP_NAMES)]
+        rows = "".join(
+            _resource_row(
+                rng, _title(rng, group, name, episode), start + episode * 7 * 86400 + rng.randrange(3600)
+            )
+            for episode in range(resources, 0, -1)
+        )
+        sections.append(
+            f'<div class="subgroup-text" id="{group_id}">'
+            f'<a href="/Home/PublishGroup/{group_id}" target="_blank" style="color: #3bc0c3;">{escape(group)}</a>'
+            f'<a href="/RSS/Bangumi?bangumiId={mikan_id}&amp;subgroupid={group_id}" class="mikan-rss">'
+            '<i class="fa fa-rss-square"></i></a>'
+            "</div>"
+            '<table class="table table-striped tbl-border fadeIn">'
+            "<thead><tr><th>番组名</th><th>大小</th><th>更新时间</th><th>下载</th><th>播放</th></tr></thead>"
+            f"<tbody>{rows}</tbody></table>"
+        )
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>Mikan Project - {escape(name)}</title>"
+        '<meta name="description" content="蜜柑计划：新一代的动漫下载站">'
+        "</head><body>"
+        '<div class="pull-left leftbar-container">'
+        f'<p class="bangumi-title">{escape(name)}</p>'
+        f'<p class="bangumi-info">放送开始：{time.strftime("%m/%d/%Y", time.gmtime(start))}</p>'
+        f'<p class="bangumi-info">放送日期：{weekday}</p>'
+        '<p class="bangumi-info">官方网站：'
+        f'<a class="w-other-c" href="https://www.example-anime-{mikan_id}.jp/" target="_blank">'
+        f"https://www.example-anime-{mikan_id}.jp/</a></p>"
+        '<p class="bangumi-info">Bangumi番组计划链接：'
+        f'<a class="w-other-c" href="https://bgm.tv/subject/{400000 + mikan_id}" target="_blank">'
+        f"https://bgm.tv/subject/{400000 + mikan_id}</a></p>"
+        "</div>"
+        '<div class="central-container">'
+        '<p class="header2-desc">'
+        + escape(f"{name}的故事梗概。" * 8)
+        + "</p>"
+        + "".join(sections)
+        + "</div></body></html>"
+    )
+
+
+def _listing_links(anime: List[tuple]) -> str:
+    return "".join(
+        f'<li><div class="an-info-group"><a href="/Home/Bangumi/{mikan_id}" title="{escape(name)}">'
+        f'<span class="an-text">{escape(name)}</span></a></div></li>'
+        for mikan_id, name in anime
+    )
+
+
+def generate(output_dir: str, anime_count: int = 40, groups: int = 6, resources: int = 24, seed: int = 42) -> dict:
+    """生成夹具，返回规模信息"""
+    rng = random.Random(seed)
+    anime = [(3000 + i, f"测试番剧{i:03d}") for i in range(anime_count)]
+    os.makedirs(os.path.join(output_dir, DETAIL_DIR), exist_ok=True)
+
+    square = "".join(
+        f'<div class="m-week-square"><a href="/Home/Bangumi/{mikan_id}" title="{escape(name)}">'
+        f'<img data-src="/images/Bangumi/{mikan_id}.jpg"></a></div>'
+        for mikan_id, name in anime
+    )
+    with open(os.path.join(output_dir, HOME_FILE), "w", encoding="utf-8") as f:
+        f.write(f"<!DOCTYPE html><html><head><title>Mikan Project</title></head><body>{square}</body></html>")
+
+    with open(os.path.join(output_dir, SEASON_FILE), "w", encoding="utf-8") as f:
+        f.write(f'<div class="sk-bangumi"><ul class="list-inline an-ul">{_listing_links(anime)}</ul></div>')
+
+    for mikan_id, name in anime:
+        with open(os.path.join(output_dir, DETAIL_DIR, f"{mikan_id}.html"), "w", encoding="utf-8") as f:
+            f.write(detail_page(rng, mikan_id, name, groups, resources))
+
+    return _write_info(output_dir, {
+        "source": "generated",
+        "seed": seed,
+        "anime": anime_count,
+        "groups_per_anime": groups,
+        "resources_per_group": resources,
+    })
+
+
+def record(output_dir: str, year: int, season: str, limit: int = 20, delay: float = 1.0) -> dict:
+    """从线上站点录制夹具"""
+    import httpx
+
+    os.makedirs(os.path.join(output_dir, DETAIL_DIR), exist_ok=True)
+    with httpx.Client(base_url=SOURCE_BASE_URL, timeout=30, follow_redirects=True) as client:
+        home = client.get("/Home").text
+        with open(os.path.join(output_dir, HOME_FILE), "w", encoding="utf-8") as f:
+            f.write(home)
+
+        listing = client.get(
+            "/Home/BangumiCoverFlowByDayOfWeek", params={"year": year, "seasonStr": season}
+        ).text
+        with open(os.path.join(output_dir, SEASON_FILE), "w", encoding="utf-8") as f:
+            f.write(listing)
+
+        mikan_ids = list(dict.fromkeys(re.findall(r"/Home/Bangumi/(\d+)", listing)))[:limit]
+        for mikan_id in mikan_ids:
+            time.sleep(delay)
+            page = client.get(f"/Home/Bangumi/{mikan_id}").text
+            with open(os.path.join(output_dir, DETAIL_DIR, f"{mikan_id}.html"), "w", encoding="utf-8") as f:
+                f.write(page)
+            print(f"已录制 /Home/Bangumi/{mikan_id}")
+
+    return _write_info(
+        output_dir, {"source": "recorded", "year": year, "season": season, "anime": len(mikan_ids)}
+    )
+
+
+def _write_info(output_dir: str, info: dict) -> dict:
+    with open(os.path.join(output_dir, INFO_FILE), "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+    return info
+
+
+def load_info(fixtures_dir: str) -> dict:
+    """读取夹具规模信息"""
+    path = os.path.join(fixtures_dir, INFO_FILE)
+    if not os.path.exists(path):
+        return {"source": "unknown"}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成或录制Mikan页面夹具")
+    parser.add_argument("output", help="夹具输出目录")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="生成合成夹具")
+    gen.add_argument("--anime", type=int, default=40)
+    gen.add_argument("--groups", type=int, default=6)
+    gen.add_argument("--resources", type=int, default=24)
+    gen.add_argument("--seed", type=int, default=42)
+
+    rec = sub.add_parser("record", help="从 mikanani.me 录制夹具")
+    rec.add_argument("--year", type=int, required=True)
+    rec.add_argument("--season", required=True, help="季度，如 春/夏/秋/冬")
+    rec.add_argument("--limit", type=int, default=20, help="录制的详情页数量")
+    rec.add_argument("--delay", type=float, default=1.0, help="详情页请求间隔（秒）")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        info = generate(args.output, args.anime, args.groups, args.resources, args.seed)
+    else:
+        info = record(args.output, args.year, args.season, args.limit, args.delay)
+    print(info, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
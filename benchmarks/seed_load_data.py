@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+压测数据生成
+按固定随机种子向SQLite写入接近生产规模的数据：番剧、字幕组、番剧-字幕组关联、资源和用户订阅
+- 表结构由 SQLModel 模型创建，与线上一致
+- 资源数在番剧间呈长尾分布（少数长篇番剧占大量资源），订阅集中在热门番剧
+- 写入资源前暂时删除资源表索引，写完后按原定义重建
+
+用法:
+    python benchmarks/seed_load_data.py data/load/ikuyo.db
+    python benchmarks/seed_load_data.py data/load/ikuyo.db --anime 2000 --resources 200000 --subscriptions 10000
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+import uuid
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+BANGUMI_ID_BASE = 100000
+SUBTITLE_GROUPS = 300
+BATCH_SIZE = 50000
+# 固定的参考时间，保证同一种子生成的数据完全一致
+REFERENCE_TIME = 1735689600
+
+TITLE_HEADS = [
+    "魔法", "勇者", "恋爱", "异世界", "机动", "偶像", "侦探", "少女", "星之", "银河",
+    "咒术", "怪兽", "药屋", "间谍", "葬送", "樱花", "夏日", "海边", "学园", "龙与",
+]
+TITLE_TAILS = [
+    "物语", "战记", "日常", "协奏曲", "进行曲", "的呢喃", "的冒险", "研究会", "同好会", "传说",
+    "之旅", "少年", "公主", "骑士团", "料理人", "的孩子", "乐队", "大作战", "幻想曲", "狂想曲",
+]
+SEASONS = ["", " 第二季", " 第三季", " 续篇", " 剧场版", " Final Season"]
+RESOLUTIONS = ["1080p", "1080p", "1080p", "720p", "2160p"]
+SUBTITLE_TYPES = ["中日双语", "简体中文", "繁体中文", "简繁双语", "简繁日", "无字幕"]
+WEEKDAYS = ["星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日"]
+
+
+def _anime_title(rng: random.Random, index: int) -> str:
+    return f"{rng.choice(TITLE_HEADS)}{rng.choice(TITLE_TAILS)}{rng.choice(SEASONS)} {index}"
+
+
+def _long_tail(rng: random.Random, count: int, total: int, minimum: int = 0, maximum: int = None):
+    """将total按长尾分布分配到count个桶，超出maximum的部分依次补给其它桶"""
+    weights = [rng.paretovariate(1.5) for _ in range(count)]
+    scale = (total - minimum * count) / sum(weights)
+    buckets = [minimum + int(w * scale) for w in weights]
+    # 取整误差补到第一个桶
+    buckets[0] += total - sum(buckets)
+    if maximum is not None:
+        overflow = sum(max(0, b - maximum) for b in buckets)
+        buckets = [min(b, maximum) for b in buckets]
+        index = 0
+        while overflow > 0 and index < count:
+            extra = min(overflow, maximum - buckets[index])
+            buckets[index] += extra
+            overflow -= extra
+            index += 1
+    return buckets
+
+
+def _create_schema(path: str):
+    """用SQLModel模型建表，返回资源表的索引定义"""
+    from sqlmodel import SQLModel, create_engine
+
+    import ikuyo.core.models  # noqa: F401  注册数据表
+
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    indexes = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name='resource' AND sql IS NOT NULL"
+    ).fetchall()
+    for name, _ in indexes:
+        conn.execute(f'DROP INDEX "{name}"')
+    conn.commit()
+    conn.close()
+    return [sql for _, sql in indexes]
+
+
+def seed(
+    path: str,
+    anime: int = 20000,
+    resources: int = 2000000,
+    subscriptions: int = 100000,
+    users: int = 5000,
+    seed: int = 7,
+) -> dict:
+    """生成数据库，返回规模信息"""
+    if os.path.exists(path):
+        raise FileExistsError(f"数据库已存在: {path}")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    now = REFERENCE_TIME
+
+    resource_indexes = _create_schema(path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    conn.executemany(
+        "INSERT INTO subtitlegroup (id, name, last_update, created_at) VALUES (?, ?, ?, ?)",
+        [(i, f"字幕组{i:03d}", now, now) for i in range(1, SUBTITLE_GROUPS + 1)],
+    )
+
+    anime_rows = []
+    for index in range(anime):
+        mikan_id = 1000 + index
+        broadcast_start = now - rng.randrange(0, 10 * 365) * 86400
+        anime_rows.append((
+            mikan_id,
+            BANGUMI_ID_BASE + index,
+            _anime_title(rng, index),
+            rng.choice(WEEKDAYS),
+            broadcast_start,
+            f"https://bgm.tv/subject/{BANGUMI_ID_BASE + index}",
+            "completed" if broadcast_start < now - 180 * 86400 else "airing",
+            now,
+            now,
+        ))
+    conn.executemany(
+        "INSERT INTO anime (mikan_id, bangumi_id, title, broadcast_day, broadcast_start, bangumi_url, status, "
+        "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        anime_rows,
+    )
+
+    # 资源：每部番剧由若干字幕组按集数发布，每集若干分辨率/字幕版本
+    per_anime = _long_tail(rng, anime, resources, minimum=1)
+    resource_id = 0
+    link_rows = []
+    batch = []
+    for (mikan_id, _, title, _, broadcast_start, *_), count in zip(anime_rows, per_anime):
+        groups = rng.sample(range(1, SUBTITLE_GROUPS + 1), k=min(12, count // 24 + 1))
+        episodes = max(1, min(1200, count // (len(groups) * 2) or 1))
+        group_counts = {}
+        for n in range(count):
+            resource_id += 1
+            group_id = groups[n % len(groups)]
+            episode = (n // len(groups)) % episodes + 1
+            release = broadcast_start + episode * 7 * 86400 + rng.randrange(86400)
+            resolution = rng.choice(RESOLUTIONS)
+            subtitle_type = rng.choice(SUBTITLE_TYPES)
+            info_hash = "%040x" % rng.getrandbits(160)
+            group_counts.setdefault(group_id, [0, release, release])
+            stats = group_counts[group_id]
+            stats[0] += 1
+            stats[1] = min(stats[1], release)
+            stats[2] = max(stats[2], release)
+            batch.append((
+                resource_id,
+                mikan_id,
+                group_id,
+                episode,
+                f"[字幕组{group_id:03d}] {title} - {episode:02d} [{resolution}][{subtitle_type}]",
+                f"{rng.uniform(150, 1500):.1f}MB",
+                resolution,
+                subtitle_type,
+                f"magnet:?xt=urn:btih:{info_hash}",
+                f"https://mikanani.me/Download/{info_hash}.torrent",
+                info_hash,
+                release,
+                now,
+                now,
+            ))
+            if len(batch) >= BATCH_SIZE:
+                _insert_resources(conn, batch)
+                batch = []
+        for group_id, (group_total, first, last) in group_counts.items():
+            link_rows.append((mikan_id, group_id, first, last, group_total, 1, now, now))
+    if batch:
+        _insert_resources(conn, batch)
+    conn.executemany(
+        "INSERT INTO animesubtitlegroup (mikan_id, subtitle_group_id, first_release_date, last_update_date, "
+        "resource_count, is_active, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        link_rows,
+    )
+
+    # 订阅：用户订阅数长尾分布，番剧按热度（排名的幂律）选取
+    user_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(users)]
+    popularity = [1.0 / (rank + 1) ** 0.8 for rank in range(anime)]
+    subscription_rows = []
+    for user_id, count in zip(user_ids, _long_tail(rng, users, subscriptions, minimum=1, maximum=anime)):
+        chosen = set(rng.choices(range(anime), weights=popularity, k=count))
+        while len(chosen) < count:
+            chosen.add(rng.randrange(anime))
+        for index in chosen:
+            mikan_id, bangumi_id, title, *_ = anime_rows[index]
+            subscription_rows.append((
+                user_id,
+                bangumi_id,
+                now - rng.randrange(0, 365 * 86400),
+                title,
+                title,
+                round(rng.uniform(5.0, 9.5), 1),
+                time.strftime("%Y-%m-%d", time.gmtime(anime_rows[index][4])),
+                rng.randint(1, 7),
+            ))
+    conn.executemany(
+        "INSERT INTO user_subscriptions (user_id, bangumi_id, subscribed_at, anime_name, anime_name_cn, "
+        "anime_rating, anime_air_date, anime_air_weekday) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        subscription_rows,
+    )
+    conn.commit()
+
+    for sql in resource_indexes:
+        conn.execute(sql)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+    info = {
+        "seed": seed,
+        "anime": anime,
+        "subtitle_groups": SUBTITLE_GROUPS,
+        "resources": resource_id,
+        "subscriptions": len(subscription_rows),
+        "users": users,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+    with open(f"{path}.json", "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+    return info
+
+
+def _insert_resources(conn: sqlite3.Connection, batch) -> None:
+    conn.executemany(
+        "INSERT INTO resource (id, mikan_id, subtitle_group_id, episode_number, title, file_size, resolution, "
+        "subtitle_type, magnet_url, torrent_url, magnet_hash, release_date, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        batch,
+    )
+    print(f"已写入资源 {batch[-1][0]} 条", file=sys.stderr)
+
+
+def load_info(path: str) -> dict:
+    """读取数据库规模信息（非本脚本生成的数据库返回空字典）"""
+    if not os.path.exists(f"{path}.json"):
+        return {}
+    with open(f"{path}.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成压测数据库")
+    parser.add_argument("output", help="SQLite数据库路径（不能已存在）")
+    parser.add_argument("--anime", type=int, default=20000)
+    parser.add_argument("--resources", type=int, default=2000000)
+    parser.add_argument("--subscriptions", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    info = seed(args.output, args.anime, args.resources, args.subscriptions, args.users, args.seed)
+    print(json.dumps(info, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
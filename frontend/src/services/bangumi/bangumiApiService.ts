@@ -157,22 +157,32 @@ export class BangumiApiService {
 
     /**
      * 批量获取番剧详情
+     * 按后端单次上限分批调用 POST /animes/batch，替代逐个请求详情
      */
     static async batchGetSubjects(bangumiIds: number[]): Promise<{
         success: BangumiSubject[]; failed: { id: number; reason: any }[];
     }> {
-        const promises = bangumiIds.map(
-            id => this.getSubject(id).then(
-                value => ({ status: 'fulfilled', value, id } as const),
-                reason => ({ status: 'rejected', reason, id } as const)));
-        const results = await Promise.all(promises);
+        const BATCH_SIZE = 50;
+        const chunks: number[][] = [];
+        for (let i = 0; i < bangumiIds.length; i += BATCH_SIZE)
+            chunks.push(bangumiIds.slice(i, i + BATCH_SIZE));
+
+        const results = await Promise.all(chunks.map(ids =>
+            apiClient.post<any, ApiResponse<BangumiSubject[]> & { missing?: number[] }>(
+                '/animes/batch', { ids }).then(
+                response => ({ status: 'fulfilled', value: response, ids } as const),
+                reason => ({ status: 'rejected', reason, ids } as const))));
         const success: BangumiSubject[] = [];
         const failed: { id: number; reason: any }[] = [];
         for (const r of results) {
-            if (r.status === 'fulfilled')
-                success.push(r.value);
-            else if (r.status === 'rejected')
-                failed.push({ id: r.id, reason: r.reason });
+            if (r.status === 'fulfilled') {
+                success.push(...r.value.data);
+                for (const id of r.value.missing ?? [])
+                    failed.push({ id, reason: 'not found' });
+            } else {
+                for (const id of r.ids)
+                    failed.push({ id, reason: r.reason });
+            }
         }
         return { success, failed };
     }
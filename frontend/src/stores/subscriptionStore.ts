@@ -85,12 +85,12 @@ export const useSubscriptionStore = defineStore('subscription', () => {
             // 获取订阅列表
             const response = await subscriptionApiService.getSubscriptions(finalParams)
 
-            // 批量获取番剧详情
-            const animeDetails = await Promise.all(
-                response.subscriptions.map(sub =>
-                    bangumiApiService.getSubject(sub.bangumi_id).catch(() => null)
-                )
+            // 批量获取番剧详情（一次请求）
+            const { success } = await bangumiApiService.batchGetSubjects(
+                response.subscriptions.map(sub => sub.bangumi_id)
             )
+            const subjectMap = new Map(success.map(subject => [subject.id, subject]))
+            const animeDetails = response.subscriptions.map(sub => subjectMap.get(sub.bangumi_id) ?? null)
 
             // 组合数据
             const subscriptionsWithAnime: SubscriptionWithAnime[] = response.subscriptions
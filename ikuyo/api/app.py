@@ -5,16 +5,44 @@ IKuYo动漫资源查询API
 专注于资源获取场景
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from ikuyo.api.routes import bangumi, crawler, health, resources, scheduler, subscription
+from ikuyo.api.metrics_middleware import MetricsMiddleware
+from ikuyo.api.response_cache import ResponseCacheMiddleware, create_response_cache
+from ikuyo.api.routes import (
+    bangumi,
+    crawler,
+    health,
+    metrics,
+    resources,
+    scheduler,
+    subscription,
+)
+from ikuyo.core.bangumi_service import get_bangumi_service
+from ikuyo.core.cache_events import start_invalidation_listener
+from ikuyo.core.cache_service import get_cache_manager
+from ikuyo.core.cache_warmup import CacheWarmer
+from ikuyo.core.config import load_config
 from ikuyo.core.database import create_db_and_tables
+from ikuyo.core.metrics import SHARED_REGISTRY
 from ikuyo.core.redis_client import get_redis_manager
 from ikuyo.core.scheduler import UnifiedScheduler
 
+metrics_config = getattr(load_config(), "metrics", {})
+METRICS_ENABLED = metrics_config.get("enabled", True)
+SHARED_REGISTRY.flush_interval = metrics_config.get("flush_interval", 10)
+
+
+async def run_metrics_flush_loop():
+    """周期性将本进程的请求指标推送到Redis"""
+    while True:
+        await asyncio.sleep(SHARED_REGISTRY.flush_interval)
+        await asyncio.to_thread(SHARED_REGISTRY.flush)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -23,18 +51,63 @@ async def lifespan(app: FastAPI):
     # 初始化Redis连接池
     get_redis_manager()
 
+    # 创建Bangumi API共享连接池
+    bangumi_service = get_bangumi_service()
+    await bangumi_service.start()
+
+    # 热点缓存预刷新
+    refresh_ahead_task = None
+    if bangumi_service.refresh_ahead_enabled:
+        refresh_ahead_task = asyncio.create_task(bangumi_service.run_refresh_ahead_loop())
+
+    # 缓存预热（启动后延迟执行，之后周期执行）
+    cache_warmer = CacheWarmer(bangumi_service)
+    warmup_task = None
+    if cache_warmer.enabled:
+        warmup_task = asyncio.create_task(cache_warmer.run_forever())
+
     # 初始化调度器
     global unified_scheduler
     unified_scheduler = UnifiedScheduler()
     if not unified_scheduler.start():
         raise RuntimeError("调度器启动失败")
 
+    # 启动健康统计后台刷新
+    health.stats_refresher.start()
+
+    # 订阅爬虫发布的缓存失效消息
+    if response_cache:
+        start_invalidation_listener(response_cache.invalidate)
+
+    # 周期推送请求指标
+    metrics_flush_task = None
+    if METRICS_ENABLED:
+        metrics_flush_task = asyncio.create_task(run_metrics_flush_loop())
+
     yield
 
+    # 停止指标推送并推送剩余数据
+    if metrics_flush_task:
+        metrics_flush_task.cancel()
+        SHARED_REGISTRY.flush()
+
+    # 停止健康统计刷新
+    health.stats_refresher.stop()
+
     # 停止调度器
     if unified_scheduler:
         unified_scheduler.stop()
 
+    # 停止热点缓存预刷新、缓存预热并关闭Bangumi API连接池
+    if refresh_ahead_task:
+        refresh_ahead_task.cancel()
+    if warmup_task:
+        warmup_task.cancel()
+    await bangumi_service.aclose()
+
+    # 停止缓存清理线程并落盘待写入的缓存
+    get_cache_manager().close()
+
     # 关闭Redis连接池
     get_redis_manager().close_pool()
 
@@ -50,6 +123,16 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# 响应缓存（需位于CORS中间件内侧，故先于CORS添加）
+response_cache_config = getattr(load_config(), "response_cache", None)
+response_cache = (
+    create_response_cache(response_cache_config)
+    if response_cache_config and response_cache_config.get("enabled", True)
+    else None
+)
+if response_cache:
+    app.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+
 # 添加CORS中间件
 app.add_middleware(
     CORSMiddleware,
@@ -59,6 +142,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 请求指标（最外层，缓存命中与CORS预检同样计入）
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # 注册路由
 app.include_router(health.router, prefix="/api/v1")
 app.include_router(resources.router, prefix="/api/v1")
@@ -67,6 +154,9 @@ app.include_router(crawler.router, prefix="/api/v1")
 app.include_router(scheduler.router, prefix="/api/v1")
 app.include_router(subscription.router, prefix="/api/v1")
 
+# Prometheus指标（按惯例挂载在根路径）
+app.include_router(metrics.router)
+
 
 @app.get("/")
 def root():
@@ -84,6 +174,7 @@ def root():
         "core_endpoints": [
             "/api/v1/animes/calendar",
             "/api/v1/animes/{id}",
+            "/api/v1/animes/batch",
             "/api/v1/animes/{id}/episodes",
             "/api/v1/animes/{id}/resources",
             "/api/v1/animes/search",
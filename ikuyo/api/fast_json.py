@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+快速JSON序列化
+针对已由服务端整理好的可信数据（纯dict/list），跳过Pydantic再校验，
+优先使用orjson，其次msgspec，均未安装时退回标准库json
+"""
+
+import json
+from typing import Any, Callable, Tuple
+
+from fastapi.responses import Response
+
+from ikuyo.core.config import load_config
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _select_dumps() -> Tuple[str, Callable[[Any], bytes]]:
+    """按可用性选择序列化实现"""
+    try:
+        import orjson
+
+        return "orjson", lambda content: orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS
+        )
+    except ImportError:
+        pass
+    try:
+        import msgspec
+
+        return "msgspec", msgspec.json.Encoder().encode
+    except ImportError:
+        pass
+    return "json", _stdlib_dumps
+
+
+SERIALIZER, dumps = _select_dumps()
+
+# 是否启用快速序列化路径（config.yaml: api.fast_json）
+FAST_JSON_ENABLED = bool(getattr(load_config(), "api", {}).get("fast_json", False))
+
+
+class FastJSONResponse(Response):
+    """直接序列化可信数据的JSON响应，不经过response_model校验"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
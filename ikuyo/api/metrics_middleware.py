@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+HTTP请求指标中间件
+按路由模板（如 /api/v1/animes/{bangumi_id}）记录请求耗时直方图与请求数，
+写入跨进程共享指标，多个API进程的数据在 /metrics 汇总
+"""
+
+import time
+from typing import Dict, Pattern
+
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ikuyo.core.metrics import SHARED_REGISTRY
+
+HTTP_REQUEST_DURATION = SHARED_REGISTRY.histogram(
+    "ikuyo_http_request_duration_seconds",
+    "HTTP请求耗时（秒）",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS = SHARED_REGISTRY.counter(
+    "ikuyo_http_requests_total",
+    "HTTP请求数",
+    ["method", "route", "status"],
+)
+
+# 未匹配任何路由的请求统一归为一个标签，避免路径作为标签值无限增长
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    请求指标ASGI中间件
+    应放在最外层，响应缓存命中的请求同样计入
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # 已见过的路由模板 -> 匹配正则，用于识别未经过路由的请求（如响应缓存命中）
+        self._templates: Dict[str, Pattern[str]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            labels = {
+                "method": scope["method"],
+                "route": self._route_template(scope),
+                "status": str(status_code),
+            }
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, **labels)
+            HTTP_REQUESTS.inc(**labels)
+
+    def _route_template(self, scope: Scope) -> str:
+        """取得请求对应的路由模板"""
+        path = scope["path"]
+        route = scope.get("route")
+        template = getattr(route, "path", None)
+        if not template:
+            # 被内层中间件直接响应，按已见过的模板匹配
+            for template, regex in self._templates.items():
+                if regex.match(path):
+                    return template
+            return UNMATCHED_ROUTE
+
+        template = _with_prefix(path, template, getattr(route, "path_regex", None))
+        if template not in self._templates:
+            self._templates[template] = compile_path(template)[0]
+        return template
+
+
+def _with_prefix(path: str, template: str, path_regex) -> str:
+    """
+    补全路由前缀
+    部分FastAPI版本中 scope["route"] 是include_router之前的原始路由，
+    其模板不含前缀（如 /api/v1），此时从请求路径中截取前缀
+    """
+    if path_regex is None or path_regex.match(path):
+        return template
+    for index, char in enumerate(path):
+        if char == "/" and index and path_regex.match(path[index:]):
+            return path[:index] + template
+    return template
@@ -9,6 +9,7 @@ from .schemas import (
     EpisodeResourcesResponse,
     ErrorResponse,
     HealthResponse,
+    LivenessResponse,
     SubtitleGroupData,
     SubtitleGroupResource,
 )
@@ -21,4 +22,5 @@ __all__ = [
     "SubtitleGroupResource",
     "SubtitleGroupData",
     "HealthResponse",
+    "LivenessResponse",
 ]
@@ -82,9 +82,30 @@ class BangumiSubjectResponse(BaseResponse):
     data: dict = Field(..., description="番剧详情数据")
 
 
+class BangumiSubjectBatchRequest(BaseModel):
+    """批量获取番剧详情请求模型"""
+
+    ids: List[int] = Field(..., description="Bangumi ID列表", min_length=1)
+
+
+class BangumiSubjectBatchResponse(BaseResponse):
+    """批量获取番剧详情响应模型"""
+
+    data: List[dict] = Field(..., description="番剧详情数据（按请求顺序）")
+    missing: List[int] = Field(default_factory=list, description="未能获取详情的ID")
+
+
 # =============== 健康检查模型 ===============
 
 
+class LivenessResponse(BaseModel):
+    """存活检查响应模型"""
+
+    status: str = Field(..., description="服务状态")
+    version: str = Field(..., description="API版本")
+    timestamp: str = Field(..., description="检查时间")
+
+
 class HealthResponse(BaseModel):
     """健康检查响应模型"""
 
@@ -93,6 +114,8 @@ class HealthResponse(BaseModel):
     timestamp: str = Field(..., description="检查时间")
     database_status: str = Field(..., description="数据库状态")
     cache_stats: Optional[Dict[str, Any]] = Field(None, description="缓存统计信息")
+    stats: Optional[Dict[str, Any]] = Field(None, description="系统统计快照")
+    stats_updated_at: Optional[str] = Field(None, description="统计快照更新时间")
 
 
 # =============== Bangumi章节模型 ===============
@@ -121,7 +144,7 @@ class BangumiEpisodesResponse(BaseResponse):
     """Bangumi章节列表响应模型"""
 
     data: List[BangumiEpisode] = Field(..., description="章节列表")
-    total: int = Field(..., description="总章节数")
+    total: int = Field(..., description="总章节数（按章节类型筛选后）")
 
 
 class CrawlerTaskCreate(BaseModel):
@@ -129,6 +152,7 @@ class CrawlerTaskCreate(BaseModel):
     year: Optional[int] = None
     season: Optional[Literal["春", "夏", "秋", "冬"]] = None
     limit: Optional[int] = None
+    replay: bool = False  # 只从响应存储回放，不访问站点
 
 
 class TaskResponse(BaseModel):
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+HTTP响应缓存中间件
+针对读多写少的接口缓存序列化后的响应体：
+- 按 路径+规范化查询参数 作为缓存键
+- 生成强ETag并附加Cache-Control，命中If-None-Match时返回304
+- 按标签（如 bangumi:{id}）精确失效，失效消息由爬虫写入数据后发布
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ikuyo.core.cache_events import ALL_TAG, CALENDAR_TAG, SEARCH_TAG, bangumi_tag
+
+logger = logging.getLogger(__name__)
+
+# 不随缓存条目保存的响应头，由中间件重新生成
+_VOLATILE_HEADERS = {b"content-length", b"etag", b"cache-control", b"date", b"server"}
+
+
+@dataclass
+class CachedResponse:
+    """已缓存的响应"""
+
+    body: bytes
+    headers: List[Tuple[bytes, bytes]]
+    etag: str
+    cache_control: str
+    created_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class CacheRule:
+    """缓存规则：匹配的路径、失效标签模板及过期策略"""
+
+    name: str
+    pattern: Pattern[str]
+    tag: str
+    ttl: int
+    max_age: int
+
+    def match(self, path: str) -> Optional[str]:
+        """匹配路径，返回渲染后的失效标签"""
+        m = self.pattern.match(path)
+        if not m:
+            return None
+        return self.tag.format(**m.groupdict())
+
+    @property
+    def cache_control(self) -> str:
+        if self.max_age > 0:
+            return f"public, max-age={self.max_age}"
+        # 客户端每次都需携带ETag校验，命中时只需304
+        return "public, no-cache"
+
+
+class MemoryResponseStore:
+    """进程内LRU响应缓存"""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[CachedResponse, float]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        # 缓存键 -> 标签，条目被淘汰或过期时同步从标签集合中移除
+        self._key_tags: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, key: str) -> bool:
+        """删除条目及其标签索引（调用方持有锁）"""
+        removed = self._entries.pop(key, None) is not None
+        tag = self._key_tags.pop(key, None)
+        if tag is not None:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return removed
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, expires_at = item
+            if time.time() >= expires_at:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse, tag: str, ttl: int) -> None:
+        with self._lock:
+            if self._key_tags.get(key, tag) != tag:
+                self._remove(key)
+            self._entries[key] = (entry, time.time() + ttl)
+            self._entries.move_to_end(key)
+            self._tags.setdefault(tag, set()).add(key)
+            self._key_tags[key] = tag
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags: List[str]) -> int:
+        with self._lock:
+            if ALL_TAG in tags:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._tags.clear()
+                self._key_tags.clear()
+                return removed
+            removed = 0
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    if self._remove(key):
+                        removed += 1
+            return removed
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisResponseStore:
+    """基于Redis的共享响应缓存，多个API副本共用"""
+
+    blocking = True
+    KEY_PREFIX = "ikuyo:resp_cache:"
+    TAG_PREFIX = "ikuyo:resp_cache_tag:"
+
+    def __init__(self):
+        from ikuyo.core.redis_client import get_redis_binary_connection
+
+        self.redis = get_redis_binary_connection()
+
+    def _entry_key(self, key: str) -> str:
+        return self.KEY_PREFIX + hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        raw = self.redis.hgetall(self._entry_key(key))
+        if not raw:
+            return None
+        meta = json.loads(raw[b"meta"])
+        return CachedResponse(
+            body=raw[b"body"],
+            headers=[(k.encode("latin-1"), v.encode("latin-1")) for k, v in meta["headers"]],
+            etag=meta["etag"],
+            cache_control=meta["cache_control"],
+            created_at=meta["created_at"],
+        )
+
+    def set(self, key: str, entry: CachedResponse, tag: str, ttl: int) -> None:
+        entry_key = self._entry_key(key)
+        meta = {
+            "headers": [(k.decode("latin-1"), v.decode("latin-1")) for k, v in entry.headers],
+            "etag": entry.etag,
+            "cache_control": entry.cache_control,
+            "created_at": entry.created_at,
+        }
+        tag_key = self.TAG_PREFIX + tag
+        pipe = self.redis.pipeline()
+        pipe.hset(entry_key, mapping={"body": entry.body, "meta": json.dumps(meta)})
+        pipe.expire(entry_key, ttl)
+        pipe.sadd(tag_key, entry_key)
+        pipe.expire(tag_key, ttl)
+        pipe.execute()
+
+    def invalidate(self, tags: List[str]) -> int:
+        if ALL_TAG in tags:
+            keys = list(self.redis.scan_iter(match=f"{self.KEY_PREFIX}*", count=500))
+            keys += list(self.redis.scan_iter(match=f"{self.TAG_PREFIX}*", count=500))
+            return self.redis.delete(*keys) if keys else 0
+        removed = 0
+        for tag in tags:
+            tag_key = self.TAG_PREFIX + tag
+            members = self.redis.smembers(tag_key)
+            if members:
+                removed += self.redis.delete(*members)
+            self.redis.delete(tag_key)
+        return removed
+
+    def size(self) -> int:
+        return sum(1 for _ in self.redis.scan_iter(match=f"{self.KEY_PREFIX}*", count=500))
+
+
+def build_default_rules(cache_config) -> List[CacheRule]:
+    """根据配置构建默认缓存规则"""
+    ttl_config = cache_config.get("ttl", {}) if cache_config else {}
+    max_age_config = cache_config.get("max_age", {}) if cache_config else {}
+
+    def rule(name: str, pattern: str, tag: str, default_ttl: int) -> CacheRule:
+        return CacheRule(
+            name=name,
+            pattern=re.compile(pattern),
+            tag=tag,
+            ttl=ttl_config.get(name, default_ttl),
+            max_age=max_age_config.get(name, 0),
+        )
+
+    return [
+        rule(
+            "resources",
+            r"^/api/v1/animes/(?P<bangumi_id>\d+)/resources$",
+            bangumi_tag("{bangumi_id}"),
+            86400,
+        ),
+        rule(
+            "availability",
+            r"^/api/v1/animes/(?P<bangumi_id>\d+)/episodes/availability$",
+            bangumi_tag("{bangumi_id}"),
+            86400,
+        ),
+        rule("search", r"^/api/v1/animes/search$", SEARCH_TAG, 3600),
+        rule("calendar", r"^/api/v1/animes/calendar$", CALENDAR_TAG, 3600),
+    ]
+
+
+def _normalize_query(query_string: bytes) -> str:
+    """规范化查询参数顺序，保证等价请求命中同一缓存键"""
+    if not query_string:
+        return ""
+    pairs = parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)
+    return urlencode(sorted(pairs))
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断If-None-Match是否命中当前ETag"""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    """响应缓存：存储后端 + 缓存规则 + 命中统计"""
+
+    def __init__(self, store: Any, rules: List[CacheRule]):
+        self.store = store
+        self.rules = rules
+        self.hits = 0
+        self.misses = 0
+        # 失效代数：每次失效时递增，写入前代数已变化说明响应体可能读取自失效前的数据
+        self._generations: Dict[str, int] = {}
+        self._all_generation = 0
+        self._generation_lock = threading.Lock()
+
+    def generation(self, tag: str) -> Tuple[int, int]:
+        """标签当前的失效代数（在处理请求前记录）"""
+        return self._all_generation, self._generations.get(tag, 0)
+
+    def match_rule(self, path: str) -> Optional[Tuple[CacheRule, str]]:
+        """返回匹配的规则及渲染后的标签"""
+        for rule in self.rules:
+            tag = rule.match(path)
+            if tag is not None:
+                return rule, tag
+        return None
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            if self.store.blocking:
+                return await run_in_threadpool(self.store.get, key)
+            return self.store.get(key)
+        except Exception as e:
+            logger.warning(f"读取响应缓存失败: {e}")
+            return None
+
+    async def set(
+        self,
+        key: str,
+        entry: CachedResponse,
+        tag: str,
+        ttl: int,
+        generation: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        """
+        写入响应缓存
+        generation 为处理请求前记录的失效代数，期间标签被失效时不写入，
+        避免失效前读取的旧数据在失效后被缓存到TTL结束
+        """
+        if generation is not None and self.generation(tag) != generation:
+            return
+        try:
+            if self.store.blocking:
+                await run_in_threadpool(self.store.set, key, entry, tag, ttl)
+            else:
+                self.store.set(key, entry, tag, ttl)
+            if generation is not None and self.generation(tag) != generation:
+                # 写入过程中发生了失效，且失效可能先于写入完成
+                if self.store.blocking:
+                    await run_in_threadpool(self.store.invalidate, [tag])
+                else:
+                    self.store.invalidate([tag])
+        except Exception as e:
+            logger.warning(f"写入响应缓存失败: {e}")
+
+    def invalidate(self, tags: List[str]) -> int:
+        """按标签失效缓存（由失效监听线程调用）"""
+        # 先递增代数再清理，清理前后开始写入的旧响应都会被丢弃
+        with self._generation_lock:
+            if ALL_TAG in tags:
+                self._all_generation += 1
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+        try:
+            removed = self.store.invalidate(tags)
+            logger.info(f"响应缓存已失效: {tags}，清理 {removed} 条")
+            return removed
+        except Exception as e:
+            logger.error(f"失效响应缓存失败: {e}")
+            return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取响应缓存统计"""
+        try:
+            entries = self.store.size()
+        except Exception:
+            entries = None
+        return {
+            "backend": type(self.store).__name__,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def create_response_cache(cache_config) -> ResponseCache:
+    """根据配置创建响应缓存"""
+    backend = cache_config.get("backend", "memory") if cache_config else "memory"
+    if backend == "redis":
+        store = RedisResponseStore()
+    else:
+        store = MemoryResponseStore(
+            max_entries=cache_config.get("max_entries", 2000) if cache_config else 2000
+        )
+    return ResponseCache(store, build_default_rules(cache_config))
+
+
+class ResponseCacheMiddleware:
+    """
+    响应缓存ASGI中间件
+    应放在CORS中间件内侧，缓存的响应体不包含CORS响应头
+    """
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        matched = self.cache.match_rule(scope["path"])
+        if matched is None:
+            await self.app(scope, receive, send)
+            return
+        rule, tag = matched
+
+        cache_key = f"{scope['path']}?{_normalize_query(scope.get('query_string', b''))}"
+        if_none_match = None
+        for name, value in scope.get("headers", []):
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+                break
+
+        entry = await self.cache.get(cache_key)
+        if entry is not None:
+            self.cache.hits += 1
+            await self._send_cached(send, entry, if_none_match, "HIT")
+            return
+
+        self.cache.misses += 1
+        generation = self.cache.generation(tag)
+        start_message: Dict[str, Any] = {}
+        body_parts: List[bytes] = []
+
+        async def capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                start_message.update(message)
+            elif message["type"] == "http.response.body":
+                body_parts.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+
+        body = b"".join(body_parts)
+        status = start_message.get("status", 500)
+        headers = list(start_message.get("headers", []))
+        cacheable = status == 200 and not any(k == b"set-cookie" for k, _ in headers)
+        if not cacheable:
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        entry = CachedResponse(
+            body=body,
+            headers=[(k, v) for k, v in headers if k.lower() not in _VOLATILE_HEADERS],
+            etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            cache_control=rule.cache_control,
+        )
+        await self.cache.set(cache_key, entry, tag, rule.ttl, generation)
+        await self._send_cached(send, entry, if_none_match, "MISS")
+
+    async def _send_cached(
+        self,
+        send: Send,
+        entry: CachedResponse,
+        if_none_match: Optional[str],
+        cache_status: str,
+    ) -> None:
+        """发送缓存响应，ETag命中时返回304"""
+        common_headers = [
+            (b"etag", entry.etag.encode("latin-1")),
+            (b"cache-control", entry.cache_control.encode("latin-1")),
+            (b"x-cache", cache_status.encode("latin-1")),
+        ]
+        if _etag_matches(if_none_match, entry.etag):
+            await send({"type": "http.response.start", "status": 304, "headers": common_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers = entry.headers + common_headers
+        headers.append((b"content-length", str(len(entry.body)).encode("latin-1")))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
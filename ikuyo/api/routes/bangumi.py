@@ -8,19 +8,22 @@ from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Path, Query
 
+from ikuyo.api.fast_json import FAST_JSON_ENABLED, FastJSONResponse
 from ikuyo.api.models.schemas import (
     BangumiCalendarResponse,
     BangumiEpisode,
     BangumiEpisodesResponse,
+    BangumiSubjectBatchRequest,
+    BangumiSubjectBatchResponse,
     BangumiSubjectResponse,
     ErrorResponse,
 )
-from ikuyo.core.bangumi_service import BangumiService
+from ikuyo.core.bangumi_service import UpstreamUnavailableError, get_bangumi_service
 
 router = APIRouter(prefix="/animes", tags=["Animes"])
 
-# 创建BangumiService实例
-bangumi_service = BangumiService()
+# 共享的BangumiService实例
+bangumi_service = get_bangumi_service()
 
 
 @router.get(
@@ -39,6 +42,12 @@ async def get_bangumi_calendar():
         if calendar_data is None:
             raise HTTPException(status_code=500, detail="获取每日放送数据失败")
 
+        # 上游数据原样透传，无需再经response_model逐项校验
+        if FAST_JSON_ENABLED:
+            return FastJSONResponse(
+                {"success": True, "message": "获取每日放送成功", "data": calendar_data}
+            )
+
         return BangumiCalendarResponse(
             success=True, message="获取每日放送成功", data=calendar_data
         )
@@ -49,6 +58,39 @@ async def get_bangumi_calendar():
         raise HTTPException(status_code=500, detail=f"获取每日放送失败: {str(e)}")
 
 
+@router.post(
+    "/batch",
+    response_model=BangumiSubjectBatchResponse,
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+async def get_bangumi_subjects_batch(request: BangumiSubjectBatchRequest):
+    """
+    批量获取番剧详情
+    为搜索页、订阅页一次性提供多张卡片的元数据
+    """
+    if len(request.ids) > bangumi_service.batch_max_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多获取 {bangumi_service.batch_max_ids} 个番剧详情",
+        )
+
+    try:
+        subjects = await bangumi_service.get_subjects(request.ids)
+        ordered_ids = list(dict.fromkeys(request.ids))
+        data = [subjects[i] for i in ordered_ids if i in subjects]
+        missing = [i for i in ordered_ids if i not in subjects]
+
+        return BangumiSubjectBatchResponse(
+            success=True,
+            message=f"获取番剧详情成功 {len(data)}/{len(ordered_ids)}",
+            data=data,
+            missing=missing,
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"批量获取番剧详情失败: {str(e)}")
+
+
 @router.get(
     "/{bangumi_id}",
     response_model=BangumiSubjectResponse,
@@ -82,7 +124,11 @@ async def get_bangumi_subject(
 @router.get(
     "/{subject_id}/episodes",
     response_model=BangumiEpisodesResponse,
-    responses={404: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={
+        404: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
 )
 async def get_bangumi_episodes(
     subject_id: int = Path(..., description="番剧subject_id"),
@@ -94,7 +140,7 @@ async def get_bangumi_episodes(
 ):
     """
     获取番剧章节信息
-    支持分页和筛选，对长篇动画至关重要
+    支持分页和筛选，对长篇动画至关重要；total 为筛选后的章节数
     """
     try:
         episodes_data = await bangumi_service.get_episodes(
@@ -125,5 +171,7 @@ async def get_bangumi_episodes(
 
     except HTTPException:
         raise
+    except UpstreamUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"章节信息暂时无法获取: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取章节信息失败: {str(e)}")
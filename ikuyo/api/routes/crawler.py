@@ -1,5 +1,6 @@
 import asyncio
 import json
+import time
 from typing import List, Union
 
 from fastapi import (
@@ -64,6 +65,13 @@ def _get_task_or_404(task_id: int, repo: CrawlerTaskRepository) -> CrawlerTaskMo
     return task
 
 
+def _enqueue_task(task_id: int) -> None:
+    """将任务ID推送到Redis任务队列"""
+    redis_client = get_redis_connection()
+    message = json.dumps({"task_id": task_id, "enqueued_at": time.time()})
+    redis_client.lpush("ikuyo:crawl_tasks", message)
+
+
 def _get_progress_data(task: CrawlerTaskModel) -> dict:
     """获取任务进度数据"""
     return {
@@ -98,6 +106,9 @@ def create_task(task_create: CrawlerTaskCreate, repo: CrawlerTaskRepository = De
                 )
             parameters["season"] = task_create.season
 
+        if task_create.replay:
+            parameters["replay"] = True
+
         task = TaskFactory.create_task(
             task_type="crawler",
             parameters=parameters,
@@ -114,10 +125,7 @@ def create_task(task_create: CrawlerTaskCreate, repo: CrawlerTaskRepository = De
 
         # 3. 将任务ID推送到Redis队列
         try:
-            redis_client = get_redis_connection()
-            queue_name = "ikuyo:crawl_tasks"
-            message = json.dumps({"task_id": task_id})
-            redis_client.lpush(queue_name, message)
+            _enqueue_task(task_id)
         except Exception as redis_error:
             # 如果Redis推送失败，这是一个严重问题
             # 将任务标记为失败，因为worker无法接收到它
@@ -190,6 +198,36 @@ def cancel_task(task_id: int, repo: CrawlerTaskRepository = Depends(get_repo)):
         )
 
 
+@router.post("/{task_id}/retry", response_model=TaskResponse)
+def retry_task(task_id: int, repo: CrawlerTaskRepository = Depends(get_repo)):
+    """重试失败或已取消的任务：重新入队，爬虫从该任务上次中断处继续（断点续爬）"""
+    task = _get_task_or_404(task_id, repo)
+    if task.status not in ("failed", "cancelled"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"任务状态为 {task.status}，只能重试失败或已取消的任务",
+        )
+
+    previous_status = task.status
+    task.status = "pending"
+    task.started_at = None
+    task.completed_at = None
+    task.error_message = None
+    repo.update(task)
+
+    try:
+        _enqueue_task(task_id)
+    except Exception as redis_error:
+        task.status = previous_status
+        task.error_message = f"Failed to publish task to Redis: {redis_error}"
+        repo.update(task)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"任务无法推送到处理队列: {redis_error}",
+        )
+    return _to_response(task)
+
+
 @router.get("/{task_id}/progress")
 def get_task_progress(task_id: int, repo: CrawlerTaskRepository = Depends(get_repo)):
     """获取任务进度"""
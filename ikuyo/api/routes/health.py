@@ -1,62 +1,87 @@
 #!/usr/bin/env python3
 """
 健康检查路由
-提供API、数据库和缓存状态检查
+- 存活检查：不访问任何外部依赖，常数时间返回
+- 就绪检查/统计：读取后台刷新器维护的内存快照
 """
 
 from datetime import datetime
 
-from fastapi import APIRouter
-from sqlmodel import select
+from fastapi import APIRouter, Response
 
-from ikuyo.api.models.schemas import HealthResponse
-from ikuyo.core.bangumi_service import BangumiService
-from ikuyo.core.database import get_session
-from ikuyo.core.repositories import AnimeRepository
+from ikuyo.api.models.schemas import HealthResponse, LivenessResponse
+from ikuyo.core.bangumi_service import get_bangumi_service
+from ikuyo.core.config import load_config
+from ikuyo.core.health_stats import HealthStatsRefresher
 
 router = APIRouter(prefix="/health", tags=["Health"])
 
-# 创建BangumiService实例
-bangumi_service = BangumiService()
+API_VERSION = "2.0.0"
 
+# 共享的BangumiService实例
+bangumi_service = get_bangumi_service()
 
-@router.get("", response_model=HealthResponse)
+# 创建健康统计刷新器，由应用lifespan负责启动和停止
+health_config = getattr(load_config(), "health", {})
+stats_refresher = HealthStatsRefresher(
+    cache_info_provider=bangumi_service.get_cache_info,
+    interval=health_config.get("stats_refresh_interval", 30),
+)
+
+
+@router.get("", response_model=LivenessResponse)
 def health_check():
     """
-    健康检查接口
-    检查API、数据库和缓存状态
+    存活检查接口
+    仅表明API进程可以响应请求
     """
-    try:
-        # 测试数据库连接（ORM方式）
-        with get_session() as session:
-            # 尝试ORM查询
-            session.exec(select(1)).first()
-            db_status = "healthy"
-            # 数据库统计信息（以Anime表为例，可扩展）
-            anime_repo = AnimeRepository(session)
-            anime_count = len(anime_repo.list(limit=1_000_000))
-            db_stats = {"anime_count": anime_count}
-    except Exception:
-        db_status = "unhealthy"
-        db_stats = {}
-
-    # 获取缓存状态
-    def to_dict_if_config(val):
-        if hasattr(val, "__dict__"):
-            return {k: to_dict_if_config(v) for k, v in val.__dict__.items()}
-        elif isinstance(val, dict):
-            return {k: to_dict_if_config(v) for k, v in val.items()}
-        elif isinstance(val, list):
-            return [to_dict_if_config(v) for v in val]
-        else:
-            return val
-
-    cache_stats = dict(to_dict_if_config(bangumi_service.get_cache_info()))
+    return LivenessResponse(
+        status="healthy",
+        version=API_VERSION,
+        timestamp=datetime.now().isoformat(),
+    )
+
+
+def _build_health_response(response: Response, include_stats: bool) -> HealthResponse:
+    """根据统计快照构造健康检查响应"""
+    snapshot = stats_refresher.get_snapshot()
+    if snapshot is None:
+        response.status_code = 503
+        return HealthResponse(
+            status="starting",
+            version=API_VERSION,
+            timestamp=datetime.now().isoformat(),
+            database_status="unknown",
+        )
+
+    db_status = snapshot["database_status"]
+    if db_status != "healthy":
+        response.status_code = 503
 
     return HealthResponse(
         status="healthy" if db_status == "healthy" else "unhealthy",
-        version="2.0.0",
+        version=API_VERSION,
         timestamp=datetime.now().isoformat(),
         database_status=db_status,
-        cache_stats={**cache_stats, "database": db_stats},
+        cache_stats={**snapshot["cache"], "database": snapshot["database"]},
+        stats=snapshot if include_stats else None,
+        stats_updated_at=datetime.fromtimestamp(snapshot["updated_at"]).isoformat(),
     )
+
+
+@router.get("/ready", response_model=HealthResponse)
+def readiness_check(response: Response):
+    """
+    就绪检查接口
+    数据库不可用或统计尚未就绪时返回503
+    """
+    return _build_health_response(response, include_stats=False)
+
+
+@router.get("/stats", response_model=HealthResponse)
+def health_stats(response: Response):
+    """
+    系统统计接口
+    返回行数、数据库/WAL大小、缓存、队列深度及工作器心跳
+    """
+    return _build_health_response(response, include_stats=True)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+指标路由
+以Prometheus文本格式导出本进程指标及所有进程推送到Redis的共享指标
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from ikuyo.core.cache_service import get_cache_manager
+from ikuyo.core.metrics import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    SHARED_REGISTRY,
+    load_shared_metrics,
+)
+
+router = APIRouter(tags=["Metrics"])
+
+# 确保缓存指标采集回调已注册
+get_cache_manager()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus抓取接口"""
+    content = REGISTRY.render()
+    try:
+        # 先推送本进程的增量，再读取所有进程汇总后的共享指标
+        SHARED_REGISTRY.flush()
+        content += load_shared_metrics().render()
+    except Exception as e:
+        content += f"# 读取共享指标失败: {e}\n"
+    return Response(content=content, media_type=CONTENT_TYPE_LATEST)
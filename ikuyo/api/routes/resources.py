@@ -9,6 +9,7 @@ from typing import Dict, Optional
 
 from fastapi import APIRouter, HTTPException, Path, Query
 
+from ikuyo.api.fast_json import FAST_JSON_ENABLED, FastJSONResponse
 from ikuyo.api.models.schemas import (
     EpisodeAvailabilityResponse,
     EpisodeResourcesResponse,
@@ -58,6 +59,18 @@ def get_resolution_priority(resolution: str) -> int:
     return priority_map.get(resolution or "", 99)
 
 
+def _resource_sort_key(resource: dict):
+    """字幕组内资源排序：集数 > 字幕类型优先级 > 分辨率优先级"""
+    title = resource["title"]
+    return (
+        int(title.split("第")[-1].split("集")[0])
+        if "第" in title and "集" in title
+        else 999,
+        get_subtitle_type_priority(resource["subtitle_type"]),
+        get_resolution_priority(resource["resolution"]),
+    )
+
+
 @router.get(
     "/{bangumi_id}/resources",
     response_model=EpisodeResourcesResponse,
@@ -124,47 +137,43 @@ def get_anime_resources(
                     success=True, message=error_msg, data=data
                 )
 
-            # 按字幕组分类
+            # 按字幕组分类（直接构造可信的dict，避免逐条模型校验）
             subtitle_groups: Dict[int, Dict] = {}
             for resource in resources:
                 group_id = int(resource.subtitle_group_id or 0)
-                group = subtitle_group_repo.get_by_id(group_id)
-                group_name = group.name if group else "未知字幕组"
                 if group_id not in subtitle_groups:
+                    group = subtitle_group_repo.get_by_id(group_id)
                     subtitle_groups[group_id] = {
                         "id": group_id,
-                        "name": group_name,
+                        "name": group.name if group else "未知字幕组",
                         "resource_count": 0,
                         "resources": [],
                     }
-                resource_obj = SubtitleGroupResource(
-                    id=int(resource.id or 0),
-                    title=resource.title or "",
-                    resolution=resource.resolution or "",
-                    subtitle_type=resource.subtitle_type or "",
-                    file_size=resource.file_size or "",
-                    magnet_url=resource.magnet_url or "",
-                    torrent_url=resource.torrent_url or "",
-                    release_date=(
-                        datetime.fromtimestamp(resource.release_date).isoformat()
-                        if resource.release_date
-                        else None
-                    ),
+                subtitle_groups[group_id]["resources"].append(
+                    {
+                        "id": int(resource.id or 0),
+                        "title": resource.title or "",
+                        "resolution": resource.resolution or "",
+                        "subtitle_type": resource.subtitle_type or "",
+                        "file_size": resource.file_size or "",
+                        "magnet_url": resource.magnet_url or "",
+                        "torrent_url": resource.torrent_url or "",
+                        "release_date": (
+                            datetime.fromtimestamp(resource.release_date).isoformat()
+                            if resource.release_date
+                            else None
+                        ),
+                    }
                 )
-                subtitle_groups[group_id]["resources"].append(resource_obj)
                 subtitle_groups[group_id]["resource_count"] += 1
 
             # 对每个字幕组内的资源进行排序
             for group_data in subtitle_groups.values():
-                group_data["resources"].sort(
-                    key=lambda x: (
-                        int(x.title.split("第")[-1].split("集")[0])
-                        if "第" in x.title and "集" in x.title
-                        else 999,
-                        get_subtitle_type_priority(x.subtitle_type),
-                        get_resolution_priority(x.resolution),
-                    )
-                )
+                group_data["resources"].sort(key=_resource_sort_key)
+                if not FAST_JSON_ENABLED:
+                    group_data["resources"] = [
+                        SubtitleGroupResource(**r) for r in group_data["resources"]
+                    ]
 
             data = {
                 "bangumi_id": bangumi_id,
@@ -178,6 +187,10 @@ def get_anime_resources(
                     "total": total_resources,
                 },
             }
+            if FAST_JSON_ENABLED:
+                return FastJSONResponse(
+                    {"success": True, "message": "获取资源成功", "data": data}
+                )
             return EpisodeResourcesResponse(
                 success=True, message="获取资源成功", data=data
             )
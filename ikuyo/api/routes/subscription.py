@@ -3,15 +3,15 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlmodel import Session
 
-from ikuyo.core.bangumi_service import BangumiService
-from ikuyo.core.database import get_session
+from ikuyo.core.bangumi_service import get_bangumi_service
+from ikuyo.core.database import get_request_session
 from ikuyo.core.models.user_subscription import UserSubscription
 from ikuyo.core.repositories.subscription_repository import SubscriptionRepository
 
 router = APIRouter(prefix="/subscriptions", tags=["subscriptions"])
 
-# 创建BangumiService实例
-bangumi_service = BangumiService()
+# 共享的BangumiService实例
+bangumi_service = get_bangumi_service()
 
 
 def get_user_id(x_user_id: str = Header(..., description="用户UUID")) -> str:
@@ -23,7 +23,7 @@ def get_user_id(x_user_id: str = Header(..., description="用户UUID")) -> str:
 async def subscribe(
     bangumi_id: int,
     user_id: str = Depends(get_user_id),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_request_session)
 ):
     """添加订阅"""
     repo = SubscriptionRepository(session)
@@ -60,7 +60,7 @@ async def get_subscriptions(
     search: Optional[str] = Query(None, description="搜索关键词"),
     page: int = Query(1, ge=1, description="页码"),
     limit: int = Query(20, ge=1, le=100, description="每页数量"),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_request_session)
 ):
     """获取订阅列表"""
     repo = SubscriptionRepository(session)
@@ -89,7 +89,7 @@ async def get_subscriptions(
 async def unsubscribe(
     bangumi_id: int,
     user_id: str = Depends(get_user_id),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_request_session)
 ):
     """取消订阅"""
     repo = SubscriptionRepository(session)
@@ -101,7 +101,7 @@ async def unsubscribe(
 @router.get("/ids")
 async def get_subscription_ids(
     user_id: str = Depends(get_user_id),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_request_session)
 ):
     """
     获取当前用户所有已订阅番剧的bangumi_id列表（轻量接口）
@@ -115,7 +115,7 @@ async def get_subscription_ids(
 async def check_subscription(
     bangumi_id: int,
     user_id: str = Depends(get_user_id),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_request_session)
 ):
     """检查订阅状态"""
     repo = SubscriptionRepository(session)
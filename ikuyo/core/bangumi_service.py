@@ -4,151 +4,544 @@ Bangumi API 服务模块
 提供对 Bangumi.tv API 的封装，包括缓存机制
 """
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import importlib.util
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 import httpx
+from cachetools import LRUCache
 
-from .cache_service import CacheManager
+from .cache_service import get_cache_manager
+from .config import load_config
+from .metrics import REGISTRY
+from .singleflight import SingleFlight
+
+# 需要重试的HTTP状态码：限流及服务端错误
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "ikuyo_upstream_request_duration_seconds", "Bangumi API单次请求耗时", ("endpoint",)
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "ikuyo_upstream_requests_total", "Bangumi API请求次数", ("endpoint", "status")
+)
+UPSTREAM_ENDPOINTS = ("calendar", "subject", "episodes")
+
+# Retry-After 允许等待的最长时间（秒），避免单个请求被长时间挂起
+MAX_RETRY_AFTER = 30.0
+
+
+class UpstreamUnavailableError(Exception):
+    """上游数据暂时无法完整获取（如章节列表的部分分页失败），区别于资源不存在"""
+
+
+def _endpoint_label(url: str) -> str:
+    """将请求路径归类为指标标签，避免按subject_id产生无限多的标签值"""
+    if "/episodes" in url:
+        return "episodes"
+    if "/subjects/" in url:
+        return "subject"
+    if url.rstrip("/").endswith("/calendar"):
+        return "calendar"
+    return "other"
+
+
+def calendar_cache_key() -> str:
+    return "bangumi_calendar"
+
+
+def subject_cache_key(subject_id: int) -> str:
+    return f"bangumi_subject_{subject_id}"
+
+
+def episodes_cache_key(subject_id: int) -> str:
+    # 每个番剧缓存一份完整章节列表，分页与类型筛选在内存中完成
+    return f"bangumi_episodes_{subject_id}"
+
+
+def _episode_sort_key(episode: Dict[str, Any]):
+    return (episode.get("type", 0), episode.get("sort", 0), episode.get("id", 0))
 
 
 class BangumiService:
     """Bangumi API 服务"""
 
     def __init__(self):
-        self.base_url = "https://api.bgm.tv"
-        self.cache = CacheManager()
+        bangumi_config = getattr(load_config(), "bangumi", {})
+        self.base_url = bangumi_config.get("base_url", "https://api.bgm.tv").rstrip("/")
+        self.timeout = float(bangumi_config.get("timeout", 10))
+        self.user_agent = bangumi_config.get("user_agent", "IKuYo/2.0.0")
+        self.max_connections = bangumi_config.get("max_connections", 20)
+        self.max_keepalive_connections = bangumi_config.get("max_keepalive_connections", 10)
+        self.keepalive_expiry = float(bangumi_config.get("keepalive_expiry", 30))
+        self.retries = bangumi_config.get("retries", 2)
+        # 批量接口：单次最多ID数及所有批量请求共享的上游并发上限
+        self.batch_max_ids = bangumi_config.get("batch_max_ids", 50)
+        self.batch_concurrency = bangumi_config.get("batch_concurrency", 8)
+        # 章节列表分页抓取：每页条数及单个番剧的并行页数
+        self.episode_page_size = bangumi_config.get("episode_page_size", 200)
+        self.episode_fetch_concurrency = bangumi_config.get("episode_fetch_concurrency", 4)
+        self.retry_backoff = float(bangumi_config.get("retry_backoff", 0.5))
+        # HTTP/2 依赖 h2 包，未安装时退回 HTTP/1.1 keep-alive
+        self.http2 = bool(bangumi_config.get("http2", True)) and (
+            importlib.util.find_spec("h2") is not None
+        )
 
-    async def _make_request(self, url: str) -> Optional[Dict[str, Any]]:
-        """发起HTTP请求"""
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                return response.json()
-        except Exception as e:
-            print(f"请求失败 {url}: {e}")
-            return None
+        self.cache = get_cache_manager()
+        # 按缓存键合并并发的上游请求
+        self.inflight = SingleFlight()
+        # 缓存键 -> 重新获取该键数据的协程函数，供后台刷新使用
+        self._refreshers: LRUCache = LRUCache(maxsize=4096)
+        self._background_tasks: Set[asyncio.Task] = set()
+        refresh_ahead = getattr(self.cache.cache_config, "refresh_ahead", {})
+        self.refresh_ahead_enabled = refresh_ahead.get("enabled", True)
+        self.refresh_ahead_interval = refresh_ahead.get("interval", 60)
+        self._client: Optional[httpx.AsyncClient] = None
+        # 在事件循环内按需创建（Python 3.9 的Semaphore会绑定创建时的事件循环）
+        self._batch_semaphore: Optional[asyncio.Semaphore] = None
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """创建共享的连接池客户端"""
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            headers={"User-Agent": self.user_agent, "Accept": "application/json"},
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """共享客户端；未经lifespan启动时（如脚本中直接使用）按需创建"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    async def start(self) -> None:
+        """在应用启动时创建共享客户端"""
+        _ = self.client
+        print(f"🔌 Bangumi API 客户端已就绪 (http2={self.http2})")
+
+    async def aclose(self) -> None:
+        """在应用关闭时释放连接池"""
+        for task in list(self._background_tasks):
+            task.cancel()
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """计算重试等待时间：优先遵循Retry-After，否则指数退避"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(max(float(retry_after), 0.0), MAX_RETRY_AFTER)
+                except ValueError:
+                    pass
+        return self.retry_backoff * (2**attempt)
+
+    async def _make_request(
+        self, url: str, params: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        发起HTTP请求
+        对网络错误、429及5xx响应按指数退避重试，其余错误直接返回None
+
+        Args:
+            url: 相对于base_url的路径（也接受完整URL）
+            params: 查询参数
+        """
+        endpoint = _endpoint_label(url)
+        for attempt in range(self.retries + 1):
+            response = None
+            started = time.perf_counter()
+            try:
+                try:
+                    response = await self.client.get(url, params=params)
+                finally:
+                    UPSTREAM_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint)
+                    UPSTREAM_REQUESTS.inc(
+                        endpoint=endpoint,
+                        status=str(response.status_code) if response is not None else "error",
+                    )
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt == self.retries
+                ):
+                    response.raise_for_status()
+                    return response.json()
+            except httpx.TransportError as e:
+                if attempt == self.retries:
+                    print(f"请求失败 {url}: {e}")
+                    return None
+            except Exception as e:
+                print(f"请求失败 {url}: {e}")
+                return None
+
+            delay = self._retry_delay(attempt, response)
+            reason = response.status_code if response is not None else "网络错误"
+            print(f"🔁 请求 {url} 失败({reason})，{delay:.1f}秒后重试")
+            await asyncio.sleep(delay)
+
+        return None
+
+    async def _get_or_fetch(
+        self,
+        cache_key: str,
+        cache_type: str,
+        fetch: Callable[[], Awaitable[Any]],
+        description: str,
+        wait_for_refresh: bool = False,
+        refresher: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        读取缓存，未命中时（合并后）请求上游
+        超过软TTL的数据照常返回，同时在后台刷新；
+        wait_for_refresh 为True时改为等待刷新完成（刷新失败时返回旧数据），
+        供需要限制自身并发的调用方（如缓存预热）使用
+        refresher 为登记给提前刷新的获取函数，默认即 fetch（fetch 带有调用方自己的限速时另行传入）
+        """
+        self._refreshers[cache_key] = refresher or fetch
+
+        entry = await self.cache.aget_entry(cache_key, cache_type)
+        if entry and entry.data:
+            if entry.stale and wait_for_refresh:
+                print(f"♻️ 缓存已陈旧，刷新: {description}")
+                return await self.inflight.do(cache_key, fetch) or entry.data
+            if entry.stale:
+                print(f"♻️ 缓存已陈旧，返回旧数据并后台刷新: {description}")
+                self._refresh_in_background(cache_key, fetch)
+            else:
+                print(f"📦 从缓存获取{description}")
+            return entry.data
+
+        # 同一时刻只有一个请求打到上游
+        return await self.inflight.do(cache_key, fetch)
+
+    async def is_fresh(self, cache_key: str, cache_type: str) -> bool:
+        """缓存中是否有未超过软TTL的数据（不计入热点访问）"""
+        entry = await self.cache.aget_entry(cache_key, cache_type, record_access=False)
+        return bool(entry and entry.data and not entry.stale)
+
+    def _refresh_in_background(
+        self, cache_key: str, fetch: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """在后台刷新缓存键，已有进行中的请求时跳过"""
+        if self.inflight.is_inflight(cache_key):
+            return
+        task = asyncio.create_task(self.inflight.do(cache_key, fetch))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_done)
+
+    def _on_background_done(self, task: "asyncio.Task") -> None:
+        """后台刷新结束：移除任务引用并记录异常（陈旧数据继续提供服务）"""
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"后台刷新缓存失败: {task.exception()}")
+
+    def refresh_hot_keys(self) -> int:
+        """
+        主动刷新即将过期的热点键
+
+        Returns:
+            int: 本次触发刷新的键数量
+        """
+        count = 0
+        for cache_key, _ in self.cache.get_hot_keys_due():
+            fetch = self._refreshers.get(cache_key)
+            if fetch is None or self.inflight.is_inflight(cache_key):
+                continue
+            self._refresh_in_background(cache_key, fetch)
+            count += 1
+        if count:
+            print(f"🔥 已触发 {count} 个热点缓存预刷新")
+        return count
+
+    async def run_refresh_ahead_loop(self) -> None:
+        """周期性检查热点键，由应用lifespan启动并在关闭时取消"""
+        while True:
+            await asyncio.sleep(self.refresh_ahead_interval)
+            try:
+                self.refresh_hot_keys()
+            except Exception as e:
+                print(f"热点缓存预刷新失败: {e}")
 
     async def get_calendar(self) -> Optional[List[Dict[str, Any]]]:
         """
         获取每日放送数据
         优先从缓存获取，缓存失效时从API获取
         """
-        cache_key = "bangumi_calendar"
-
-        # 尝试从缓存获取
-        cached_data = self.cache.get(cache_key, "calendar")
-        if cached_data:
-            print("📦 从缓存获取每日放送数据")
-            return cached_data
+        cache_key = calendar_cache_key()
+        return await self._get_or_fetch(
+            cache_key,
+            "calendar",
+            lambda: self._fetch_calendar(cache_key),
+            "每日放送数据",
+        )
 
-        # 从API获取新数据
+    async def _fetch_calendar(self, cache_key: str) -> Optional[List[Dict[str, Any]]]:
+        """从API获取每日放送数据并写入缓存"""
         print("🌐 从API获取每日放送数据")
-        url = f"{self.base_url}/calendar"
-
-        api_data = await self._make_request(url)
+        api_data = await self._make_request("/calendar")
         if api_data and isinstance(api_data, list):
-            self.cache.set(cache_key, api_data, "calendar")
+            await self.cache.aset(cache_key, api_data, "calendar")
             print("✅ 每日放送数据已缓存")
             return api_data
 
         return None
 
-    async def get_subject(self, subject_id: int) -> Optional[Dict[str, Any]]:
+    async def get_subject(
+        self, subject_id: int, wait_for_refresh: bool = False
+    ) -> Optional[Dict[str, Any]]:
         """
         获取番剧详情
         优先从缓存获取，缓存失效时从API获取
         """
-        cache_key = f"bangumi_subject_{subject_id}"
-
-        # 尝试从缓存获取
-        cached_data = self.cache.get(cache_key, "subject")
-        if cached_data:
-            print(f"📦 从缓存获取番剧详情: {subject_id}")
-            return cached_data
+        cache_key = subject_cache_key(subject_id)
+        return await self._get_or_fetch(
+            cache_key,
+            "subject",
+            lambda: self._fetch_subject(cache_key, subject_id),
+            f"番剧详情: {subject_id}",
+            wait_for_refresh,
+        )
 
-        # 从API获取新数据
+    async def _fetch_subject(
+        self, cache_key: str, subject_id: int
+    ) -> Optional[Dict[str, Any]]:
+        """从API获取番剧详情并写入缓存"""
         print(f"🌐 从API获取番剧详情: {subject_id}")
-        url = f"{self.base_url}/v0/subjects/{subject_id}"
-
-        api_data = await self._make_request(url)
+        api_data = await self._make_request(f"/v0/subjects/{subject_id}")
         if api_data:
-            self.cache.set(cache_key, api_data, "subject")
+            await self.cache.aset(cache_key, api_data, "subject")
             print(f"✅ 番剧详情已缓存: {subject_id}")
             return api_data
 
         return None
 
+    async def get_subjects(self, subject_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        批量获取番剧详情
+        缓存命中的直接返回，未命中的并发请求上游；
+        并发数受所有批量请求共享的信号量限制
+
+        Returns:
+            Dict[int, Dict]: subject_id -> 详情，获取失败的ID不在结果中
+        """
+        if self._batch_semaphore is None:
+            self._batch_semaphore = asyncio.Semaphore(self.batch_concurrency)
+        semaphore = self._batch_semaphore
+
+        async def fetch_one(subject_id: int) -> Optional[Dict[str, Any]]:
+            if await self.is_fresh(subject_cache_key(subject_id), "subject"):
+                return await self.get_subject(subject_id)
+            async with semaphore:
+                return await self.get_subject(subject_id)
+
+        unique_ids = list(dict.fromkeys(subject_ids))
+        results = await asyncio.gather(
+            *(fetch_one(subject_id) for subject_id in unique_ids), return_exceptions=True
+        )
+        subjects = {}
+        for subject_id, result in zip(unique_ids, results):
+            if isinstance(result, Exception):
+                print(f"批量获取番剧详情失败 {subject_id}: {result}")
+            elif result:
+                subjects[subject_id] = result
+        return subjects
+
     async def get_episodes(
         self,
         subject_id: int,
         episode_type: Optional[int] = None,
         limit: int = 100,
         offset: int = 0,
+        wait_for_refresh: bool = False,
+        acquire: Optional[Callable[[], Awaitable[None]]] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         获取番剧章节信息
-        支持分页获取，对长篇动画至关重要
+        缓存中保存番剧的完整章节列表，任意分页与类型筛选都从中切片，
+        长篇动画也只需缓存一份
 
         Args:
             subject_id: 番剧ID
             episode_type: 章节类型筛选 (0:正片, 1:SP, 2:OP, 3:ED, 4:PV, 6:其他)
-            limit: 返回数量限制（长篇动画需要1000）
+            limit: 返回数量限制
             offset: 偏移量
-        """
-        # 构建缓存键，包含筛选参数
-        type_suffix = f"_type_{episode_type}" if episode_type is not None else ""
-        cache_key = f"bangumi_episodes_{subject_id}{type_suffix}_{limit}_{offset}"
+            wait_for_refresh: 缓存陈旧时等待刷新完成而不是在后台刷新
+            acquire: 每次请求上游分页前等待的钩子（如缓存预热的限速器），章节列表可能需要多页请求
 
-        # 尝试从缓存获取
-        cached_data = self.cache.get(cache_key, "episodes")
-        if cached_data:
-            print(
-                f"📦 从缓存获取章节信息: {subject_id} (limit={limit}, offset={offset})"
-            )
-            return cached_data
+        Returns:
+            data 为切片后的章节，total 为按 episode_type 筛选后的章节数（未筛选时即全部章节数）；
+            番剧不存在或首页请求失败时返回None
 
-        # 从API获取新数据
-        print(f"🌐 从API获取章节信息: {subject_id} (limit={limit}, offset={offset})")
-        url = f"{self.base_url}/v0/episodes"
+        Raises:
+            UpstreamUnavailableError: 没有缓存且部分分页重试后仍失败
+        """
+        cache_key = episodes_cache_key(subject_id)
+
+        all_episodes = await self._get_or_fetch(
+            cache_key,
+            "episodes",
+            lambda: self._fetch_all_episodes(cache_key, subject_id, acquire),
+            f"章节信息: {subject_id}",
+            wait_for_refresh,
+            refresher=lambda: self._fetch_all_episodes(cache_key, subject_id),
+        )
+        if all_episodes is None:
+            return None
 
-        # 构建请求参数
-        params = {"subject_id": subject_id, "limit": limit, "offset": offset}
+        episodes = all_episodes["data"]
         if episode_type is not None:
-            params["type"] = episode_type
+            episodes = [ep for ep in episodes if ep.get("type") == episode_type]
+
+        return {
+            "data": episodes[offset : offset + limit],
+            "total": len(episodes),
+            "limit": limit,
+            "offset": offset,
+        }
+
+    async def _fetch_episode_pages(
+        self,
+        subject_id: int,
+        start: int = 0,
+        acquire: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+        """
+        从start开始抓取章节列表的剩余部分
+        先请求第一页得到total，其余页并行请求；每页请求前先等待 acquire（如有）
+
+        Returns:
+            (章节列表, 上游total)，第一页失败时返回None
+
+        Raises:
+            UpstreamUnavailableError: 其余分页重试一次后仍有失败
+        """
+        page_size = self.episode_page_size
+
+        async def fetch_page(offset: int) -> Optional[Dict[str, Any]]:
+            params = {"subject_id": subject_id, "limit": page_size, "offset": offset}
+            if acquire is not None:
+                await acquire()
+            api_data = await self._make_request("/v0/episodes", params=params)
+            return api_data if isinstance(api_data, dict) else None
+
+        first_page = await fetch_page(start)
+        if first_page is None:
+            return None
+        total = first_page.get("total", 0)
+
+        semaphore = asyncio.Semaphore(self.episode_fetch_concurrency)
+
+        async def fetch_limited(offset: int) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await fetch_page(offset)
+
+        pages = [first_page] + list(
+            await asyncio.gather(
+                *(fetch_limited(offset) for offset in range(start + page_size, total, page_size))
+            )
+        )
+        # 失败的分页再重试一次（_make_request 内部已按网络错误/5xx退避重试）
+        offsets = [start + index * page_size for index in range(len(pages))]
+        for index, page in enumerate(pages):
+            if page is None:
+                pages[index] = await fetch_page(offsets[index])
+        failed = [offsets[index] for index, page in enumerate(pages) if page is None]
+        if failed:
+            raise UpstreamUnavailableError(f"章节分页获取失败 {subject_id}: offset={failed}")
 
+        episodes = [ep for page in pages for ep in page.get("data", [])]
+        return episodes, total
+
+    async def _refresh_episode_tail(
+        self,
+        subject_id: int,
+        existing: List[Dict[str, Any]],
+        acquire: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        增量刷新：只重新抓取最后一页及其后的新章节，按ID合并
+        合并后数量与上游total不一致（如中间插入或删除了章节）时返回None，由调用方全量抓取
+        """
+        start = max(0, len(existing) - self.episode_page_size)
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                api_data = response.json()
-
-                # API返回的数据结构处理
-                episodes_data = {
-                    "data": api_data.get("data", []),
-                    "total": api_data.get("total", 0),
-                    "limit": api_data.get("limit", limit),
-                    "offset": api_data.get("offset", offset),
-                }
-
-                # 存入缓存
-                self.cache.set(cache_key, episodes_data, "episodes")
-                episodes_count = len(episodes_data["data"])
-                total_count = episodes_data["total"]
-                print(
-                    f"✅ 章节信息已缓存: {subject_id} ({episodes_count}/{total_count} 个章节)"
-                )
-
-                return episodes_data
-
-        except Exception as e:
-            print(f"获取章节信息失败 {subject_id}: {e}")
+            result = await self._fetch_episode_pages(subject_id, start, acquire)
+        except UpstreamUnavailableError:
+            return None
+        if result is None:
+            return None
+        fetched, total = result
 
-        return None
+        merged = {ep["id"]: ep for ep in existing if "id" in ep}
+        for ep in fetched:
+            if "id" in ep:
+                merged[ep["id"]] = ep
+        if len(merged) != total:
+            return None
+
+        new_count = len(merged) - len(existing)
+        print(f"🔄 章节增量刷新: {subject_id} (新增 {new_count} 个章节)")
+        return list(merged.values())
+
+    async def _fetch_all_episodes(
+        self,
+        cache_key: str,
+        subject_id: int,
+        acquire: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        从API获取完整章节列表并写入缓存；已有（陈旧）缓存时优先增量刷新
+        抓取失败时返回已缓存的列表（不写回，仍为陈旧状态，之后继续尝试刷新），
+        没有缓存时部分分页失败抛出 UpstreamUnavailableError
+        """
+        previous = await self.cache.aget_entry(cache_key, "episodes", record_access=False)
+        existing = previous.data.get("data") if previous and previous.data else None
+
+        episodes = None
+        if existing:
+            episodes = await self._refresh_episode_tail(subject_id, existing, acquire)
+
+        if episodes is None:
+            print(f"🌐 从API获取全部章节: {subject_id}")
+            try:
+                result = await self._fetch_episode_pages(subject_id, acquire=acquire)
+            except UpstreamUnavailableError:
+                if existing:
+                    print(f"获取章节信息失败，继续使用已缓存的列表 {subject_id}")
+                    return previous.data
+                raise
+            if result is None:
+                print(f"获取章节信息失败 {subject_id}")
+                return previous.data if existing else None
+            episodes = result[0]
+
+        episodes.sort(key=_episode_sort_key)
+        episodes_data = {"data": episodes, "total": len(episodes)}
+
+        # 存入缓存
+        await self.cache.aset(cache_key, episodes_data, "episodes")
+        print(f"✅ 章节信息已缓存: {subject_id} ({len(episodes)} 个章节)")
+
+        return episodes_data
 
     def get_cache_info(self) -> Dict[str, Any]:
         """获取缓存状态信息"""
-        return self.cache.get_cache_info()
+        cache_info = self.cache.get_cache_info()
+        cache_info["upstream_inflight"] = self.inflight.inflight_count()
+        cache_info["upstream_deduplicated"] = self.inflight.deduplicated
+        cache_info["upstream_latency"] = {
+            endpoint: UPSTREAM_LATENCY.summary(endpoint=endpoint)
+            for endpoint in UPSTREAM_ENDPOINTS
+        }
+        return cache_info
 
     def clear_cache(self, cache_key: Optional[str] = None) -> None:
         """清理缓存"""
@@ -157,3 +550,14 @@ class BangumiService:
             print(f"✅ 已清理缓存: {cache_key}")
         else:
             print("✅ 已清理全部缓存")
+
+
+_bangumi_service: Optional[BangumiService] = None
+
+
+def get_bangumi_service() -> BangumiService:
+    """获取进程内共享的BangumiService实例（共用缓存与连接池）"""
+    global _bangumi_service
+    if _bangumi_service is None:
+        _bangumi_service = BangumiService()
+    return _bangumi_service
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+缓存失效事件
+爬虫进程写入新数据后通过 Redis 发布失效标签，API 进程订阅后精确清理响应缓存
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Callable, Iterable, List
+
+from ikuyo.core.redis_client import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "ikuyo:response_cache:invalidate"
+
+# 与动画库搜索结果相关的标签，新增或更新动画时失效
+SEARCH_TAG = "search"
+# 与每日放送相关的标签
+CALENDAR_TAG = "calendar"
+# 特殊标签：失效全部缓存（订阅中断期间可能漏掉消息时使用）
+ALL_TAG = "*"
+
+# 订阅中断后的重试间隔（秒）
+RESUBSCRIBE_INTERVAL = 10
+
+
+def bangumi_tag(bangumi_id) -> str:
+    """单个番剧（资源列表、集数可用性）对应的缓存标签"""
+    return f"bangumi:{bangumi_id}"
+
+
+def publish_invalidation(tags: Iterable[str]) -> bool:
+    """
+    发布缓存失效消息
+
+    Args:
+        tags: 需要失效的缓存标签
+
+    Returns:
+        bool: 是否发布成功
+    """
+    tag_list: List[str] = sorted(set(tags))
+    if not tag_list:
+        return True
+    try:
+        get_redis_connection().publish(INVALIDATION_CHANNEL, json.dumps({"tags": tag_list}))
+        logger.debug(f"已发布缓存失效消息: {tag_list}")
+        return True
+    except Exception as e:
+        logger.error(f"发布缓存失效消息失败: {e}")
+        return False
+
+
+def start_invalidation_listener(on_invalidate: Callable[[List[str]], None]) -> threading.Thread:
+    """
+    启动一个线程订阅缓存失效消息
+
+    Args:
+        on_invalidate: 收到失效标签时的回调
+    """
+    thread = threading.Thread(
+        target=_consume_invalidations,
+        args=(on_invalidate,),
+        daemon=True,
+        name="CacheInvalidationListener",
+    )
+    thread.start()
+    logger.info("缓存失效监听器已启动。")
+    return thread
+
+
+def _consume_invalidations(on_invalidate: Callable[[List[str]], None]) -> None:
+    """实际消费失效消息的逻辑，连接中断后自动重新订阅"""
+    interrupted = False
+    while True:
+        try:
+            pubsub = get_redis_connection().pubsub()
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            if interrupted:
+                # 中断期间可能错过失效消息，保守地清空全部缓存
+                on_invalidate([ALL_TAG])
+                interrupted = False
+
+            for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    tags = json.loads(message["data"]).get("tags", [])
+                    on_invalidate(tags)
+                except Exception as e:
+                    logger.error(f"处理缓存失效消息时出错: {e}, 消息: {message}")
+        except Exception as e:
+            interrupted = True
+            logger.warning(
+                f"缓存失效订阅中断，{RESUBSCRIBE_INTERVAL}秒后重试: {e}"
+            )
+            time.sleep(RESUBSCRIBE_INTERVAL)
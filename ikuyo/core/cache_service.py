@@ -1,27 +1,84 @@
 #!/usr/bin/env python3
 """
 缓存服务模块
-提供多层缓存机制：内存缓存 + 文件缓存
+提供多层缓存机制：内存缓存 + 可选Redis共享缓存 + SQLite持久化存储
 基于cachetools实现高性能TTL缓存
 """
 
-import json
+import asyncio
 import os
 import threading
 import time
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 
 from cachetools import TTLCache
 
+from .cache_store import RedisCacheStore, SQLiteCacheStore
 from .config import load_config
+from .metrics import REGISTRY
+
+# 持久化存储文件名（位于cache_dir下）
+CACHE_STORE_FILENAME = "cache.db"
+
+
+CACHE_TYPES = ["calendar", "subject", "episodes", "default"]
+
+CACHE_HITS = REGISTRY.counter(
+    "ikuyo_cache_hits_total", "缓存命中次数", ("cache_type", "tier")
+)
+CACHE_MISSES = REGISTRY.counter("ikuyo_cache_misses_total", "缓存未命中次数", ("cache_type",))
+CACHE_STALE_HITS = REGISTRY.counter(
+    "ikuyo_cache_stale_hits_total", "命中但已超过软TTL的次数", ("cache_type",)
+)
+CACHE_EVICTIONS = REGISTRY.counter(
+    "ikuyo_cache_evictions_total", "内存缓存因容量不足淘汰的条目数", ("cache_type",)
+)
+CACHE_EXPIRATIONS = REGISTRY.counter(
+    "ikuyo_cache_expirations_total", "内存缓存因TTL到期移除的条目数", ("cache_type",)
+)
+CACHE_ENTRIES = REGISTRY.gauge("ikuyo_cache_entries", "内存缓存条目数", ("cache_type",))
+CACHE_DISK_BYTES = REGISTRY.gauge("ikuyo_cache_disk_bytes", "持久化存储占用字节数")
+
+
+class InstrumentedTTLCache(TTLCache):
+    """统计容量淘汰与TTL过期次数的TTLCache"""
+
+    def __init__(self, maxsize: int, ttl: float, cache_type: str):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.cache_type = cache_type
+
+    def popitem(self):
+        # TTLCache仅在容量不足时调用popitem（过期条目由expire处理）
+        item = super().popitem()
+        CACHE_EVICTIONS.inc(cache_type=self.cache_type)
+        return item
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        if expired:
+            CACHE_EXPIRATIONS.inc(len(expired), cache_type=self.cache_type)
+        return expired
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目：数据、写入时间及是否已超过软TTL"""
+
+    data: Any
+    stored_at: float
+    stale: bool
 
 
 class CacheManager:
     """
     多层缓存管理器
     - L1缓存：cachetools内存缓存（主要）
-    - L2缓存：选择性文件备份（重要数据）
+    - 共享缓存：可选的Redis层，多个API进程共用，避免重复请求上游
+    - 持久化：选择性持久化到SQLite（重要数据），写入由后台线程完成
     - 智能管理：自动TTL过期
+    - 软/硬TTL：超过软TTL的数据仍可返回（由调用方后台刷新），超过硬TTL才淘汰
+    - 热点统计：记录条目写入后的访问次数，用于到期前主动刷新
     """
 
     def __init__(self, cache_dir: str = "data/cache"):
@@ -55,154 +112,311 @@ class CacheManager:
             },
         )
 
+        # 软TTL：超过后数据视为陈旧，仍返回但应触发后台刷新；未配置时取硬TTL的3/4
+        soft_ttl = getattr(self.cache_config, "soft_ttl", {})
+        self.soft_ttl = {
+            cache_type: soft_ttl.get(
+                cache_type,
+                int(self.cache_ttl.get(cache_type, self.cache_ttl["default"]) * 0.75),
+            )
+            for cache_type in CACHE_TYPES
+        }
+
+        # 热点预刷新：访问次数达到阈值的条目在软TTL到期前lead_time秒内主动刷新
+        refresh_ahead = getattr(self.cache_config, "refresh_ahead", {})
+        self.refresh_ahead_lead_time = refresh_ahead.get("lead_time", 300)
+        self.refresh_ahead_min_hits = refresh_ahead.get("min_hits", 5)
+
         self.persist_types = getattr(
             self.cache_config, "persist_types", ["calendar", "subject", "episodes"]
         )
-        self.cleanup_on_startup = getattr(self.cache_config, "cleanup_on_startup", True)
+        # 后台清理：启动后延迟执行首次清理，之后按间隔周期执行
+        sweeper_config = getattr(self.cache_config, "sweeper", {})
+        self.sweeper_enabled = sweeper_config.get("enabled", True)
+        self.sweep_initial_delay = sweeper_config.get("initial_delay", 60)
+        self.sweep_interval = sweeper_config.get("interval", 3600)
+        self._sweeper_stop = threading.Event()
+        self._sweeper_thread: Optional[threading.Thread] = None
 
         # 初始化cachetools缓存池
-        self.memory_caches: Dict[str, TTLCache] = {}
+        self.memory_caches: Dict[str, InstrumentedTTLCache] = {}
         self.lock = threading.RLock()
 
+        # 条目写入后的访问次数 {(cache_type, key): hits}
+        self.access_counts: Dict[Tuple[str, str], int] = {}
+
         self._init_caches()
 
-        # 启动时清理
-        if self.cleanup_on_startup:
-            self._cleanup_expired_files()
+        # L2持久化存储
+        self.store = SQLiteCacheStore(os.path.join(cache_dir, CACHE_STORE_FILENAME))
+
+        # 可选的Redis共享层，位于内存缓存与持久化存储之间
+        redis_config = getattr(self.cache_config, "redis", {})
+        self.redis_store: Optional[RedisCacheStore] = None
+        self.redis_ttl: Dict[str, float] = {}
+        if redis_config.get("enabled", False):
+            self.redis_store = RedisCacheStore(
+                key_prefix=redis_config.get("key_prefix", "ikuyo:cache:"),
+                retry_interval=redis_config.get("retry_interval", 30),
+            )
+            redis_ttl = redis_config.get("ttl", {}) or {}
+            self.redis_ttl = {
+                cache_type: redis_ttl.get(cache_type, self._ttl(cache_type))
+                for cache_type in CACHE_TYPES
+            }
+
+        # 过期清理交给后台线程，构造时不做任何磁盘扫描
+        if self.sweeper_enabled:
+            self.start_sweeper()
 
     def _init_caches(self) -> None:
         """初始化各类型的缓存池"""
-        for cache_type in ["calendar", "subject", "episodes", "default"]:
+        for cache_type in CACHE_TYPES:
             ttl = self.cache_ttl.get(cache_type, self.cache_ttl["default"])
             maxsize = self.memory_limits.get(cache_type, self.memory_limits["default"])
 
-            self.memory_caches[cache_type] = TTLCache(maxsize=maxsize, ttl=ttl)
+            self.memory_caches[cache_type] = InstrumentedTTLCache(
+                maxsize=maxsize, ttl=ttl, cache_type=cache_type
+            )
 
-    def _cleanup_expired_files(self) -> None:
-        """清理启动时的过期文件"""
-        try:
-            if not os.path.exists(self.cache_dir):
-                return
-
-            current_time = time.time()
-            for filename in os.listdir(self.cache_dir):
-                if not filename.endswith(".json"):
-                    continue
-
-                filepath = os.path.join(self.cache_dir, filename)
-                try:
-                    with open(filepath, "r", encoding="utf-8") as f:
-                        cache_data = json.load(f)
-
-                    if "timestamp" not in cache_data or "cache_type" not in cache_data:
-                        continue
-
-                    cache_type = cache_data["cache_type"]
-                    ttl = self.cache_ttl.get(cache_type, self.cache_ttl["default"])
+    def start_sweeper(self) -> None:
+        """启动后台清理线程（重复调用无副作用）"""
+        if self._sweeper_thread and self._sweeper_thread.is_alive():
+            return
+        self._sweeper_stop.clear()
+        self._sweeper_thread = threading.Thread(
+            target=self._sweep_loop, daemon=True, name="CacheSweeper"
+        )
+        self._sweeper_thread.start()
 
-                    if current_time - cache_data["timestamp"] > ttl:
-                        os.remove(filepath)
-                        print(f"🗑️ 清理过期缓存文件: {filename}")
+    def stop_sweeper(self) -> None:
+        """停止后台清理线程"""
+        self._sweeper_stop.set()
 
-                except Exception:
-                    # 删除损坏的文件
-                    try:
-                        os.remove(filepath)
-                        print(f"🗑️ 清理损坏缓存文件: {filename}")
-                    except Exception:
-                        pass
+    def close(self) -> None:
+        """停止后台清理并将待写入的数据落盘"""
+        self.stop_sweeper()
+        self.store.close()
 
-        except Exception as e:
-            print(f"清理缓存文件时出错: {e}")
+    def _sweep_loop(self) -> None:
+        """首次清理前等待initial_delay，避开启动高峰"""
+        if self._sweeper_stop.wait(self.sweep_initial_delay):
+            return
+        self._remove_legacy_files()
+        while True:
+            try:
+                self.store.purge_expired()
+            except Exception as e:
+                print(f"清理过期缓存失败: {e}")
+            if self._sweeper_stop.wait(self.sweep_interval):
+                return
 
-    def _get_cache_file(self, key: str) -> str:
-        """获取缓存文件路径"""
-        return os.path.join(self.cache_dir, f"{key}.json")
+    def _remove_legacy_files(self) -> None:
+        """删除旧版本遗留的每键一个JSON文件的缓存（只看文件名，不读取内容）"""
+        removed = 0
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(".json"):
+                        try:
+                            os.remove(entry.path)
+                            removed += 1
+                        except OSError:
+                            pass
+        except OSError as e:
+            print(f"清理旧缓存文件失败: {e}")
+        if removed:
+            print(f"🗑️ 已删除 {removed} 个旧版缓存文件")
+
+    def _ttl(self, cache_type: str) -> float:
+        return self.cache_ttl.get(cache_type, self.cache_ttl["default"])
 
     def _should_persist(self, cache_type: str) -> bool:
         """判断是否需要持久化"""
         return cache_type in self.persist_types
 
-    def _load_from_file(self, key: str, cache_type: str) -> Optional[Any]:
-        """从文件加载缓存数据"""
-        if not self._should_persist(cache_type):
-            return None
+    def _soft_ttl(self, cache_type: str) -> float:
+        return self.soft_ttl.get(cache_type, self.soft_ttl["default"])
 
-        cache_file = self._get_cache_file(key)
-        if not os.path.exists(cache_file):
-            return None
-
-        try:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                cache_data = json.load(f)
-
-            # 检查文件缓存是否过期
-            if "timestamp" not in cache_data:
+    def _lookup_memory(
+        self, key: str, cache_type: str, record_access: bool = True
+    ) -> Optional[CacheEntry]:
+        """从内存缓存读取并记录访问次数"""
+        with self.lock:
+            cache = self.memory_caches.get(cache_type, self.memory_caches["default"])
+            item = cache.get(key)
+            if item is None:
                 return None
-
-            ttl = self.cache_ttl.get(cache_type, self.cache_ttl["default"])
-            if time.time() - cache_data["timestamp"] > ttl:
-                # 文件缓存过期，删除
-                os.remove(cache_file)
+            if time.time() - item[1] > self._ttl(cache_type):
+                # 从持久化存储载入的旧条目，按写入时间计已超过硬TTL
+                cache.pop(key, None)
+                CACHE_EXPIRATIONS.inc(cache_type=cache_type)
                 return None
+            return self._make_entry(key, cache_type, item, record_access)
+
+    def _make_entry(
+        self, key: str, cache_type: str, item: Tuple[Any, float], record_access: bool = True
+    ) -> CacheEntry:
+        data, stored_at = item
+        if record_access:
+            counter_key = (cache_type, key)
+            self.access_counts[counter_key] = self.access_counts.get(counter_key, 0) + 1
+        return CacheEntry(
+            data=data,
+            stored_at=stored_at,
+            stale=time.time() - stored_at > self._soft_ttl(cache_type),
+        )
 
-            return cache_data.get("data")
+    def _promote(
+        self, key: str, cache_type: str, item: Tuple[Any, float], record_access: bool = True
+    ) -> CacheEntry:
+        """将共享层或持久化存储中读到的数据载入内存缓存"""
+        with self.lock:
+            cache = self.memory_caches.get(cache_type, self.memory_caches["default"])
+            cache[key] = item
+            return self._make_entry(key, cache_type, item, record_access)
 
-        except Exception as e:
-            print(f"读取缓存文件失败 {cache_file}: {e}")
-            try:
-                os.remove(cache_file)
-            except Exception:
-                pass
-            return None
+    def _has_shared_tier(self, cache_type: str) -> bool:
+        """内存缓存之外是否还有可查询的层"""
+        return self.redis_store is not None or self._should_persist(cache_type)
+
+    def _load_shared(
+        self, key: str, cache_type: str
+    ) -> Tuple[Optional[Tuple[Any, float]], Optional[str]]:
+        """
+        依次查询Redis与持久化存储（阻塞调用，不持有全局锁）
+        持久化存储命中时回填Redis，供其他进程使用
+
+        Returns:
+            ((data, stored_at), 命中层 "redis"/"disk")，未命中时为 (None, None)
+        """
+        if self.redis_store is not None:
+            item = self.redis_store.get(key)
+            if item is not None:
+                return item, "redis"
 
-    def _save_to_file(self, key: str, data: Any, cache_type: str) -> None:
-        """保存数据到文件"""
         if not self._should_persist(cache_type):
+            return None, None
+        item = self.store.get(key)
+        if item is None:
+            return None, None
+        if self.redis_store is not None:
+            self.redis_store.set(key, item[0], item[1], self.redis_ttl[cache_type])
+        return item, "disk"
+
+    def _record_lookup(
+        self, cache_type: str, tier: Optional[str], entry: Optional[CacheEntry]
+    ) -> None:
+        """记录一次查询的命中层"""
+        if entry is None:
+            CACHE_MISSES.inc(cache_type=cache_type)
             return
+        CACHE_HITS.inc(cache_type=cache_type, tier=tier)
+        if entry.stale:
+            CACHE_STALE_HITS.inc(cache_type=cache_type)
 
-        cache_file = self._get_cache_file(key)
-        cache_data = {"data": data, "timestamp": time.time(), "cache_type": cache_type}
+    def get_entry(self, key: str, cache_type: str = "default") -> Optional[CacheEntry]:
+        """
+        获取缓存条目
+        优先从内存缓存获取，其次Redis与持久化存储；超过硬TTL的条目不会返回
+        """
+        entry = self._lookup_memory(key, cache_type)
+        tier = "l1"
+        if entry is None and self._has_shared_tier(cache_type):
+            item, tier = self._load_shared(key, cache_type)
+            if item is not None:
+                entry = self._promote(key, cache_type, item)
+
+        self._record_lookup(cache_type, tier, entry)
+        return entry
+
+    async def aget_entry(
+        self, key: str, cache_type: str = "default", record_access: bool = True
+    ) -> Optional[CacheEntry]:
+        """
+        异步获取缓存条目
+        内存缓存命中时直接返回，未命中时在线程池中查询Redis与持久化存储，不阻塞事件循环
 
-        try:
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"写入缓存文件失败 {cache_file}: {e}")
+        Args:
+            record_access: 是否计入热点访问次数与命中统计（预热等内部检查应传False）
+        """
+        entry = self._lookup_memory(key, cache_type, record_access)
+        tier = "l1"
+        if entry is None and self._has_shared_tier(cache_type):
+            item, tier = await asyncio.to_thread(self._load_shared, key, cache_type)
+            if item is not None:
+                entry = self._promote(key, cache_type, item, record_access)
+
+        if record_access:
+            self._record_lookup(cache_type, tier, entry)
+        return entry
 
     def get(self, key: str, cache_type: str = "default") -> Optional[Any]:
         """
         获取缓存数据
-        优先从内存缓存获取，其次文件缓存
+        优先从内存缓存获取，其次持久化存储
         """
-        with self.lock:
-            # 1. 尝试从内存缓存获取
-            cache = self.memory_caches.get(cache_type, self.memory_caches["default"])
-
-            if key in cache:
-                return cache[key]
+        entry = self.get_entry(key, cache_type)
+        return entry.data if entry else None
 
-            # 2. 尝试从文件缓存加载
-            file_data = self._load_from_file(key, cache_type)
-            if file_data is not None:
-                # 加载到内存缓存
-                cache[key] = file_data
-                return file_data
-
-            return None
+    def get_hot_keys_due(self) -> List[Tuple[str, str]]:
+        """
+        返回需要预刷新的热点键
+        条件：访问次数达到阈值，且距软TTL到期不足lead_time秒（或已过期）
+        """
+        now = time.time()
+        due = []
+        with self.lock:
+            for (cache_type, key), hits in list(self.access_counts.items()):
+                cache = self.memory_caches.get(cache_type, self.memory_caches["default"])
+                item = cache.get(key)
+                if item is None:
+                    # 条目已被淘汰，不再跟踪
+                    del self.access_counts[(cache_type, key)]
+                    continue
+                if hits < self.refresh_ahead_min_hits:
+                    continue
+                refresh_at = item[1] + self._soft_ttl(cache_type) - self.refresh_ahead_lead_time
+                if now >= refresh_at:
+                    due.append((key, cache_type))
+        return due
 
     def set(self, key: str, data: Any, cache_type: str = "default") -> None:
         """
         设置缓存数据
-        同时写入内存和文件（如果需要持久化）
+        同时写入内存、Redis（如果启用）和持久化存储（如果需要持久化）
+        """
+        stored_at = self._set_local(key, data, cache_type)
+        if self.redis_store is not None:
+            self.redis_store.set(key, data, stored_at, self.redis_ttl[cache_type])
+
+    async def aset(self, key: str, data: Any, cache_type: str = "default") -> None:
+        """
+        异步设置缓存数据
+        Redis写入在线程池中执行，不阻塞事件循环
         """
+        stored_at = self._set_local(key, data, cache_type)
+        if self.redis_store is not None:
+            await asyncio.to_thread(
+                self.redis_store.set, key, data, stored_at, self.redis_ttl[cache_type]
+            )
+
+    def _set_local(self, key: str, data: Any, cache_type: str) -> float:
+        """写入内存缓存和持久化存储，返回写入时间"""
         with self.lock:
+            stored_at = time.time()
+
             # 1. 写入内存缓存
             cache = self.memory_caches.get(cache_type, self.memory_caches["default"])
-            cache[key] = data
+            cache[key] = (data, stored_at)
+
+            # 新条目重新统计访问次数
+            self.access_counts.pop((cache_type, key), None)
 
-            # 2. 写入文件缓存（如果需要持久化）
-            self._save_to_file(key, data, cache_type)
+        # 2. 写入持久化存储（如果需要持久化），由写线程异步落盘
+        if self._should_persist(cache_type):
+            self.store.set(key, data, cache_type, stored_at, self._ttl(cache_type))
+        return stored_at
 
     def clear(self, key: Optional[str] = None) -> None:
         """
@@ -212,28 +426,53 @@ class CacheManager:
         with self.lock:
             if key:
                 # 清理特定缓存
-                for cache in self.memory_caches.values():
+                for cache_type, cache in self.memory_caches.items():
                     cache.pop(key, None)
+                    self.access_counts.pop((cache_type, key), None)
 
-                # 清理文件缓存
-                cache_file = self._get_cache_file(key)
-                if os.path.exists(cache_file):
-                    try:
-                        os.remove(cache_file)
-                    except Exception as e:
-                        print(f"删除缓存文件失败 {cache_file}: {e}")
+                # 清理持久化存储
+                self.store.delete(key)
+                if self.redis_store is not None:
+                    self.redis_store.delete(key)
             else:
                 # 清理全部缓存
                 for cache in self.memory_caches.values():
                     cache.clear()
+                self.access_counts.clear()
+
+                # 清理持久化存储
+                self.store.clear()
+                if self.redis_store is not None:
+                    self.redis_store.clear()
+
+    def get_lookup_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各缓存类型的命中、未命中、淘汰及过期计数"""
+        stats = {}
+        for cache_type in CACHE_TYPES:
+            hits = {
+                tier: CACHE_HITS.get(cache_type=cache_type, tier=tier)
+                for tier in ("l1", "redis", "disk")
+            }
+            misses = CACHE_MISSES.get(cache_type=cache_type)
+            lookups = sum(hits.values()) + misses
+            stats[cache_type] = {
+                "l1_hits": hits["l1"],
+                "redis_hits": hits["redis"],
+                "disk_hits": hits["disk"],
+                "misses": misses,
+                "stale_hits": CACHE_STALE_HITS.get(cache_type=cache_type),
+                "evictions": CACHE_EVICTIONS.get(cache_type=cache_type),
+                "expirations": CACHE_EXPIRATIONS.get(cache_type=cache_type),
+                "hit_ratio": round(sum(hits.values()) / lookups, 4) if lookups else None,
+            }
+        return stats
 
-                # 清理文件缓存
-                try:
-                    for filename in os.listdir(self.cache_dir):
-                        if filename.endswith(".json"):
-                            os.remove(os.path.join(self.cache_dir, filename))
-                except Exception as e:
-                    print(f"清理缓存目录失败: {e}")
+    def collect_metrics(self) -> None:
+        """导出指标前刷新按需计算的仪表"""
+        with self.lock:
+            for cache_type, cache in self.memory_caches.items():
+                CACHE_ENTRIES.set(len(cache), cache_type=cache_type)
+        CACHE_DISK_BYTES.set(self.store.size_bytes())
 
     def get_cache_info(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
@@ -247,24 +486,38 @@ class CacheManager:
                     "count": count,
                     "maxsize": cache.maxsize,
                     "ttl": cache.ttl,
+                    "soft_ttl": self._soft_ttl(cache_type),
                 }
                 total_memory_count += count
 
-            file_count = 0
-            try:
-                file_count = len(
-                    [f for f in os.listdir(self.cache_dir) if f.endswith(".json")]
-                )
-            except Exception:
-                pass
-
-            return {
-                "memory_cache_stats": memory_stats,
-                "total_memory_count": total_memory_count,
-                "file_cache_count": file_count,
-                "cache_config": {
-                    "ttl": self.cache_ttl,
-                    "memory_limits": self.memory_limits,
-                    "persist_types": self.persist_types,
-                },
-            }
+        return {
+            "memory_cache_stats": memory_stats,
+            "lookup_stats": self.get_lookup_stats(),
+            "total_memory_count": total_memory_count,
+            "file_cache_count": self.store.count(),
+            "file_cache_bytes": self.store.size_bytes(),
+            "redis_enabled": self.redis_store is not None,
+            "redis_cache_count": self.redis_store.count() if self.redis_store else 0,
+            "cache_config": {
+                "ttl": self.cache_ttl,
+                "soft_ttl": self.soft_ttl,
+                "memory_limits": self.memory_limits,
+                "persist_types": self.persist_types,
+                "redis_ttl": self.redis_ttl,
+            },
+        }
+
+
+_cache_manager: Optional[CacheManager] = None
+_cache_manager_lock = threading.Lock()
+
+
+def get_cache_manager() -> CacheManager:
+    """获取进程内共享的CacheManager实例"""
+    global _cache_manager
+    if _cache_manager is None:
+        with _cache_manager_lock:
+            if _cache_manager is None:
+                _cache_manager = CacheManager()
+                REGISTRY.register_collector(_cache_manager.collect_metrics)
+    return _cache_manager
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+缓存共享/持久化存储
+- SQLiteCacheStore：单文件SQLite键值表，取代每个键一个JSON文件的方式
+  - 值使用紧凑JSON + zlib压缩存储
+  - 写入由后台线程批量提交，调用方不等待磁盘I/O
+  - 读取使用线程本地连接（WAL模式），不持有任何全局锁
+- RedisCacheStore：多个API进程共享的可选Redis层，值格式相同
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+
+    def _dumps(data: Any) -> bytes:
+        return orjson.dumps(data)
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - 可选依赖
+
+    def _dumps(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
+# 单次提交最多合并的写操作数
+WRITE_BATCH_SIZE = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    cache_type TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at ON cache_entries (expires_at);
+"""
+
+# 写队列结束标记
+_STOP = object()
+
+
+def encode_value(data: Any) -> bytes:
+    """序列化并压缩缓存值"""
+    return zlib.compress(_dumps(data), 1)
+
+
+def decode_value(blob: bytes) -> Any:
+    """解压并反序列化缓存值"""
+    return _loads(zlib.decompress(blob))
+
+
+class SQLiteCacheStore:
+    """
+    基于SQLite的缓存键值存储
+    - get 在调用线程中直接读取（仅在内存缓存未命中时才会调用）
+    - set/delete/clear/purge_expired 放入写队列，由写线程批量执行，
+      序列化和压缩也在写线程中进行，不占用调用方（事件循环）
+    - 尚未落盘的写操作保存在内存覆盖层中（原始值），保证读到最新结果，
+      因此写入后不应再修改传入的值
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._local = threading.local()
+        # 覆盖层: key -> (cache_type, stored_at, expires_at, data)，None 表示待删除
+        self._pending: Dict[str, Optional[Tuple[str, float, float, Any]]] = {}
+        self._pending_lock = threading.Lock()
+        # 最近一次全部清理的时间，早于该时间写入的行视为已删除
+        self._cleared_at = 0.0
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._init_db()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._ensure_writer()
+
+    def _ensure_writer(self) -> None:
+        """确保写线程在运行（close之后再次写入时重新启动）"""
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._write_loop, daemon=True, name="CacheStoreWriter"
+                )
+                self._writer.start()
+
+    def _put(self, op: Tuple[str, Optional[str], Any]) -> None:
+        self._ensure_writer()
+        self._queue.put(op)
+
+    # ---------- 连接 ----------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """当前线程的只读连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    # ---------- 读 ----------
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        读取未过期的缓存值
+
+        Returns:
+            (data, stored_at)，不存在或已过期时返回 None
+        """
+        now = time.time()
+        with self._pending_lock:
+            if key in self._pending:
+                pending = self._pending[key]
+                if pending is None or pending[2] <= now:
+                    return None
+                return pending[3], pending[1]
+
+        try:
+            row = (
+                self._reader()
+                .execute(
+                    "SELECT stored_at, expires_at, data FROM cache_entries WHERE key = ?",
+                    (key,),
+                )
+                .fetchone()
+            )
+            if row is None or row[1] <= now or row[0] < self._cleared_at:
+                return None
+            return decode_value(row[2]), row[0]
+        except Exception as e:
+            print(f"读取缓存存储失败 {key}: {e}")
+            return None
+
+    def count(self) -> int:
+        """未过期条目数"""
+        try:
+            return (
+                self._reader()
+                .execute(
+                    "SELECT COUNT(*) FROM cache_entries WHERE expires_at > ?", (time.time(),)
+                )
+                .fetchone()[0]
+            )
+        except Exception:
+            return 0
+
+    def size_bytes(self) -> int:
+        """数据库文件（含WAL）占用的字节数"""
+        total = 0
+        for suffix in ("", "-wal"):
+            try:
+                total += os.path.getsize(self.path + suffix)
+            except OSError:
+                pass
+        return total
+
+    # ---------- 写（异步） ----------
+
+    def set(self, key: str, data: Any, cache_type: str, stored_at: float, ttl: float) -> None:
+        """写入缓存值，不等待落盘（编码在写线程中进行）"""
+        entry = (cache_type, stored_at, stored_at + ttl, data)
+        with self._pending_lock:
+            self._pending[key] = entry
+        self._put(("set", key, entry))
+
+    def delete(self, key: str) -> None:
+        """删除缓存值，不等待落盘"""
+        with self._pending_lock:
+            self._pending[key] = None
+        self._put(("delete", key, None))
+
+    def clear(self) -> None:
+        """删除全部缓存值，不等待落盘"""
+        with self._pending_lock:
+            self._pending.clear()
+            self._cleared_at = time.time()
+        self._put(("clear", None, None))
+
+    def purge_expired(self) -> None:
+        """删除已过期的行（按expires_at索引），不等待执行"""
+        self._put(("purge", None, None))
+
+    def flush(self) -> None:
+        """等待写队列中的操作全部落盘"""
+        self._queue.join()
+
+    def close(self) -> None:
+        """落盘并停止写线程"""
+        if self._writer is None or not self._writer.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._writer.join(timeout=10)
+
+    # ---------- 写线程 ----------
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while item is not _STOP and len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            stop = any(op is _STOP for op in batch)
+            ops = [op for op in batch if op is not _STOP]
+            try:
+                self._apply(conn, ops)
+            except Exception as e:
+                print(f"写入缓存存储失败: {e}")
+            finally:
+                self._release_pending(ops)
+                for _ in batch:
+                    self._queue.task_done()
+
+            if stop:
+                conn.close()
+                return
+
+    def _apply(self, conn: sqlite3.Connection, ops) -> None:
+        """在一个事务中执行一批写操作"""
+        if not ops:
+            return
+        # 先在事务外编码，单个值编码失败只跳过该值
+        blobs = {}
+        for index, (op, key, entry) in enumerate(ops):
+            if op == "set":
+                try:
+                    blobs[index] = encode_value(entry[3])
+                except Exception as e:
+                    print(f"编码缓存值失败 {key}: {e}")
+
+        conn.execute("BEGIN")
+        try:
+            for index, (op, key, entry) in enumerate(ops):
+                if op == "set":
+                    if index not in blobs:
+                        continue
+                    conn.execute(
+                        "INSERT OR REPLACE INTO cache_entries "
+                        "(key, cache_type, stored_at, expires_at, data) VALUES (?, ?, ?, ?, ?)",
+                        (key, *entry[:3], blobs[index]),
+                    )
+                elif op == "delete":
+                    conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                elif op == "clear":
+                    conn.execute("DELETE FROM cache_entries")
+                elif op == "purge":
+                    cursor = conn.execute(
+                        "DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)
+                    )
+                    if cursor.rowcount:
+                        print(f"🗑️ 清理过期缓存条目: {cursor.rowcount} 条")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _release_pending(self, ops) -> None:
+        """移除已落盘的覆盖层条目（期间被再次修改的保留）"""
+        with self._pending_lock:
+            for op, key, entry in ops:
+                if op in ("set", "delete") and key in self._pending:
+                    if self._pending[key] is entry:
+                        del self._pending[key]
+
+
+# Redis值头部：写入时间（大端double），之后是压缩后的数据
+_STORED_AT = struct.Struct(">d")
+
+
+class RedisCacheStore:
+    """
+    基于Redis的共享缓存层
+    - 键为 {prefix}{key}，过期时间由Redis按类型TTL管理
+    - Redis不可用时记录错误并在一段时间内跳过，避免每个请求都等待连接超时
+    - 所有方法均为阻塞调用，异步代码中应放到线程池执行
+    """
+
+    def __init__(self, key_prefix: str = "ikuyo:cache:", retry_interval: float = 30):
+        self.key_prefix = key_prefix
+        self.retry_interval = retry_interval
+        self._disabled_until = 0.0
+
+    def _client(self):
+        from .redis_client import get_redis_binary_connection
+
+        return get_redis_binary_connection()
+
+    def _available(self) -> bool:
+        return time.time() >= self._disabled_until
+
+    def _on_error(self, action: str, e: Exception) -> None:
+        self._disabled_until = time.time() + self.retry_interval
+        print(f"Redis缓存{action}失败，{self.retry_interval}秒内跳过Redis层: {e}")
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        读取缓存值
+
+        Returns:
+            (data, stored_at)，不存在时返回 None
+        """
+        if not self._available():
+            return None
+        try:
+            blob = self._client().get(self.key_prefix + key)
+        except Exception as e:
+            self._on_error("读取", e)
+            return None
+        if blob is None:
+            return None
+        try:
+            (stored_at,) = _STORED_AT.unpack_from(blob)
+            return decode_value(blob[_STORED_AT.size :]), stored_at
+        except Exception as e:
+            print(f"解析Redis缓存值失败 {key}: {e}")
+            return None
+
+    def set(self, key: str, data: Any, stored_at: float, ttl: float) -> None:
+        """写入缓存值，剩余TTL按写入时间计算"""
+        remaining = int(stored_at + ttl - time.time())
+        if remaining <= 0 or not self._available():
+            return
+        try:
+            self._client().set(
+                self.key_prefix + key,
+                _STORED_AT.pack(stored_at) + encode_value(data),
+                ex=remaining,
+            )
+        except Exception as e:
+            self._on_error("写入", e)
+
+    def delete(self, key: str) -> None:
+        """删除缓存值"""
+        try:
+            self._client().delete(self.key_prefix + key)
+        except Exception as e:
+            self._on_error("删除", e)
+
+    def clear(self) -> None:
+        """删除本前缀下的全部缓存值"""
+        try:
+            client = self._client()
+            batch = []
+            for redis_key in client.scan_iter(match=self.key_prefix + "*", count=500):
+                batch.append(redis_key)
+                if len(batch) >= 500:
+                    client.delete(*batch)
+                    batch = []
+            if batch:
+                client.delete(*batch)
+        except Exception as e:
+            self._on_error("清理", e)
+
+    def count(self) -> int:
+        """本前缀下的键数量（SCAN统计，仅用于状态展示）"""
+        if not self._available():
+            return 0
+        try:
+            return sum(
+                1 for _ in self._client().scan_iter(match=self.key_prefix + "*", count=500)
+            )
+        except Exception:
+            return 0
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+缓存预热
+启动时及周期性地预先获取热点番剧的详情和章节，使流量到来时缓存已就绪
+热点集合：每日放送 + 用户订阅 + 本地番剧库（按最近更新）
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .bangumi_service import (
+    BangumiService,
+    UpstreamUnavailableError,
+    episodes_cache_key,
+    get_bangumi_service,
+    subject_cache_key,
+)
+from .config import load_config
+from .database import get_session
+from .repositories.anime_repository import AnimeRepository
+from .repositories.subscription_repository import SubscriptionRepository
+
+
+class AsyncRateLimiter:
+    """令牌桶限速器：平均每秒rate次，允许burst次突发"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CacheWarmer:
+    """
+    缓存预热任务
+    - 并发数与上游请求速率均有上限，避免预热本身冲击api.bgm.tv
+    - 已有未陈旧缓存的键直接跳过，不消耗请求额度
+    - 陈旧的键在信号量内等待刷新完成，不转为不受并发限制的后台刷新
+    - 速率按上游请求计：章节列表的每个分页请求各消耗一个额度
+    """
+
+    def __init__(self, service: Optional[BangumiService] = None, warmup_config=None):
+        self.service = service or get_bangumi_service()
+        if warmup_config is None:
+            warmup_config = getattr(getattr(load_config(), "cache", {}), "warmup", {})
+        self.enabled = warmup_config.get("enabled", True)
+        self.on_startup = warmup_config.get("on_startup", True)
+        self.startup_delay = warmup_config.get("startup_delay", 10)
+        self.interval = warmup_config.get("interval", 21600)
+        self.concurrency = warmup_config.get("concurrency", 4)
+        self.rate_per_second = float(warmup_config.get("rate_per_second", 2))
+        self.max_subjects = warmup_config.get("max_subjects", 500)
+        self.include_episodes = warmup_config.get("include_episodes", True)
+
+        self.last_result: Optional[Dict[str, Any]] = None
+        self._running = False
+
+    def _collect_local_ids(self) -> Tuple[List[int], List[int]]:
+        """读取用户订阅与番剧库中的bangumi_id"""
+        with get_session() as session:
+            subscribed = SubscriptionRepository(session).get_all_bangumi_ids()
+            library = AnimeRepository(session).get_all_bangumi_ids(limit=self.max_subjects)
+        return subscribed, library
+
+    async def collect_subject_ids(self) -> List[int]:
+        """
+        构造预热集合（去重并保持优先级）
+        顺序：用户订阅 > 每日放送 > 番剧库
+        """
+        subscribed, library = await asyncio.to_thread(self._collect_local_ids)
+        calendar = await self.service.get_calendar() or []
+        calendar_ids = [
+            item["id"]
+            for day in calendar
+            for item in day.get("items", [])
+            if isinstance(item, dict) and item.get("id")
+        ]
+
+        ordered = subscribed + calendar_ids + library
+        seen = set()
+        result = []
+        for subject_id in ordered:
+            if subject_id and subject_id not in seen:
+                seen.add(subject_id)
+                result.append(subject_id)
+        return result[: self.max_subjects]
+
+    async def _warm_subject(
+        self,
+        subject_id: int,
+        semaphore: asyncio.Semaphore,
+        limiter: AsyncRateLimiter,
+        stats: Dict[str, int],
+    ) -> None:
+        async with semaphore:
+            if not await self.service.is_fresh(subject_cache_key(subject_id), "subject"):
+                await limiter.acquire()
+                result = await self.service.get_subject(subject_id, wait_for_refresh=True)
+                stats["fetched" if result else "failed"] += 1
+            else:
+                stats["skipped"] += 1
+
+            if not self.include_episodes:
+                return
+            if not await self.service.is_fresh(episodes_cache_key(subject_id), "episodes"):
+                # 章节列表可能需要多页请求，按每页请求消耗额度
+                try:
+                    result = await self.service.get_episodes(
+                        subject_id, wait_for_refresh=True, acquire=limiter.acquire
+                    )
+                except UpstreamUnavailableError:
+                    result = None
+                stats["fetched" if result else "failed"] += 1
+            else:
+                stats["skipped"] += 1
+
+    async def run_once(self) -> Dict[str, Any]:
+        """
+        执行一次预热
+
+        Returns:
+            Dict: 预热统计（番剧数、请求数、跳过数、失败数、耗时）
+        """
+        if self._running:
+            print("⏭️ 缓存预热进行中，跳过本次")
+            return {"skipped": True}
+
+        self._running = True
+        started = time.time()
+        try:
+            subject_ids = await self.collect_subject_ids()
+            print(f"🔥 开始缓存预热: {len(subject_ids)} 个番剧")
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+            limiter = AsyncRateLimiter(self.rate_per_second, burst=self.concurrency)
+            stats = {"fetched": 0, "skipped": 0, "failed": 0}
+            results = await asyncio.gather(
+                *(
+                    self._warm_subject(subject_id, semaphore, limiter, stats)
+                    for subject_id in subject_ids
+                ),
+                return_exceptions=True,
+            )
+            # 未预期的异常（如读取缓存存储出错）计为失败
+            for subject_id, result in zip(subject_ids, results):
+                if isinstance(result, Exception):
+                    stats["failed"] += 1
+                    print(f"预热番剧失败 {subject_id}: {result}")
+
+            self.last_result = {
+                "subjects": len(subject_ids),
+                **stats,
+                "duration": round(time.time() - started, 2),
+                "finished_at": time.time(),
+            }
+            print(
+                f"✅ 缓存预热完成: {len(subject_ids)} 个番剧, 请求 {stats['fetched']}, "
+                f"跳过 {stats['skipped']}, 失败 {stats['failed']}, "
+                f"耗时 {self.last_result['duration']}秒"
+            )
+            return self.last_result
+        finally:
+            self._running = False
+
+    async def run_forever(self) -> None:
+        """启动时（延迟startup_delay秒）执行一次，之后每interval秒执行一次"""
+        if self.on_startup:
+            await asyncio.sleep(self.startup_delay)
+        else:
+            await asyncio.sleep(self.interval)
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"缓存预热失败: {e}")
+            await asyncio.sleep(self.interval)
+
+
+if __name__ == "__main__":
+    # 手动执行一次预热：python -m ikuyo.core.cache_warmup
+    async def _main():
+        service = get_bangumi_service()
+        try:
+            await CacheWarmer(service).run_once()
+        finally:
+            await service.aclose()
+            service.cache.close()
+
+    asyncio.run(_main())
@@ -135,6 +135,9 @@ class SpiderRunner:
                 str(self.task_id),
                 parameters_json,
             ]
+            if self.config.get("profile"):
+                # 性能分析报告写入 data/profiles/
+                command.append("--profile")
 
             self.logger.info(f"Executing Scrapy spider in new process: {' '.join(command)}")
 
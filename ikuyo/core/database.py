@@ -13,6 +13,12 @@ def get_session():
     return Session(engine)
 
 
+def get_request_session():
+    """FastAPI依赖：每个请求使用一个Session，请求结束后关闭并归还连接"""
+    with Session(engine) as session:
+        yield session
+
+
 def create_db_and_tables():
     """初始化所有SQLModel表结构"""
     SQLModel.metadata.create_all(engine)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+健康统计刷新器
+在后台线程中周期性采集数据库、缓存、队列和工作器状态，
+API 直接读取内存中的快照，健康检查不再触发任何重量级查询
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from sqlmodel import select
+
+from ikuyo.core.database import engine, get_session
+from ikuyo.core.redis_client import get_redis_connection
+from ikuyo.core.repositories import (
+    AnimeRepository,
+    ResourceRepository,
+    SubtitleGroupRepository,
+)
+from ikuyo.core.repositories.subscription_repository import SubscriptionRepository
+
+TASK_QUEUE_NAME = "ikuyo:crawl_tasks"
+
+
+def to_plain(val: Any) -> Any:
+    """将Config等对象递归转换为可序列化的基础类型"""
+    if hasattr(val, "_data"):
+        return {k: to_plain(v) for k, v in val._data.items()}
+    elif hasattr(val, "__dict__"):
+        return {k: to_plain(v) for k, v in val.__dict__.items()}
+    elif isinstance(val, dict):
+        return {k: to_plain(v) for k, v in val.items()}
+    elif isinstance(val, list):
+        return [to_plain(v) for v in val]
+    else:
+        return val
+
+
+class HealthStatsRefresher:
+    """
+    健康统计刷新器
+    - 后台线程按固定间隔刷新统计快照
+    - 读取快照为O(1)，不访问数据库或Redis
+    """
+
+    def __init__(
+        self,
+        cache_info_provider: Optional[Callable[[], Dict[str, Any]]] = None,
+        interval: float = 30,
+    ):
+        self.cache_info_provider = cache_info_provider
+        self.interval = interval
+        self.logger = logging.getLogger(__name__)
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """启动后台刷新线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._refresh_loop, daemon=True, name="HealthStatsRefresher"
+        )
+        self._thread.start()
+        self.logger.info(f"健康统计刷新器已启动，刷新间隔: {self.interval}秒")
+
+    def stop(self) -> None:
+        """停止后台刷新线程"""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def get_snapshot(self) -> Optional[Dict[str, Any]]:
+        """获取最近一次的统计快照，尚未完成首次刷新时返回None"""
+        return self._snapshot
+
+    def refresh(self) -> Dict[str, Any]:
+        """立即采集一次统计信息并替换快照"""
+        started = time.time()
+        database_status, database_stats = self._collect_database_stats()
+        queue_status, queue_stats = self._collect_queue_stats()
+
+        snapshot = {
+            "database_status": database_status,
+            "redis_status": queue_status,
+            "database": database_stats,
+            "storage": self._collect_storage_stats(),
+            "cache": self._collect_cache_stats(),
+            "queue": queue_stats,
+            "workers": self._collect_worker_heartbeats() if queue_status == "healthy" else [],
+            "updated_at": time.time(),
+            "refresh_duration": round(time.time() - started, 4),
+        }
+        # 整体替换引用，读取方无需加锁
+        self._snapshot = snapshot
+        return snapshot
+
+    def _refresh_loop(self) -> None:
+        """刷新主循环"""
+        while not self._stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error(f"刷新健康统计失败: {e}")
+            self._stop_event.wait(self.interval)
+
+    def _collect_database_stats(self):
+        """采集数据库连通性和各表行数"""
+        try:
+            with get_session() as session:
+                session.exec(select(1)).first()
+                stats = {
+                    "anime_count": AnimeRepository(session).count(),
+                    "resource_count": ResourceRepository(session).count(),
+                    "subtitle_group_count": SubtitleGroupRepository(session).count(),
+                    "subscription_count": SubscriptionRepository(session).count(),
+                }
+            return "healthy", stats
+        except Exception as e:
+            self.logger.error(f"采集数据库统计失败: {e}")
+            return "unhealthy", {}
+
+    def _collect_storage_stats(self) -> Dict[str, Any]:
+        """采集数据库文件及WAL文件大小"""
+        db_path = engine.url.database or ""
+        stats: Dict[str, Any] = {"db_path": db_path}
+        for name, path in (("db_size", db_path), ("wal_size", f"{db_path}-wal")):
+            try:
+                stats[name] = os.path.getsize(path)
+            except OSError:
+                stats[name] = 0
+        return stats
+
+    def _collect_cache_stats(self) -> Dict[str, Any]:
+        """采集缓存统计"""
+        if not self.cache_info_provider:
+            return {}
+        try:
+            return to_plain(self.cache_info_provider())
+        except Exception as e:
+            self.logger.error(f"采集缓存统计失败: {e}")
+            return {}
+
+    def _collect_queue_stats(self):
+        """采集任务队列深度"""
+        try:
+            depth = get_redis_connection().llen(TASK_QUEUE_NAME)
+            return "healthy", {"name": TASK_QUEUE_NAME, "depth": depth}
+        except Exception as e:
+            self.logger.warning(f"采集任务队列统计失败: {e}")
+            return "unhealthy", {"name": TASK_QUEUE_NAME, "depth": None}
+
+    def _collect_worker_heartbeats(self):
+        """采集存活工作器的心跳信息"""
+        from ikuyo.core.worker.main import HEARTBEAT_KEY_PREFIX
+
+        workers = []
+        try:
+            redis_client = get_redis_connection()
+            now = time.time()
+            for key in redis_client.scan_iter(match=f"{HEARTBEAT_KEY_PREFIX}*", count=100):
+                raw = redis_client.get(key)
+                if not raw:
+                    continue
+                heartbeat = json.loads(raw)
+                heartbeat["age"] = round(now - heartbeat.get("timestamp", now), 2)
+                workers.append(heartbeat)
+        except Exception as e:
+            self.logger.warning(f"采集工作器心跳失败: {e}")
+        return workers
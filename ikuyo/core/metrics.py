@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+运行指标
+- MetricsRegistry：进程内的计数器、仪表和直方图注册表，可输出Prometheus文本格式
+- SharedMetrics：跨进程指标，本地累积增量后批量写入Redis哈希（HINCRBYFLOAT），
+  API的 /metrics 读取并合并，工作器子进程、爬虫子进程及多个API进程的数据都不会丢失
+"""
+
+import bisect
+import json
+import logging
+import math
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+# 默认延迟分桶（秒），覆盖本地缓存到慢速上游请求
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def items(self) -> List[Tuple[LabelValues, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+    def drain(self) -> List[Tuple[LabelValues, float]]:
+        """取出并清零当前累积值"""
+        with self._lock:
+            items = list(self._values.items())
+            self._values.clear()
+        return items
+
+    def merge(self, items: Iterable[Tuple[LabelValues, float]]) -> None:
+        """将取出的累积值加回（推送失败时使用）"""
+        with self._lock:
+            for key, value in items:
+                self._values[key] = self._values.get(key, 0) + value
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, value in sorted(self.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """可增可减的仪表"""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """累积分桶直方图"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [各分桶计数..., +Inf计数], 总和
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        """记录with块的执行耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def summary(self, **labels: str) -> Dict[str, float]:
+        """计数、总和、平均值及按分桶估算的p50/p95/p99"""
+        key = self._key(labels)
+        with self._lock:
+            counts = list(self._counts.get(key, []))
+            total = self._sums.get(key, 0.0)
+        return self._summarize(counts, total)
+
+    def _summarize(self, counts: List[int], total: float) -> Dict[str, float]:
+        count = sum(counts)
+        result = {"count": count, "sum": round(total, 6)}
+        if not count:
+            return result
+        result["avg"] = round(total / count, 6)
+        for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            result[name] = self._quantile(counts, q)
+        return result
+
+    def _quantile(self, counts: List[int], q: float) -> float:
+        """返回包含该分位数的分桶上界"""
+        target = q * sum(counts)
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return bound
+        return math.inf
+
+    def items(self) -> List[Tuple[LabelValues, List[int], float]]:
+        with self._lock:
+            return [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+
+    def drain(self) -> List[Tuple[LabelValues, List[int], float]]:
+        """取出并清零当前累积值"""
+        with self._lock:
+            items = [(key, counts, self._sums[key]) for key, counts in self._counts.items()]
+            self._counts = {}
+            self._sums = {}
+        return items
+
+    def merge(self, items: Iterable[Tuple[LabelValues, List[int], float]]) -> None:
+        """将分桶计数与总和加回"""
+        with self._lock:
+            for key, counts, total in items:
+                current = self._counts.get(key)
+                if current is None:
+                    current = self._counts[key] = [0] * (len(self.buckets) + 1)
+                    self._sums[key] = 0.0
+                for index, count in enumerate(counts):
+                    current[index] += count
+                self._sums[key] += total
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, counts, total in sorted(self.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    指标注册表
+    - counter/gauge/histogram 按名称取得或创建指标
+    - register_collector 注册在导出前执行的回调，用于刷新按需计算的仪表
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def register_collector(self, collector: Callable[[], None]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def metrics(self) -> Iterable[_Metric]:
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"指标采集回调失败: {e}")
+        with self._lock:
+            return sorted(self._metrics.values(), key=lambda m: m.name)
+
+    def render(self) -> str:
+        """导出Prometheus文本格式"""
+        lines: List[str] = []
+        for metric in self.metrics():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """
+        清零全部指标的累积值（fork出的子进程用于丢弃继承自父进程的未推送数据）
+        指标对象保留在注册表中，模块级引用继续记录并随 flush 推送
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.drain()
+
+
+REGISTRY = MetricsRegistry()
+
+# 跨进程指标在Redis中的存储
+SHARED_METRICS_KEY_PREFIX = "ikuyo:metrics:"
+SHARED_METRICS_META_KEY = "ikuyo:metrics:meta"
+# 推送过仪表的进程实例（有序集合，分数为最近推送时间）
+SHARED_METRICS_INSTANCES_KEY = "ikuyo:metrics:instances"
+# 仪表按进程实例分别保存，超过该时间未推送（进程已退出）的值过期
+SHARED_GAUGE_TTL = 60
+# 实例列表中超过该时间未推送的实例被清理
+SHARED_INSTANCE_RETENTION = 86400
+
+
+def _gauge_key(name: str, instance: str) -> str:
+    return f"{SHARED_METRICS_KEY_PREFIX}{name}@{instance}"
+
+
+def metrics_instance() -> str:
+    """当前进程的实例标识（主机名:PID），fork后随PID变化"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _field(key: LabelValues, suffix: str) -> str:
+    return json.dumps([list(key), suffix], ensure_ascii=False)
+
+
+class SharedMetrics(MetricsRegistry):
+    """
+    跨进程指标注册表
+    - 记录操作只修改本地内存，开销与进程内指标相同
+    - flush 将累积的增量用一次Redis pipeline写入，计数器与直方图用HINCRBYFLOAT累加
+    - 仪表按进程实例（instance标签）分别写入并设置过期时间，同标签的多个进程互不覆盖，
+      退出进程的值在 gauge_ttl 后消失
+    - 推送失败时增量保留在本地，下次推送时一并写入
+    """
+
+    def __init__(self, flush_interval: float = 10):
+        super().__init__()
+        self.flush_interval = flush_interval
+        self.gauge_ttl = max(SHARED_GAUGE_TTL, int(flush_interval * 3))
+        self._last_flush = time.monotonic()
+        self._flush_lock = threading.Lock()
+
+    def maybe_flush(self) -> bool:
+        """距上次推送超过flush_interval时推送"""
+        if time.monotonic() - self._last_flush < self.flush_interval:
+            return True
+        return self.flush()
+
+    def flush(self) -> bool:
+        """将累积的增量推送到Redis"""
+        from .redis_client import get_redis_connection
+
+        with self._flush_lock:
+            self._last_flush = time.monotonic()
+            with self._lock:
+                metrics = list(self._metrics.values())
+            drained = [(metric, metric.drain()) for metric in metrics if not isinstance(metric, Gauge)]
+            instance = metrics_instance()
+            try:
+                pipe = get_redis_connection().pipeline(transaction=False)
+                pipe.zadd(SHARED_METRICS_INSTANCES_KEY, {instance: time.time()})
+                for metric in metrics:
+                    pipe.hset(SHARED_METRICS_META_KEY, metric.name, json.dumps(self._meta(metric)))
+                    if isinstance(metric, Gauge):
+                        gauge_key = _gauge_key(metric.name, instance)
+                        pipe.delete(gauge_key)
+                        values = {_field(key, "v"): value for key, value in metric.items()}
+                        if values:
+                            pipe.hset(gauge_key, mapping=values)
+                            pipe.expire(gauge_key, self.gauge_ttl)
+                for metric, items in drained:
+                    redis_key = SHARED_METRICS_KEY_PREFIX + metric.name
+                    if isinstance(metric, Histogram):
+                        for key, counts, total in items:
+                            for index, count in enumerate(counts):
+                                if count:
+                                    pipe.hincrbyfloat(redis_key, _field(key, f"b{index}"), count)
+                            pipe.hincrbyfloat(redis_key, _field(key, "sum"), total)
+                    else:
+                        for key, value in items:
+                            pipe.hincrbyfloat(redis_key, _field(key, "v"), value)
+                pipe.execute()
+                return True
+            except Exception as e:
+                for metric, items in drained:
+                    metric.merge(items)
+                # 爬虫子进程的stdout用于向父进程返回结果，此处只能写日志
+                logger.warning(f"推送共享指标失败，将在下次重试: {e}")
+                return False
+
+    @staticmethod
+    def _meta(metric: _Metric) -> Dict[str, object]:
+        meta = {
+            "type": metric.metric_type,
+            "help": metric.documentation,
+            "labelnames": list(metric.labelnames),
+        }
+        if isinstance(metric, Histogram):
+            meta["buckets"] = list(metric.buckets)
+        return meta
+
+
+def load_shared_metrics() -> MetricsRegistry:
+    """
+    从Redis读取所有进程推送的指标，构造一个只读注册表
+    仪表增加 instance 标签，每个仍在推送的进程一条
+    """
+    from .redis_client import get_redis_connection
+
+    client = get_redis_connection()
+    client.zremrangebyscore(SHARED_METRICS_INSTANCES_KEY, 0, time.time() - SHARED_INSTANCE_RETENTION)
+    meta = client.hgetall(SHARED_METRICS_META_KEY)
+    instances = sorted(client.zrange(SHARED_METRICS_INSTANCES_KEY, 0, -1))
+    names = sorted(meta)
+    pipe = client.pipeline(transaction=False)
+    for name in names:
+        if json.loads(meta[name])["type"] == "gauge":
+            for instance in instances:
+                pipe.hgetall(_gauge_key(name, instance))
+        else:
+            pipe.hgetall(SHARED_METRICS_KEY_PREFIX + name)
+    results = iter(pipe.execute())
+
+    registry = MetricsRegistry()
+    for name in names:
+        info = json.loads(meta[name])
+        labelnames = info.get("labelnames", [])
+        if info["type"] == "gauge":
+            metric = registry.gauge(name, info["help"], list(labelnames) + ["instance"])
+            for instance in instances:
+                fields = next(results)
+                metric.merge(
+                    (tuple(json.loads(field)[0]) + (instance,), float(value))
+                    for field, value in fields.items()
+                )
+            continue
+        fields = next(results)
+        if info["type"] == "histogram":
+            metric = registry.histogram(name, info["help"], labelnames, info["buckets"])
+            items: Dict[LabelValues, Tuple[List[int], float]] = {}
+            for field, value in fields.items():
+                labels, suffix = json.loads(field)
+                counts, total = items.get(tuple(labels), ([0] * (len(metric.buckets) + 1), 0.0))
+                if suffix == "sum":
+                    total = float(value)
+                else:
+                    counts[int(suffix[1:])] = int(float(value))
+                items[tuple(labels)] = (counts, total)
+            metric.merge((key, counts, total) for key, (counts, total) in items.items())
+        else:
+            metric = registry.counter(name, info["help"], labelnames)
+            metric.merge((tuple(json.loads(field)[0]), float(value)) for field, value in fields.items())
+    return registry
+
+
+# 跨进程指标的进程内实例（工作器、爬虫子进程、API进程各自一份）
+SHARED_REGISTRY = SharedMetrics()
+
+# Prometheus文本格式的Content-Type
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
@@ -15,6 +15,7 @@ class RedisManager:
 
     _instance: Optional["RedisManager"] = None
     _connection_pool: Optional[redis.ConnectionPool] = None
+    _binary_connection_pool: Optional[redis.ConnectionPool] = None
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
@@ -57,10 +58,29 @@ class RedisManager:
             raise ConnectionError("Redis connection pool is not initialized.")
         return redis.Redis(connection_pool=self._connection_pool)
 
+    def get_binary_connection(self) -> redis.Redis:
+        """
+        获取一个不解码响应的 Redis 连接，用于存取二进制数据
+        """
+        if self._connection_pool is None:
+            raise ConnectionError("Redis connection pool is not initialized.")
+        if self._binary_connection_pool is None:
+            self._binary_connection_pool = redis.ConnectionPool(
+                host=self.host,
+                port=self.port,
+                db=self.db,
+                password=self.password,
+                decode_responses=False,
+            )
+        return redis.Redis(connection_pool=self._binary_connection_pool)
+
     def close_pool(self):
         """
         关闭连接池
         """
+        if self._binary_connection_pool:
+            self._binary_connection_pool.disconnect()
+            self._binary_connection_pool = None
         if self._connection_pool:
             self._connection_pool.disconnect()
             self._connection_pool = None
@@ -94,3 +114,10 @@ def get_redis_connection() -> redis.Redis:
     获取一个 Redis 连接
     """
     return get_redis_manager().get_connection()
+
+
+def get_redis_binary_connection() -> redis.Redis:
+    """
+    获取一个返回原始 bytes 的 Redis 连接
+    """
+    return get_redis_manager().get_binary_connection()
@@ -26,6 +26,21 @@ class AnimeRepository:
         statement = select(Anime).offset(offset).limit(limit)
         return list(self.session.exec(statement))
 
+    def get_all_bangumi_ids(self, limit: Optional[int] = None) -> List[int]:
+        """获取关联了Bangumi的番剧ID，按最近更新排序"""
+        statement = (
+            select(Anime.bangumi_id)
+            .where(Anime.bangumi_id.is_not(None))
+            .order_by(Anime.updated_at.desc())
+        )
+        if limit is not None:
+            statement = statement.limit(limit)
+        return list(self.session.exec(statement))
+
+    def count(self) -> int:
+        statement = select(func.count()).select_from(Anime)
+        return self.session.exec(statement).one()
+
     def update(self, anime: Anime) -> Anime:
         self.session.add(anime)
         self.session.commit()
@@ -1,7 +1,7 @@
 from typing import Optional, List
 from sqlmodel import Session, select, col
 from ikuyo.core.models import Resource
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, insert
 
 
 class ResourceRepository:
@@ -14,6 +14,14 @@ class ResourceRepository:
         self.session.refresh(resource)
         return resource
 
+    def bulk_create(self, rows: List[dict]) -> int:
+        """批量插入资源（rows 为列名到值的字典），不构造ORM对象，一次executemany、一次提交"""
+        if not rows:
+            return 0
+        self.session.execute(insert(Resource), rows)
+        self.session.commit()
+        return len(rows)
+
     def get_by_id(self, resource_id: int) -> Optional[Resource]:
         return self.session.get(Resource, resource_id)
 
@@ -26,6 +34,10 @@ class ResourceRepository:
         )
         return list(self.session.exec(statement))
 
+    def count(self) -> int:
+        statement = select(func.count()).select_from(Resource)
+        return self.session.exec(statement).one()
+
     def update(self, resource: Resource) -> Resource:
         self.session.add(resource)
         self.session.commit()
@@ -1,6 +1,6 @@
 from typing import Optional, Tuple
 
-from sqlmodel import Session, asc, desc, or_, select
+from sqlmodel import Session, asc, desc, func, or_, select
 
 from ikuyo.core.models.user_subscription import UserSubscription
 
@@ -87,3 +87,13 @@ class SubscriptionRepository:
             select(UserSubscription.bangumi_id).where(UserSubscription.user_id == user_id)
         ).all()
         return [row[0] if isinstance(row, tuple) else row for row in result]
+
+    def get_all_bangumi_ids(self) -> list[int]:
+        """获取所有用户订阅过的bangumi_id（去重）"""
+        result = self.session.exec(select(UserSubscription.bangumi_id).distinct()).all()
+        return [row[0] if isinstance(row, tuple) else row for row in result]
+
+    def count(self) -> int:
+        """统计全部订阅记录数"""
+        statement = select(func.count()).select_from(UserSubscription)
+        return self.session.exec(statement).one()
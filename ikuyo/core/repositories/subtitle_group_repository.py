@@ -1,5 +1,6 @@
 from typing import Optional, List
 from sqlmodel import Session, select
+from sqlalchemy import func
 from ikuyo.core.models import SubtitleGroup
 
 
@@ -20,6 +21,10 @@ class SubtitleGroupRepository:
         statement = select(SubtitleGroup).offset(offset).limit(limit)
         return list(self.session.exec(statement))
 
+    def count(self) -> int:
+        statement = select(func.count()).select_from(SubtitleGroup)
+        return self.session.exec(statement).one()
+
     def update(self, group: SubtitleGroup) -> SubtitleGroup:
         self.session.add(group)
         self.session.commit()
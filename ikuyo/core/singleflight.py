@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+请求合并（single-flight）
+同一个键的并发调用只执行一次，其余调用方等待同一个结果
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    按键合并进行中的异步调用
+    - 首个调用方创建任务，后续调用方共享该任务的结果或异常
+    - 任务结束后立即移除，下一次调用会重新执行
+    - 单个调用方被取消不会取消共享任务
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.deduplicated = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行或加入一个调用
+
+        Args:
+            key: 合并键
+            func: 无参协程函数，仅在没有进行中的同键调用时执行
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        else:
+            self.deduplicated += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 所有调用方都已取消时避免"exception was never retrieved"告警
+        if not task.cancelled():
+            task.exception()
+
+    def is_inflight(self, key: Hashable) -> bool:
+        """指定键是否有进行中的调用"""
+        return key in self._inflight
+
+    def inflight_count(self) -> int:
+        """当前进行中的调用数"""
+        return len(self._inflight)
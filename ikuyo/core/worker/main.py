@@ -4,13 +4,23 @@
 集成进程池和任务分发器，提供统一的worker管理接口
 """
 
+import json
+import os
+import socket
 import time
 import signal
 import logging
 from typing import Optional
-from ikuyo.core.worker.process_pool import ProcessPool
+from ikuyo.core.config import load_config
+from ikuyo.core.metrics import SHARED_REGISTRY
+from ikuyo.core.worker.process_pool import WORKER_QUEUE_DEPTH, ProcessPool
 from ikuyo.core.worker.redis_consumer import RedisTaskConsumer
-from ikuyo.core.redis_client import get_redis_manager
+from ikuyo.core.redis_client import get_redis_connection, get_redis_manager
+
+# 工作器心跳键前缀，API 健康统计通过扫描该前缀获取存活的工作器
+HEARTBEAT_KEY_PREFIX = "ikuyo:worker_heartbeat:"
+# 心跳过期时间（秒），应大于主循环检查间隔
+HEARTBEAT_TTL = 30
 
 
 class WorkerManager:
@@ -25,6 +35,7 @@ class WorkerManager:
         self.redis_consumer: Optional[RedisTaskConsumer] = None
         self.is_running = False
         self.logger = logging.getLogger(__name__)
+        self.metrics_enabled = getattr(load_config(), "metrics", {}).get("enabled", True)
 
         # 设置信号处理
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -89,6 +100,14 @@ class WorkerManager:
             if self.process_pool:
                 self.process_pool.stop()
 
+            # 清除心跳，避免停止后仍被视为在线
+            try:
+                get_redis_connection().delete(
+                    f"{HEARTBEAT_KEY_PREFIX}{socket.gethostname()}:{os.getpid()}"
+                )
+            except Exception:
+                pass
+
             # 关闭 Redis 连接池
             get_redis_manager().close_pool()
 
@@ -115,6 +134,12 @@ class WorkerManager:
                 # 打印状态信息
                 self._log_status()
 
+                # 上报心跳
+                self._publish_heartbeat()
+
+                # 更新并推送指标
+                self._publish_metrics()
+
                 time.sleep(10)  # 每10秒检查一次
 
         except KeyboardInterrupt:
@@ -169,6 +194,36 @@ class WorkerManager:
         except Exception as e:
             self.logger.error(f"状态检查失败: {e}")
 
+    def _publish_heartbeat(self):
+        """将工作器状态作为心跳写入Redis，过期即视为离线"""
+        try:
+            key = f"{HEARTBEAT_KEY_PREFIX}{socket.gethostname()}:{os.getpid()}"
+            heartbeat = {
+                "host": socket.gethostname(),
+                "pid": os.getpid(),
+                "timestamp": time.time(),
+                **self.get_status(),
+            }
+            get_redis_connection().set(key, json.dumps(heartbeat), ex=HEARTBEAT_TTL)
+        except Exception as e:
+            self.logger.error(f"上报心跳失败: {e}")
+
+    def _publish_metrics(self):
+        """更新队列深度与进程池仪表，并将本进程的指标推送到Redis"""
+        if not self.metrics_enabled:
+            return
+        try:
+            if self.process_pool:
+                self.process_pool.record_metrics()
+            if self.redis_consumer:
+                WORKER_QUEUE_DEPTH.set(
+                    self.redis_consumer.redis_client.llen(self.redis_consumer.queue_name),
+                    queue="redis",
+                )
+            SHARED_REGISTRY.flush()
+        except Exception as e:
+            self.logger.error(f"推送指标失败: {e}")
+
     def _signal_handler(self, signum, frame):
         """信号处理器"""
         self.logger.info(f"收到信号 {signum}，正在停止工作器...")
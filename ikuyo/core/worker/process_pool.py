@@ -8,12 +8,64 @@ import multiprocessing as mp
 import queue
 import time
 import logging
+from datetime import datetime, timezone
 from typing import Dict, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 import signal
 import os
 
+from ikuyo.core.metrics import DEFAULT_LATENCY_BUCKETS, SHARED_REGISTRY
+
+# 任务耗时分桶（秒），爬虫任务通常持续数十秒到数十分钟
+TASK_DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+
+WORKER_DISPATCH_LATENCY = SHARED_REGISTRY.histogram(
+    "ikuyo_worker_dispatch_latency_seconds",
+    "任务从入队到工作进程开始执行的延迟（秒）",
+    ["task_type"],
+    DEFAULT_LATENCY_BUCKETS + (60.0, 300.0, 900.0),
+)
+WORKER_TASK_DURATION = SHARED_REGISTRY.histogram(
+    "ikuyo_worker_task_duration_seconds",
+    "工作进程执行任务的耗时（秒）",
+    ["task_type", "status"],
+    TASK_DURATION_BUCKETS,
+)
+WORKER_TASKS = SHARED_REGISTRY.counter(
+    "ikuyo_worker_tasks_total",
+    "工作进程执行完成的任务数",
+    ["task_type", "status"],
+)
+WORKER_QUEUE_DEPTH = SHARED_REGISTRY.gauge(
+    "ikuyo_worker_queue_depth",
+    "待处理任务数",
+    ["queue"],
+)
+WORKER_PROCESSES = SHARED_REGISTRY.gauge(
+    "ikuyo_worker_processes",
+    "工作进程数",
+    ["state"],
+)
+
+
+def _enqueued_timestamp(task_data: Dict[str, Any]) -> Optional[float]:
+    """任务入队时间戳；旧消息没有enqueued_at时退回到任务创建时间"""
+    enqueued_at = task_data.get("enqueued_at")
+    if enqueued_at:
+        return float(enqueued_at)
+    created_at = task_data.get("created_at")
+    if not created_at:
+        return None
+    try:
+        created = datetime.fromisoformat(created_at)
+    except ValueError:
+        return None
+    if created.tzinfo is None:
+        # SQLite不保存时区，写入时为UTC
+        created = created.replace(tzinfo=timezone.utc)
+    return created.timestamp()
+
 
 class ProcessStatus(Enum):
     IDLE = "idle"
@@ -163,6 +215,17 @@ class ProcessPool:
             "queue_size": queue_size,
         }
 
+    def record_metrics(self) -> None:
+        """更新进程池相关仪表"""
+        status = self.get_pool_status()
+        WORKER_QUEUE_DEPTH.set(status["queue_size"], queue="process_pool")
+        WORKER_PROCESSES.set(status["idle_workers"], state="idle")
+        WORKER_PROCESSES.set(status["busy_workers"], state="busy")
+        WORKER_PROCESSES.set(
+            sum(1 for info in self.processes.values() if info.process.is_alive()),
+            state="alive",
+        )
+
     def monitor_processes(self):
         """监控进程健康状态"""
         # current_time = time.time()
@@ -213,6 +276,9 @@ class ProcessPool:
         logger = logging.getLogger(f"worker-{worker_id}")
         logger.info(f"工作进程 {worker_id} 已启动")
 
+        # fork时继承了父进程尚未推送的指标，清空以免重复计数
+        SHARED_REGISTRY.reset()
+
         while True:
             try:
                 # 检查控制信号
@@ -232,8 +298,16 @@ class ProcessPool:
 
                 # 执行任务
                 task_id = task_data.get("task_id")
+                task_type = task_data.get("task_type") or "unknown"
                 logger.info(f"工作进程 {worker_id} 开始执行任务 {task_id}")
 
+                task_started = time.time()
+                enqueued_at = _enqueued_timestamp(task_data)
+                if enqueued_at is not None:
+                    WORKER_DISPATCH_LATENCY.observe(
+                        max(0.0, task_started - enqueued_at), task_type=task_type
+                    )
+
                 # 更新任务的 worker_pid
                 try:
                     from ikuyo.core.database import get_session
@@ -273,6 +347,12 @@ class ProcessPool:
                         "error": str(e),
                     }
 
+                WORKER_TASK_DURATION.observe(
+                    time.time() - task_started, task_type=task_type, status=result["status"]
+                )
+                WORKER_TASKS.inc(task_type=task_type, status=result["status"])
+                SHARED_REGISTRY.flush()
+
                 result_queue.put(result)
                 logger.info(f"工作进程 {worker_id} 完成任务 {task_id}")
 
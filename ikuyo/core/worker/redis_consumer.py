@@ -16,6 +16,13 @@ from ikuyo.core.database import get_session
 from ikuyo.core.repositories.crawler_task_repository import CrawlerTaskRepository
 from ikuyo.core.worker.process_pool import ProcessPool
 from ikuyo.core.redis_client import get_redis_connection
+from ikuyo.core.metrics import SHARED_REGISTRY
+
+WORKER_DISPATCHES = SHARED_REGISTRY.counter(
+    "ikuyo_worker_dispatches_total",
+    "任务分发次数",
+    ["status"],
+)
 
 
 class RedisTaskConsumer:
@@ -107,6 +114,7 @@ class RedisTaskConsumer:
                     continue
 
                 task_id = task_data.get("task_id")
+                enqueued_at = task_data.get("enqueued_at")
 
                 if not task_id:
                     self.logger.warning(
@@ -115,7 +123,7 @@ class RedisTaskConsumer:
                     continue
 
                 self.logger.info(f"Received task {task_id} from Redis queue.")
-                self._process_task(task_id)
+                self._process_task(task_id, enqueued_at)
 
             except redis.exceptions.ConnectionError as e:
                 self.logger.error(
@@ -132,9 +140,13 @@ class RedisTaskConsumer:
 
         self.logger.info("Task consumption loop has exited.")
 
-    def _process_task(self, task_id: int):
+    def _process_task(self, task_id: int, enqueued_at: Optional[float] = None):
         """
         从数据库获取任务详情并分发
+
+        Args:
+            task_id: 任务ID
+            enqueued_at: 任务入队时间戳，随任务传给工作进程用于统计调度延迟
         """
         try:
             with get_session() as session:
@@ -161,6 +173,7 @@ class RedisTaskConsumer:
                     )
                     # Consider marking the task as failed here
                     return
+                task_data_for_process["enqueued_at"] = enqueued_at
 
                 # 更新任务状态为 'running'
                 try:
@@ -175,8 +188,10 @@ class RedisTaskConsumer:
 
                 # 提交到进程池
                 if self.process_pool.submit_task(task_data_for_process):
+                    WORKER_DISPATCHES.inc(status="dispatched")
                     self.logger.info(f"Task {task_id} dispatched to process pool.")
                 else:
+                    WORKER_DISPATCHES.inc(status="rejected")
                     self.logger.warning(
                         f"Failed to dispatch task {task_id} to process pool. Rolling back status."
                     )
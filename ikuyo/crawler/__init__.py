@@ -2,6 +2,6 @@
 爬虫模块
 """
 
-from .items import AnimeItem, CrawlLogItem, ResourceItem, SubtitleGroupItem
+from .items import AnimeItem, CrawlLogItem, ResourceRecord, SubtitleGroupItem
 
-__all__ = ["AnimeItem", "CrawlLogItem", "ResourceItem", "SubtitleGroupItem"]
+__all__ = ["AnimeItem", "CrawlLogItem", "ResourceRecord", "SubtitleGroupItem"]
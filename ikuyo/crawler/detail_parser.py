@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+番剧详情页解析
+在Scrapy已解析好的lxml树上做一次文档序遍历（iterwalk），同时收集详情页的全部字段：
+标题、Bangumi链接、放送日期、放送开始、官方网站、简介以及字幕组与其资源表格
+取代逐字段的全文档CSS/XPath查询（如两次遍历全部文本节点、按域名逐个查询链接、
+每个字幕组一次 following-sibling 查询）。在资源表格之外，字段的取值规则与原来的选择器保持一致：
+- 放送日期/放送开始：第一个包含对应前缀的文本节点
+- 官方网站：依次为“官方网站”文本所在元素内的第一个链接、文本含“官方网站”的链接、
+  第一个非站内外部链接、特定域名链接
+- 简介：依次取 .header2-desc、.bangumi-info p、.description、.summary 的第一个文本节点，
+  均不满足时取 meta description
+字幕组的资源表格（紧随字幕组div的同级table）只记录元素，不进入其子树，资源行由 iter_resource_rows 逐行解析。
+这是有意的行为变化：原选择器扫描全文档，详情字段只出现在资源表格中时（如资源标题含“放送日期：”、
+资源行中的 bgm.tv/subject 链接或站外绝对链接）会被取为番剧字段，现在这些内容不再参与字段提取
+（对应情形见 benchmarks/bench_detail_parse.py 的 table_cases）
+"""
+
+from typing import Any, Dict, Iterator, List, Optional
+
+from lxml import etree
+
+TITLE_PREFIX = "Mikan Project - "
+BROADCAST_DAY_PREFIX = "放送日期："
+BROADCAST_START_PREFIX = "放送开始："
+OFFICIAL_WEBSITE_MARK = "官方网站"
+EXCLUDED_DOMAINS = ("bgm.tv", "mikanani.me", "bangumi.tv")
+OFFICIAL_DOMAINS = (
+    "aniplex.co.jp",
+    "tbs.co.jp",
+    "mbs.jp",
+    "tokyo-mx.jp",
+    "at-x.com",
+    "animax.co.jp",
+)
+# 简介候选（按优先级），名称对应遍历时为文本节点父元素打的标记
+DESCRIPTION_SOURCES = ("header2-desc", "bangumi-info p", "description", "summary")
+DESCRIPTION_MIN_LENGTH = 10
+SITE_DESCRIPTION_MARKS = ("蜜柑计划", "Mikan Project")
+
+_DESCENDANT_HREFS = etree.XPath(".//a/@href")
+_ANCHOR_TEXTS = etree.XPath(".//a/text()")
+_TABLE_ROWS = etree.XPath("descendant::tbody/descendant::tr")
+_ROW_CELLS = etree.XPath("descendant::td")
+
+
+def _first_text(element) -> str:
+    """元素的第一个直接文本节点（等同于XPath中 contains(text(), ...) 的取值）"""
+    if element.text is not None:
+        return element.text
+    for child in element:
+        if child.tail is not None:
+            return child.tail
+    return ""
+
+
+def _first_following_text(element) -> str:
+    """元素之后第一个同级文本节点（等同于 contains(following-sibling::text(), ...) 的取值）"""
+    node = element
+    while node is not None:
+        if node.tail is not None:
+            return node.tail
+        node = node.getnext()
+    return ""
+
+
+class _DetailPageWalker:
+    """一次遍历的状态"""
+
+    def __init__(self):
+        self.broadcast_day: Optional[str] = None
+        self.broadcast_start: Optional[str] = None
+        self.bangumi_url: Optional[str] = None
+        self.meta_description: Optional[str] = None
+        # 包含“官方网站”文本的节点的父元素（文档序）
+        self.official_parents: List[Any] = []
+        self.official_anchor: Optional[str] = None
+        self.external_link: Optional[str] = None
+        self.domain_links: Dict[str, str] = {}
+        # 标记名 -> 第一个父元素带该标记的文本节点
+        self.marked_texts: Dict[str, str] = {}
+        self.groups: List[Dict[str, Any]] = []
+        self._pending_groups: List[Dict[str, Any]] = []
+        # 打开中的元素：(文本节点标记, 是否带 bangumi-info 类)
+        self._stack: List[tuple] = []
+        self._bangumi_info_depth = 0
+
+    def walk(self, root) -> None:
+        walker = etree.iterwalk(root, events=("start", "end"))
+        stack = self._stack
+        skipped = None
+        for event, element in walker:
+            if event == "start":
+                self._comment_tails(element.getprevious(), element.getparent())
+                classes = element.get("class")
+                classes = classes.split() if classes else ()
+                marks = self._marks(element.tag, classes)
+                is_bangumi_info = "bangumi-info" in classes
+                stack.append((marks, is_bangumi_info))
+                if is_bangumi_info:
+                    self._bangumi_info_depth += 1
+                if element.text is not None:
+                    self._text(element.text, element, marks)
+                if self._start(element, classes):
+                    walker.skip_subtree()
+                    skipped = element
+            else:
+                if element is not skipped and len(element):
+                    self._comment_tails(element[-1], element)
+                _, is_bangumi_info = stack.pop()
+                if is_bangumi_info:
+                    self._bangumi_info_depth -= 1
+                if element.tail is not None and stack:
+                    self._text(element.tail, element.getparent(), stack[-1][0])
+
+    def _marks(self, tag, classes) -> tuple:
+        marks = []
+        if tag == "title":
+            marks.append("title")
+        elif tag == "p" and self._bangumi_info_depth:
+            marks.append("bangumi-info p")
+        for name in ("header2-desc", "description", "summary"):
+            if name in classes:
+                marks.append(name)
+        return tuple(marks)
+
+    def _comment_tails(self, node, parent) -> None:
+        """注释/处理指令不出现在遍历中，其后的文本节点在此补上（保持文档序）"""
+        if node is None or isinstance(node.tag, str) or not self._stack:
+            return
+        nodes = []
+        while node is not None and not isinstance(node.tag, str):
+            nodes.append(node)
+            node = node.getprevious()
+        marks = self._stack[-1][0] if parent is not None else ()
+        for comment in reversed(nodes):
+            if comment.tail is not None:
+                self._text(comment.tail, parent, marks)
+
+    def _text(self, text: str, parent, marks: tuple) -> None:
+        if self.broadcast_day is None and BROADCAST_DAY_PREFIX in text:
+            self.broadcast_day = text.replace(BROADCAST_DAY_PREFIX, "").strip()
+        if self.broadcast_start is None and BROADCAST_START_PREFIX in text:
+            value = text.replace(BROADCAST_START_PREFIX, "").strip()
+            if value:
+                self.broadcast_start = value
+        if OFFICIAL_WEBSITE_MARK in text and parent is not None:
+            if not self.official_parents or self.official_parents[-1] is not parent:
+                self.official_parents.append(parent)
+        for mark in marks:
+            if mark not in self.marked_texts:
+                self.marked_texts[mark] = text
+
+    def _start(self, element, classes) -> bool:
+        """处理元素本身，返回True表示跳过其子树"""
+        tag = element.tag
+        if tag == "a":
+            href = element.get("href")
+            if href is not None:
+                self._link(element, href)
+        elif tag == "meta":
+            if self.meta_description is None and element.get("name") == "description":
+                self.meta_description = element.get("content")
+        elif tag == "div" and "subgroup-text" in classes:
+            group = {"element": element, "table": None}
+            self.groups.append(group)
+            self._pending_groups.append(group)
+        elif tag == "table" and self._pending_groups and "table" in (element.get("class") or ""):
+            parent = element.getparent()
+            waiting = [g for g in self._pending_groups if g["element"].getparent() is parent]
+            if waiting:
+                for group in waiting:
+                    group["table"] = element
+                    self._pending_groups.remove(group)
+                return True
+        return False
+
+    def _link(self, element, href: str) -> None:
+        if self.bangumi_url is None and "bgm.tv/subject/" in href:
+            self.bangumi_url = href
+        if self.external_link is None and href.startswith("http"):
+            if not any(domain in href for domain in EXCLUDED_DOMAINS):
+                self.external_link = href
+        if self.external_link is None:
+            for domain in OFFICIAL_DOMAINS:
+                if domain not in self.domain_links and domain in href:
+                    self.domain_links[domain] = href
+        if self.official_anchor is None and (
+            OFFICIAL_WEBSITE_MARK in _first_text(element)
+            or OFFICIAL_WEBSITE_MARK in _first_following_text(element)
+        ):
+            self.official_anchor = href
+
+    def official_website(self) -> Optional[str]:
+        for parent in self.official_parents:
+            links = _DESCENDANT_HREFS(parent)
+            if links:
+                return links[0]
+        if self.official_anchor:
+            return self.official_anchor
+        if self.external_link:
+            return self.external_link
+        for domain in OFFICIAL_DOMAINS:
+            if domain in self.domain_links:
+                return self.domain_links[domain]
+        return None
+
+    def description(self) -> Optional[str]:
+        candidates = [self.marked_texts.get(source) for source in DESCRIPTION_SOURCES]
+        candidates.append(self.meta_description)
+        for description in candidates:
+            if description and len(description.strip()) > DESCRIPTION_MIN_LENGTH:
+                if not any(mark in description for mark in SITE_DESCRIPTION_MARKS):
+                    return description.strip()
+        return None
+
+    def title(self) -> Optional[str]:
+        title = self.marked_texts.get("title")
+        if title and title.startswith(TITLE_PREFIX):
+            title = title.replace(TITLE_PREFIX, "")
+        return title
+
+    def subtitle_groups(self) -> List[Dict[str, Any]]:
+        groups = []
+        for group in self.groups:
+            group_id = group["element"].get("id")
+            names = _ANCHOR_TEXTS(group["element"])
+            if group_id and names:
+                groups.append({
+                    "group_id": group_id,
+                    "group_name": names[0].strip(),
+                    "table": group["table"],
+                })
+        return groups
+
+
+def _has_class(element, name: str) -> bool:
+    classes = element.get("class")
+    return bool(classes) and name in classes.split()
+
+
+def _first_descendant_text(element) -> Optional[str]:
+    """元素（含后代）的第一个文本节点"""
+    return next(element.itertext(), None)
+
+
+def _first_anchor_attr(cell, attr: str, class_name: Optional[str] = None) -> Optional[str]:
+    for anchor in cell.iter("a"):
+        value = anchor.get(attr)
+        if value is not None and (class_name is None or _has_class(anchor, class_name)):
+            return value
+    return None
+
+
+def iter_resource_rows(table) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    逐行解析字幕组的资源表格，直接读取lxml元素的文本与属性，边解析边产出
+
+    每行依次为标题（含磁力链接）、大小、更新时间、种子、在线播放五列，不足五列的行跳过
+
+    Yields:
+        包含 title、size、date、magnet_link、torrent_href、play_href 的原始字段字典（未strip）
+    """
+    for row in _TABLE_ROWS(table):
+        cells = _ROW_CELLS(row)
+        if len(cells) < 5:
+            continue
+        yield _resource_row_fields(cells)
+
+
+def _resource_row_fields(cells) -> Dict[str, Optional[str]]:
+    title_cell = cells[0]
+    title = None
+    for anchor in title_cell.iter("a"):
+        if _has_class(anchor, "magnet-link-wrap"):
+            title = _first_descendant_text(anchor)
+            if title is not None:
+                break
+    return {
+        "title": title or _first_descendant_text(title_cell),
+        "size": _first_descendant_text(cells[1]),
+        "date": _first_descendant_text(cells[2]),
+        "magnet_link": _first_anchor_attr(title_cell, "data-clipboard-text", "js-magnet"),
+        "torrent_href": _first_anchor_attr(cells[3], "href"),
+        "play_href": _first_anchor_attr(cells[4], "href"),
+    }
+
+
+def parse_detail_page(root) -> Dict[str, Any]:
+    """
+    解析番剧详情页
+
+    Args:
+        root: 页面的lxml根元素（Scrapy响应中为 response.selector.root）
+
+    Returns:
+        包含 title、bangumi_url、broadcast_day、broadcast_start、official_website、description
+        及 subtitle_groups（每项含 group_id、group_name 和资源表格元素 table，无表格时为None）的字典
+    """
+    walker = _DetailPageWalker()
+    walker.walk(root)
+    return {
+        "title": walker.title(),
+        "bangumi_url": walker.bangumi_url,
+        "broadcast_day": walker.broadcast_day,
+        "broadcast_start": walker.broadcast_start,
+        "official_website": walker.official_website(),
+        "description": walker.description(),
+        "subtitle_groups": walker.subtitle_groups(),
+    }
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+爬虫扩展
+CrawlerMetricsExtension 统计页面数、数据项数及吞吐量，周期性推送到Redis共享指标，
+爬虫运行在独立子进程中，推送后由API的 /metrics 汇总
+"""
+
+import time
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+from ikuyo.core.config import load_config
+from ikuyo.core.metrics import SHARED_REGISTRY
+
+CRAWLER_PAGES = SHARED_REGISTRY.counter(
+    "ikuyo_crawler_pages_total",
+    "爬虫收到的响应数",
+    ["spider", "status"],
+)
+CRAWLER_ITEMS = SHARED_REGISTRY.counter(
+    "ikuyo_crawler_items_total",
+    "爬虫产出的数据项数",
+    ["spider", "item_type"],
+)
+CRAWLER_PAGES_RATE = SHARED_REGISTRY.gauge(
+    "ikuyo_crawler_pages_per_second",
+    "最近一个推送周期内的页面吞吐量",
+    ["spider"],
+)
+CRAWLER_ITEMS_RATE = SHARED_REGISTRY.gauge(
+    "ikuyo_crawler_items_per_second",
+    "最近一个推送周期内的数据项吞吐量",
+    ["spider"],
+)
+CRAWLER_PARSE_SECONDS = SHARED_REGISTRY.histogram(
+    "ikuyo_crawler_parse_seconds",
+    "页面解析耗时（秒，不含下游Pipeline处理）",
+    ["callback"],
+)
+CRAWLER_DB_FLUSH_SECONDS = SHARED_REGISTRY.histogram(
+    "ikuyo_crawler_db_flush_seconds",
+    "批量写入数据库的耗时（秒）",
+    ["table"],
+)
+CRAWLER_STAGE_SECONDS = SHARED_REGISTRY.counter(
+    "ikuyo_crawler_stage_seconds_total",
+    "爬取任务各阶段累计耗时（秒）",
+    ["spider", "stage"],
+)
+
+
+class CrawlerMetricsExtension:
+    """爬虫运行指标扩展"""
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self.pages = 0
+        self.items = 0
+        self._last_pages = 0
+        self._last_items = 0
+        self._last_tick = time.monotonic()
+        self._loop = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        metrics_config = getattr(load_config(), "metrics", {})
+        if not metrics_config.get("enabled", True):
+            raise NotConfigured("metrics disabled")
+
+        extension = cls(metrics_config.get("flush_interval", 10))
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(extension.response_received, signal=signals.response_received)
+        crawler.signals.connect(extension.item_scraped, signal=signals.item_scraped)
+        return extension
+
+    def spider_opened(self, spider):
+        self._last_tick = time.monotonic()
+        self._loop = task.LoopingCall(self._tick, spider)
+        self._loop.start(self.flush_interval, now=False)
+
+    def spider_closed(self, spider, reason):
+        if self._loop and self._loop.running:
+            self._loop.stop()
+        # 爬取结束后吞吐量归零，累计值保留在计数器中
+        CRAWLER_PAGES_RATE.set(0, spider=spider.name)
+        CRAWLER_ITEMS_RATE.set(0, spider=spider.name)
+        stage_timer = getattr(spider, "stage_timer", None)
+        if stage_timer is not None:
+            for stage, seconds in stage_timer.totals().items():
+                CRAWLER_STAGE_SECONDS.inc(seconds, spider=spider.name, stage=stage)
+        SHARED_REGISTRY.flush()
+
+    def response_received(self, response, request, spider):
+        self.pages += 1
+        CRAWLER_PAGES.inc(spider=spider.name, status=str(response.status))
+
+    def item_scraped(self, item, response, spider):
+        self.items += 1
+        CRAWLER_ITEMS.inc(spider=spider.name, item_type=type(item).__name__)
+
+    def _tick(self, spider):
+        """更新吞吐量仪表并推送指标"""
+        now = time.monotonic()
+        elapsed = max(now - self._last_tick, 1e-6)
+        CRAWLER_PAGES_RATE.set(round((self.pages - self._last_pages) / elapsed, 3), spider=spider.name)
+        CRAWLER_ITEMS_RATE.set(round((self.items - self._last_items) / elapsed, 3), spider=spider.name)
+        self._last_tick = now
+        self._last_pages = self.pages
+        self._last_items = self.items
+        SHARED_REGISTRY.flush()
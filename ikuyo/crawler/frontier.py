@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+爬取边界持久化（断点续爬）
+按任务ID在Redis中记录爬虫的待处理请求和已完成的请求，任务失败后重试（同一task_id）时从中断处继续：
+- pending：请求键 -> 请求（URL、回调名、meta），季度接口请求和番剧详情页请求
+- done：已完成的请求键，季度请求在其产出的详情页请求全部记录为待处理后完成，
+  详情页在其数据写入数据库后完成（由批量存储Pipeline调用 checkpoint）
+- state：seeded 表示起始页产出的请求已全部记录，续爬时不再访问起始页；
+  total_items 为列表页得到的待处理番剧总数，续爬时用于恢复进度报告
+请求键为 season:{年份}:{季度} 或 detail:{mikan_id}
+Redis不可用时不影响爬取，只是无法续爬
+"""
+
+import json
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlFrontier:
+    """单个爬取任务的爬取边界"""
+
+    def __init__(
+        self,
+        task_id,
+        key_prefix: str = "ikuyo:frontier:",
+        ttl: int = 7 * 86400,
+        checkpoint_interval: int = 10,
+        redis_client=None,
+    ):
+        self.task_id = task_id
+        self.ttl = ttl
+        self.checkpoint_interval = checkpoint_interval
+        base = f"{key_prefix}{task_id}"
+        self.pending_key = f"{base}:pending"
+        self.done_key = f"{base}:done"
+        self.state_key = f"{base}:state"
+        self._redis = redis_client
+        self.seeded = False
+        self.total_items = 0
+        self._done = set()
+        self._pending: Dict[str, Dict] = {}
+        # 已完成但尚未写入Redis的请求键（等待数据落库）
+        self.unsaved: List[str] = []
+
+    @classmethod
+    def from_config(cls, task_id, frontier_config) -> Optional["CrawlFrontier"]:
+        """按 crawler.frontier 配置创建，未启用时返回None"""
+        if task_id is None or not frontier_config.get("enabled", False):
+            return None
+        return cls(
+            task_id,
+            key_prefix=frontier_config.get("key_prefix", "ikuyo:frontier:"),
+            ttl=int(frontier_config.get("ttl_days", 7) * 86400),
+            checkpoint_interval=frontier_config.get("checkpoint_interval", 10),
+        )
+
+    def _client(self):
+        if self._redis is None:
+            from ikuyo.core.redis_client import get_redis_connection
+
+            self._redis = get_redis_connection()
+        return self._redis
+
+    def _execute(self, action: str, build) -> bool:
+        """在Redis事务中执行写操作并刷新键的过期时间，失败时只记录日志"""
+        try:
+            pipe = self._client().pipeline()
+            build(pipe)
+            for key in (self.pending_key, self.done_key, self.state_key):
+                pipe.expire(key, self.ttl)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"任务 {self.task_id} {action}失败: {e}")
+            return False
+
+    def load(self) -> bool:
+        """读取已持久化的爬取边界，返回是否存在可续爬的进度"""
+        try:
+            pipe = self._client().pipeline()
+            pipe.smembers(self.done_key)
+            pipe.hgetall(self.pending_key)
+            pipe.hgetall(self.state_key)
+            done, pending, state = pipe.execute()
+        except Exception as e:
+            logger.warning(f"任务 {self.task_id} 读取爬取边界失败，将从头爬取: {e}")
+            return False
+        self._done = set(done)
+        self._pending = {key: json.loads(value) for key, value in pending.items()}
+        self.seeded = state.get("seeded") == "1"
+        self.total_items = int(state.get("total_items") or 0)
+        return bool(self._done or self._pending or self.seeded)
+
+    def is_done(self, key: str) -> bool:
+        return key in self._done
+
+    @property
+    def done_count(self) -> int:
+        return len(self._done)
+
+    @property
+    def done_detail_count(self) -> int:
+        """已完成的番剧详情页请求数（即已处理的番剧数）"""
+        return sum(1 for key in self._done if key.startswith("detail:"))
+
+    def pending_requests(self) -> Iterator[Tuple[str, Dict]]:
+        """未完成的待处理请求，季度请求在前"""
+        for key in sorted(self._pending, key=lambda k: (not k.startswith("season:"), k)):
+            if key not in self._done:
+                yield key, self._pending[key]
+
+    def add_pending(self, requests: Dict[str, Dict]) -> bool:
+        """记录待处理请求（请求键 -> 请求）"""
+        if not requests:
+            return True
+        self._pending.update(requests)
+        return self._execute(
+            "记录待处理请求",
+            lambda pipe: pipe.hset(
+                self.pending_key,
+                mapping={key: json.dumps(entry, ensure_ascii=False) for key, entry in requests.items()},
+            ),
+        )
+
+    def mark_seeded(self, total_items: int = 0) -> bool:
+        """起始页产出的请求已全部记录，同时记录列表页得到的番剧总数"""
+        self.seeded = True
+        self.total_items = total_items
+        return self._execute(
+            "记录起始请求",
+            lambda pipe: pipe.hset(
+                self.state_key, mapping={"seeded": "1", "total_items": total_items}
+            ),
+        )
+
+    def finish(self, key: str, total_items: Optional[int] = None) -> bool:
+        """立即将请求标记为完成（其产出已记录为待处理请求），可同时更新番剧总数"""
+        self._done.add(key)
+        self._pending.pop(key, None)
+        if total_items is not None:
+            self.total_items = total_items
+        return self._save_done([key], total_items)
+
+    def complete(self, key: str) -> None:
+        """请求已处理完毕，数据落库后由 checkpoint 写入Redis"""
+        self._done.add(key)
+        self._pending.pop(key, None)
+        self.unsaved.append(key)
+
+    def checkpoint(self) -> bool:
+        """写入已落库的完成记录"""
+        keys, self.unsaved = self.unsaved, []
+        if self._save_done(keys):
+            return True
+        # 写入失败的记录留到下次
+        self.unsaved = keys + self.unsaved
+        return False
+
+    def _save_done(self, keys: List[str], total_items: Optional[int] = None) -> bool:
+        if not keys:
+            return True
+
+        def build(pipe):
+            pipe.sadd(self.done_key, *keys)
+            pipe.hdel(self.pending_key, *keys)
+            if total_items is not None:
+                pipe.hset(self.state_key, "total_items", total_items)
+
+        return self._execute("记录已完成请求", build)
+
+    def clear(self) -> bool:
+        """任务完成后删除爬取边界"""
+        try:
+            self._client().delete(self.pending_key, self.done_key, self.state_key)
+            return True
+        except Exception as e:
+            logger.warning(f"任务 {self.task_id} 删除爬取边界失败: {e}")
+            return False
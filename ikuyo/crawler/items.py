@@ -1,3 +1,6 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
 import scrapy
 
 
@@ -27,24 +30,50 @@ class SubtitleGroupItem(scrapy.Item):
     created_at = scrapy.Field()  # 存储时间戳
 
 
-class ResourceItem(scrapy.Item):
-    """资源文件信息"""
+@dataclass
+class ResourceRecord:
+    """
+    资源文件信息（爬取热路径上的轻量记录）
+    每个番剧页面产出的资源行数远多于其它Item，因此不使用 scrapy.Item 的字典封装：
+    使用 __slots__ 的dataclass（Scrapy原生支持dataclass作为Item），字段在爬虫中即转换为最终类型，
+    写库时由 as_row 直接得到插入参数，只有逐条写入的路径才构造ORM对象
+    """
 
-    mikan_id = scrapy.Field()
-    subtitle_group_id = scrapy.Field()
-    episode_number = scrapy.Field()  # 现在会被填充
-    title = scrapy.Field()
-    file_size = scrapy.Field()
-    resolution = scrapy.Field()  # 新增：从title解析
-    subtitle_type = scrapy.Field()  # 新增：从title解析
-    # download_url = scrapy.Field()     # 删除：冗余字段
-    magnet_url = scrapy.Field()
-    torrent_url = scrapy.Field()
-    play_url = scrapy.Field()
-    magnet_hash = scrapy.Field()
-    release_date = scrapy.Field()  # 存储时间戳
-    created_at = scrapy.Field()  # 存储时间戳
-    updated_at = scrapy.Field()  # 新增：存储时间戳
+    __slots__ = (
+        "mikan_id",
+        "subtitle_group_id",
+        "episode_number",
+        "title",
+        "file_size",
+        "resolution",
+        "subtitle_type",
+        "magnet_url",
+        "torrent_url",
+        "play_url",
+        "magnet_hash",
+        "release_date",
+        "created_at",
+        "updated_at",
+    )
+
+    mikan_id: int
+    subtitle_group_id: int
+    episode_number: Optional[int]
+    title: str
+    file_size: Optional[str]
+    resolution: Optional[str]
+    subtitle_type: Optional[str]
+    magnet_url: Optional[str]
+    torrent_url: Optional[str]
+    play_url: Optional[str]
+    magnet_hash: Optional[str]
+    release_date: Optional[int]  # 存储时间戳
+    created_at: Optional[int]  # 存储时间戳
+    updated_at: Optional[int]  # 存储时间戳
+
+    def as_row(self) -> Dict[str, Any]:
+        """转换为 resource 表的列名到值的字典"""
+        return {name: getattr(self, name) for name in self.__slots__}
 
 
 class CrawlLogItem(scrapy.Item):
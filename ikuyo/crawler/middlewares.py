@@ -1,4 +1,20 @@
+import logging
+import time
+
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.defer import maybe_deferred_to_future
+from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.misc import load_object
+from twisted.internet.task import deferLater
+
+from ikuyo.core.config import load_config
+from ikuyo.crawler.rate_limit import AdaptiveRateLimiter, parse_retry_after
+from ikuyo.crawler.response_store import DEFAULT_TTL, ResponseStore, classify_url
+
+logger = logging.getLogger(__name__)
 
 
 class IkuyoScrapySpiderMiddleware:
@@ -90,3 +106,216 @@ class IkuyoScrapyDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class AdaptiveRateLimitMiddleware:
+    """
+    自适应限速下载中间件（config.yaml: crawler.rate_limit）
+    请求发出前从共享令牌桶取令牌，取不到时异步等待；响应到达后按延迟、错误率和
+    Retry-After 调整允许速率，并据此设置下载槽并发数。取代固定的 DOWNLOAD_DELAY 与 AutoThrottle
+    需位于 RetryMiddleware（550）之后，才能在429/5xx被转为重试请求前观察到它们
+    只有下载与网络错误（RETRY_EXCEPTIONS）计为错误，IgnoreRequest 等其他中间件的异常不影响速率
+    """
+
+    ERROR_STATUSES = (429, 500, 502, 503, 504, 522, 524)
+
+    def __init__(self, crawler, limiter):
+        self.crawler = crawler
+        self.limiter = limiter
+        # 与RetryMiddleware使用同一组下载异常，随Scrapy版本更新
+        self.download_errors = tuple(
+            load_object(name) if isinstance(name, str) else name
+            for name in crawler.settings.getlist("RETRY_EXCEPTIONS")
+        )
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        crawler_config = getattr(load_config(), "crawler", {})
+        rate_config = crawler_config.get("rate_limit", {}) or {}
+        if not rate_config.get("enabled", False):
+            raise NotConfigured("rate limit disabled")
+        if crawler.settings.getbool("RESPONSE_STORE_REPLAY"):
+            # 回放不访问站点，不能影响共享速率
+            raise NotConfigured("rate limit disabled in response store replay")
+        limiter = AdaptiveRateLimiter.from_config(
+            rate_config,
+            max_concurrency=crawler.settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN"),
+        )
+        return cls(crawler, limiter)
+
+    @staticmethod
+    def _domain(request):
+        return urlparse_cached(request).hostname or ""
+
+    async def process_request(self, request, spider=None):
+        # reactor 由Scrapy在启动时安装，不能在模块导入时引用
+        from twisted.internet import reactor
+
+        if request.meta.get("dont_rate_limit"):
+            return None
+        domain = self._domain(request)
+        waited = 0.0
+        while True:
+            wait = self.limiter.acquire(domain)
+            if wait <= 0:
+                break
+            waited += wait
+            await maybe_deferred_to_future(deferLater(reactor, wait, lambda: None))
+        if waited:
+            self.crawler.stats.inc_value("ratelimit/wait_seconds", waited)
+        return None
+
+    def process_response(self, request, response, spider=None):
+        if request.meta.get("dont_rate_limit"):
+            return response
+        # 响应存储命中时由 process_request 直接返回，仍会经过本方法，但没有访问站点
+        if ResponseStoreMiddleware.STORED_FLAG in response.flags:
+            return response
+        latency = request.meta.get("download_latency")
+        if latency is None:
+            return response
+        retry_after = None
+        if response.status in (429, 503):
+            retry_after = parse_retry_after(response.headers.get(b"Retry-After"))
+        domain = self._domain(request)
+        self.limiter.observe(
+            domain,
+            latency,
+            response.status in self.ERROR_STATUSES,
+            retry_after,
+        )
+        self._apply_concurrency(request, domain)
+        return response
+
+    def process_exception(self, request, exception, spider=None):
+        if request.meta.get("dont_rate_limit") or isinstance(exception, IgnoreRequest):
+            return None
+        if not isinstance(exception, self.download_errors):
+            return None
+        domain = self._domain(request)
+        self.limiter.observe(domain, None, True)
+        self._apply_concurrency(request, domain)
+        return None
+
+    def _apply_concurrency(self, request, domain):
+        downloader = self.crawler.engine.downloader
+        slot = downloader.slots.get(downloader.get_slot_key(request))
+        if slot is None:
+            return
+        concurrency = self.limiter.concurrency(domain)
+        if slot.concurrency != concurrency:
+            slot.concurrency = concurrency
+            self.crawler.stats.set_value(f"ratelimit/concurrency/{domain}", concurrency)
+        self.crawler.stats.set_value(f"ratelimit/rate/{domain}", round(self.limiter.rate(domain), 3))
+
+
+class ResponseStoreMiddleware:
+    """
+    响应存储下载中间件（config.yaml: crawler.response_store）
+    请求命中存储中未过期的响应时直接返回，不再访问站点；新下载的200响应写入存储。
+    回放模式（RESPONSE_STORE_REPLAY，任务参数 replay）忽略有效期且只使用存储，未命中的请求被忽略，
+    重新执行解析和Pipeline时不产生任何网络请求
+    位于HttpCompressionMiddleware（590）之前，保存解压后的响应体；
+    命中时在自适应限速（950）之前返回，不消耗请求配额
+    """
+
+    STORED_FLAG = "stored"
+
+    def __init__(self, crawler, store, ttl, replay, retention_seconds):
+        self.crawler = crawler
+        self.store = store
+        self.ttl = ttl
+        self.replay = replay
+        self.retention_seconds = retention_seconds
+        crawler.signals.connect(self.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(self.spider_closed, signal=signals.spider_closed)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        crawler_config = getattr(load_config(), "crawler", {})
+        store_config = crawler_config.get("response_store", {}) or {}
+        replay = crawler.settings.getbool("RESPONSE_STORE_REPLAY")
+        if not replay and not store_config.get("enabled", False):
+            raise NotConfigured("response store disabled")
+        ttl_config = store_config.get("ttl", {}) or {}
+        ttl = {name: ttl_config.get(name, default) for name, default in DEFAULT_TTL.items()}
+        store = ResponseStore(store_config.get("path", "data/crawler/responses.db"))
+        retention_days = store_config.get("retention_days", 30)
+        return cls(crawler, store, ttl, replay, retention_days * 86400 if retention_days else None)
+
+    def _fingerprint(self, request):
+        return self.crawler.request_fingerprinter.fingerprint(request).hex()
+
+    def _fresh(self, stored):
+        if self.replay:
+            return True
+        ttl = self.ttl.get(stored.url_class, self.ttl["default"])
+        return time.time() - stored.stored_at < ttl
+
+    def process_request(self, request, spider=None):
+        if request.meta.get("dont_store"):
+            return None
+        stats = self.crawler.stats
+        stored = self.store.get(self._fingerprint(request))
+        if stored is not None and self._fresh(stored):
+            stats.inc_value("response_store/hit")
+            headers = Headers(stored.headers)
+            response_class = responsetypes.from_args(headers=headers, url=stored.url, body=stored.body)
+            return response_class(
+                url=stored.url,
+                status=stored.status,
+                headers=headers,
+                body=stored.body,
+                flags=[self.STORED_FLAG],
+                request=request,
+            )
+        if self.replay:
+            stats.inc_value("response_store/replay_miss")
+            raise IgnoreRequest(f"回放模式下存储中没有该请求的响应: {request.url}")
+        stats.inc_value("response_store/expired" if stored is not None else "response_store/miss")
+        return None
+
+    def process_response(self, request, response, spider=None):
+        if (
+            self.STORED_FLAG in response.flags
+            or response.status != 200
+            or request.meta.get("dont_store")
+        ):
+            return response
+        headers = {
+            key.decode("latin-1"): [value.decode("latin-1") for value in values]
+            for key, values in response.headers.items()
+        }
+        try:
+            _, new_body = self.store.put(
+                self._fingerprint(request),
+                response.url,
+                classify_url(urlparse_cached(response).path),
+                response.status,
+                headers,
+                response.body,
+            )
+            self.crawler.stats.inc_value("response_store/stored")
+            if not new_body:
+                self.crawler.stats.inc_value("response_store/deduplicated")
+        except Exception as e:
+            # 存储失败不影响本次爬取
+            logger.warning(f"保存响应失败 {response.url}: {e}")
+        return response
+
+    def spider_opened(self, spider):
+        if self.retention_seconds and not self.replay:
+            try:
+                pruned = self.store.prune(time.time() - self.retention_seconds)
+                if pruned:
+                    logger.info(f"响应存储已清理 {pruned} 条过期响应")
+            except Exception as e:
+                logger.warning(f"清理响应存储失败: {e}")
+        if self.replay:
+            logger.info(f"🔁 回放模式：只使用响应存储 {self.store.path}，不访问站点")
+
+    def spider_closed(self, spider, reason):
+        try:
+            logger.info(f"响应存储: {self.store.stats()}")
+        finally:
+            self.store.close()
@@ -5,7 +5,10 @@
 更新以支持读写分离架构
 """
 
+import functools
+
 from scrapy.exceptions import DropItem
+from ikuyo.core.cache_events import SEARCH_TAG, bangumi_tag, publish_invalidation
 from ikuyo.core.database import get_session
 from ikuyo.core.repositories import (
     AnimeRepository,
@@ -21,11 +24,13 @@ from ikuyo.core.models import (
     Resource,
     CrawlLog,
 )
+from .extensions import CRAWLER_DB_FLUSH_SECONDS
+from .stage_timer import stage, timed_stage
 from .items import (
     AnimeItem,
     AnimeSubtitleGroupItem,
     CrawlLogItem,
-    ResourceItem,
+    ResourceRecord,
     SubtitleGroupItem,
 )
 
@@ -35,13 +40,14 @@ import time
 class ValidationPipeline:
     """数据验证Pipeline"""
 
+    @timed_stage("pipeline.validation")
     def process_item(self, item, spider):
         if isinstance(item, AnimeItem):
             if not item.get("mikan_id") or not item.get("title"):
                 raise DropItem(f"Missing required fields in AnimeItem: {item}")
-        elif isinstance(item, ResourceItem):
-            if not item.get("mikan_id") or not item.get("subtitle_group_id"):
-                raise DropItem(f"Missing required fields in ResourceItem: {item}")
+        elif isinstance(item, ResourceRecord):
+            if not item.mikan_id or not item.subtitle_group_id:
+                raise DropItem(f"Missing required fields in ResourceRecord: {item}")
         elif isinstance(item, SubtitleGroupItem):
             if not item.get("id") or not item.get("name"):
                 raise DropItem(f"Missing required fields in SubtitleGroupItem: {item}")
@@ -94,7 +100,7 @@ class SQLitePipeline:
                 self.save_subtitle_group(item)
             elif isinstance(item, AnimeSubtitleGroupItem):
                 self.save_anime_subtitle_group(item)
-            elif isinstance(item, ResourceItem):
+            elif isinstance(item, ResourceRecord):
                 self.save_resource(item)
             elif isinstance(item, CrawlLogItem):
                 self.save_crawl_log(item)
@@ -147,23 +153,7 @@ class SQLitePipeline:
     def save_resource(self, item):
         if self.resource_repo:
             try:
-                obj = Resource(
-                    mikan_id=int(item["mikan_id"]),
-                    subtitle_group_id=int(item["subtitle_group_id"]),
-                    episode_number=int(item["episode_number"])
-                    if item.get("episode_number")
-                    else None,
-                    title=item["title"],
-                    file_size=item.get("file_size"),
-                    resolution=item.get("resolution"),
-                    subtitle_type=item.get("subtitle_type"),
-                    magnet_url=item.get("magnet_url"),
-                    torrent_url=item.get("torrent_url"),
-                    play_url=item.get("play_url"),
-                    magnet_hash=item.get("magnet_hash"),
-                    release_date=int(item["release_date"]) if item.get("release_date") else None,
-                )
-                self.resource_repo.create(obj)
+                self.resource_repo.create(Resource(**item.as_row()))
             except Exception as e:
                 print(f"[save_resource] 类型转换或保存失败: {e}, item: {item}")
 
@@ -182,6 +172,7 @@ class DuplicatesPipeline:
         self.resource_hashes = set()
         self.anime_subtitle_group_pairs = set()
 
+    @timed_stage("pipeline.duplicates")
     def process_item(self, item, spider):
         if isinstance(item, AnimeItem):
             mikan_id = item.get("mikan_id")
@@ -203,8 +194,8 @@ class DuplicatesPipeline:
                 raise DropItem(f"Duplicate anime-subtitle group pair: {pair}")
             self.anime_subtitle_group_pairs.add(pair)
 
-        elif isinstance(item, ResourceItem):
-            magnet_hash = item.get("magnet_hash")
+        elif isinstance(item, ResourceRecord):
+            magnet_hash = item.magnet_hash
             if magnet_hash and magnet_hash in self.resource_hashes:
                 raise DropItem(f"Duplicate resource: {magnet_hash}")
             if magnet_hash:
@@ -213,6 +204,23 @@ class DuplicatesPipeline:
         return item
 
 
+def _timed_flush(table, batch_attr):
+    """记录批次写入耗时（运行指标及爬虫阶段计时），批次为空时不计入"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, spider):
+            if not getattr(self, batch_attr):
+                return func(self, spider)
+            with CRAWLER_DB_FLUSH_SECONDS.time(table=table):
+                with stage(spider, f"pipeline.db_flush.{table}"):
+                    return func(self, spider)
+
+        return wrapper
+
+    return decorator
+
+
 class BatchSQLitePipeline:
     """批量存储Pipeline"""
 
@@ -229,6 +237,10 @@ class BatchSQLitePipeline:
         self.total_items = 0
         self.processed_items = 0
         self.start_time = None
+        # 续爬开始时已处理的番剧数，不计入本次的处理速度
+        self.resumed_items = 0
+        # mikan_id -> bangumi_id 映射，用于按番剧精确失效API响应缓存
+        self.bangumi_ids = {}
 
     def open_spider(self, spider):
         """打开爬虫时初始化"""
@@ -238,17 +250,20 @@ class BatchSQLitePipeline:
         self.anime_subtitle_group_repo = AnimeSubtitleGroupRepository(session)
         self.resource_repo = ResourceRepository(session)
         self.start_time = time.time()
+        # 续爬时已处理的番剧数从爬取边界恢复，进度按原任务的总数计算
+        frontier = getattr(spider, "frontier", None)
+        if frontier is not None and frontier.seeded:
+            self.processed_items = frontier.done_detail_count
+            self.resumed_items = self.processed_items
         spider.logger.info("✅ 批量存储Pipeline已初始化")
 
     def close_spider(self, spider):
         """关闭爬虫时刷新所有批次"""
         spider.logger.info("🔄 刷新所有缓存批次...")
         try:
-            self._flush_anime_batch(spider)
-            self._flush_subtitle_groups_batch(spider)
-            self._flush_anime_subtitle_groups_batch(spider)
-            self._flush_resources_batch(spider)
+            self._flush_all(spider)
             spider.logger.info("✅ 所有批次刷新完成")
+            self._checkpoint_frontier(spider)
         except Exception as e:
             spider.logger.error(f"刷新批次时发生错误: {str(e)}")
         finally:
@@ -259,6 +274,10 @@ class BatchSQLitePipeline:
     def process_item(self, item, spider):
         """处理爬取项"""
         if isinstance(item, AnimeItem):
+            # 新番剧开始，之前已完整产出的番剧落库后记录到爬取边界
+            self._checkpoint_frontier(spider, force=False)
+            if item.get("bangumi_id"):
+                self.bangumi_ids[int(item["mikan_id"])] = int(item["bangumi_id"])
             self.anime_batch.append(item)
             if len(self.anime_batch) >= self.batch_size:
                 self._flush_anime_batch(spider)
@@ -272,7 +291,7 @@ class BatchSQLitePipeline:
             if len(self.subtitle_groups_batch) >= self.batch_size:
                 self._flush_subtitle_groups_batch(spider)
 
-        elif isinstance(item, ResourceItem):
+        elif isinstance(item, ResourceRecord):
             self.resources_batch.append(item)
             if len(self.resources_batch) >= self.batch_size:
                 self._flush_resources_batch(spider)
@@ -284,6 +303,35 @@ class BatchSQLitePipeline:
 
         return item
 
+    def _flush_all(self, spider):
+        self._flush_anime_batch(spider)
+        self._flush_subtitle_groups_batch(spider)
+        self._flush_anime_subtitle_groups_batch(spider)
+        self._flush_resources_batch(spider)
+
+    def _checkpoint_frontier(self, spider, force=True):
+        """
+        将已完整产出的番剧记录为已完成（断点续爬）
+        先刷新全部批次，只有全部写入成功才记录，保证续爬跳过的番剧数据都已落库；
+        非强制时累计到 checkpoint_interval 个番剧才执行
+        """
+        frontier = getattr(spider, "frontier", None)
+        if frontier is None or not frontier.unsaved:
+            return
+        if not force and len(frontier.unsaved) < frontier.checkpoint_interval:
+            return
+        self._flush_all(spider)
+        if (
+            self.anime_batch
+            or self.subtitle_groups_batch
+            or self.anime_subtitle_groups_batch
+            or self.resources_batch
+        ):
+            spider.logger.warning("批次未能全部写入，暂不记录爬取进度")
+            return
+        frontier.checkpoint()
+
+    @_timed_flush("anime", "anime_batch")
     def _flush_anime_batch(self, spider):
         """刷新动画批次"""
         if not self.anime_batch or not self.anime_repo:
@@ -322,9 +370,14 @@ class BatchSQLitePipeline:
 
             self.anime_batch.clear()
 
+            # 动画库变化影响搜索结果
+            with stage(spider, "pipeline.cache_invalidation"):
+                publish_invalidation([SEARCH_TAG])
+
         except Exception as e:
             spider.logger.error(f"批量插入动画失败: {str(e)}")
 
+    @_timed_flush("subtitle_group", "subtitle_groups_batch")
     def _flush_subtitle_groups_batch(self, spider):
         """刷新字幕组批次"""
         if not self.subtitle_groups_batch or not self.subtitle_group_repo:
@@ -353,6 +406,7 @@ class BatchSQLitePipeline:
         except Exception as e:
             spider.logger.error(f"批量插入字幕组失败: {str(e)}")
 
+    @_timed_flush("anime_subtitle_group", "anime_subtitle_groups_batch")
     def _flush_anime_subtitle_groups_batch(self, spider):
         """刷新动画-字幕组关联批次"""
         if not self.anime_subtitle_groups_batch or not self.anime_subtitle_group_repo:
@@ -380,48 +434,43 @@ class BatchSQLitePipeline:
         except Exception as e:
             spider.logger.error(f"批量插入关联数据失败: {str(e)}")
 
+    @_timed_flush("resource", "resources_batch")
     def _flush_resources_batch(self, spider):
-        """刷新资源批次"""
+        """
+        刷新资源批次
+        资源记录在爬虫中已是最终类型，直接转换为插入参数批量写入，不逐条构造ORM对象、不逐条提交；
+        资源没有可供匹配的主键（原逐条路径同样总是插入），因此只有插入
+        """
         if not self.resources_batch or not self.resource_repo:
             return
         try:
-            resource_models = []
-            for item in self.resources_batch:
-                try:
-                    resource = Resource(
-                        mikan_id=int(item["mikan_id"]),
-                        subtitle_group_id=int(item["subtitle_group_id"]),
-                        episode_number=int(item["episode_number"])
-                        if item.get("episode_number")
-                        else None,
-                        title=item["title"],
-                        file_size=item.get("file_size"),
-                        resolution=item.get("resolution"),
-                        subtitle_type=item.get("subtitle_type"),
-                        magnet_url=item.get("magnet_url"),
-                        torrent_url=item.get("torrent_url"),
-                        play_url=item.get("play_url"),
-                        magnet_hash=item.get("magnet_hash"),
-                        release_date=int(item["release_date"])
-                        if item.get("release_date")
-                        else None,
-                    )
-                    resource_models.append(resource)
-                except Exception as e:
-                    spider.logger.error(f"[batch_resource] 类型转换失败: {e}, item: {item}")
-            for resource in resource_models:
-                existing = self.resource_repo.get_by_id(resource.id) if resource.id else None
-                if existing:
-                    for key, value in resource.model_dump().items():
-                        if value is not None:
-                            setattr(existing, key, value)
-                    self.resource_repo.update(existing)
-                else:
-                    self.resource_repo.create(resource)
+            self.resource_repo.bulk_create([record.as_row() for record in self.resources_batch])
+            mikan_ids = {record.mikan_id for record in self.resources_batch}
             self.resources_batch.clear()
+
+            # 仅失效本批次涉及番剧的资源列表与集数可用性缓存
+            with stage(spider, "pipeline.cache_invalidation"):
+                self._invalidate_anime_caches(spider, mikan_ids)
         except Exception as e:
+            # 插入失败时整批回滚，批次保留到下次刷新时重试
+            self.resource_repo.session.rollback()
             spider.logger.error(f"批量插入资源失败: {str(e)}")
 
+    def _invalidate_anime_caches(self, spider, mikan_ids):
+        """发布指定番剧的API响应缓存失效消息"""
+        tags = []
+        for mikan_id in mikan_ids:
+            bangumi_id = self.bangumi_ids.get(mikan_id)
+            if bangumi_id is None and self.anime_repo:
+                anime = self.anime_repo.get_by_id(mikan_id)
+                bangumi_id = anime.bangumi_id if anime else None
+                if bangumi_id is not None:
+                    self.bangumi_ids[mikan_id] = bangumi_id
+            if bangumi_id is not None:
+                tags.append(bangumi_tag(bangumi_id))
+        if tags and not publish_invalidation(tags):
+            spider.logger.warning(f"发布缓存失效消息失败: {tags}")
+
     def _report_progress(self, spider):
         """报告进度"""
         if not hasattr(spider, "task_id") or spider.task_id is None:
@@ -440,7 +489,7 @@ class BatchSQLitePipeline:
         elapsed_time = time.time() - self.start_time
         if total_items > 0 and elapsed_time > 0:
             percentage = (self.processed_items / total_items) * 100
-            processing_speed = self.processed_items / elapsed_time
+            processing_speed = (self.processed_items - self.resumed_items) / elapsed_time
             remaining_items = total_items - self.processed_items
             estimated_remaining = (
                 remaining_items / processing_speed if processing_speed > 0 else None
@@ -477,6 +526,9 @@ class ProgressReportPipeline:
             f"失败: {stats.get('failed', 0)}, "
             f"丢弃: {stats.get('dropped', 0)}"
         )
+        stage_timer = getattr(spider, "stage_timer", None)
+        if stage_timer is not None:
+            result_summary += f"; 阶段耗时: {stage_timer.format_summary()}"
         spider.progress_reporter.report_result(result_summary)
 
         # 报告最终状态
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+自适应限速
+按域名控制爬虫的请求速率，多个爬取任务（各自独立的爬虫子进程）通过Redis共享状态：
+- 令牌桶：所有任务对同一域名的请求共用一个桶，总速率不超过当前允许速率
+- AIMD：允许速率在 [min_rate, max_rate] 之间调整，窗口内响应健康时加性增加，
+  延迟中位数超过目标或错误率超过阈值时乘性减少；减少后有冷却期，
+  避免多个任务观察到同一次拥塞而叠加下调
+- Retry-After：429/503 响应带 Retry-After 时，所有任务在指定时间内暂停访问该域名
+每个进程再按 Little 定律（并发 ≈ 速率 × 延迟）设置下载槽的并发数，使允许速率可以被用满
+Redis不可用时退化为进程内状态（只约束本进程），一段时间后重试Redis
+"""
+
+import logging
+import math
+import statistics
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from ikuyo.core.metrics import SHARED_REGISTRY
+
+logger = logging.getLogger(__name__)
+
+CRAWLER_ALLOWED_RATE = SHARED_REGISTRY.gauge(
+    "ikuyo_crawler_allowed_rate",
+    "自适应限速当前允许的请求速率（次/秒，所有爬取任务共享）",
+    ["domain"],
+)
+CRAWLER_RATE_ADJUSTMENTS = SHARED_REGISTRY.counter(
+    "ikuyo_crawler_rate_adjustments_total",
+    "自适应限速的调整次数",
+    ["domain", "direction"],
+)
+
+# 令牌桶：桶内令牌按当前允许速率补充，被暂停时返回剩余暂停时间
+# KEYS: 令牌桶、允许速率、暂停截止时间  ARGV: 初始速率、桶容量
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local paused_until = tonumber(redis.call('GET', KEYS[3]) or '0')
+if paused_until > now then
+    return tostring(paused_until - now)
+end
+local rate = tonumber(redis.call('GET', KEYS[2]) or ARGV[1])
+local burst = tonumber(ARGV[2])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], 3600)
+return tostring(wait)
+"""
+
+# 调整允许速率：下调需取得冷却锁，上调直接加性增加
+# KEYS: 允许速率、下调冷却锁  ARGV: 方向(up/down)、初始速率、最小速率、最大速率、加性步长、乘性系数、冷却时间
+_ADJUST_SCRIPT = """
+local rate = tonumber(redis.call('GET', KEYS[1]) or ARGV[2])
+if ARGV[1] == 'down' then
+    if not redis.call('SET', KEYS[2], '1', 'NX', 'PX', math.floor(tonumber(ARGV[7]) * 1000)) then
+        return false
+    end
+    rate = math.max(tonumber(ARGV[3]), rate * tonumber(ARGV[6]))
+else
+    if redis.call('EXISTS', KEYS[2]) == 1 then
+        return false
+    end
+    rate = math.min(tonumber(ARGV[4]), rate + tonumber(ARGV[5]))
+end
+redis.call('SET', KEYS[1], tostring(rate), 'EX', 86400)
+return tostring(rate)
+"""
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """解析 Retry-After 响应头（秒数或HTTP日期），返回等待秒数"""
+    if not value:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode("latin-1")
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _LocalRateState:
+    """进程内的限速状态，与Redis状态的语义一致"""
+
+    def __init__(self, limiter: "AdaptiveRateLimiter"):
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        # 域名 -> [令牌数, 上次补充时间]
+        self._buckets: Dict[str, list] = {}
+        self._rates: Dict[str, float] = {}
+        self._paused_until: Dict[str, float] = {}
+        self._cooldown_until: Dict[str, float] = {}
+
+    def acquire(self, domain: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            paused_until = self._paused_until.get(domain, 0.0)
+            if paused_until > now:
+                return paused_until - now
+            rate = self.rate(domain)
+            bucket = self._buckets.setdefault(domain, [self.limiter.burst, now])
+            bucket[0] = min(self.limiter.burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / rate
+
+    def adjust(self, domain: str, direction: str) -> Optional[float]:
+        now = time.monotonic()
+        limiter = self.limiter
+        with self._lock:
+            if self._cooldown_until.get(domain, 0.0) > now:
+                return None
+            rate = self.rate(domain)
+            if direction == "down":
+                self._cooldown_until[domain] = now + limiter.decrease_cooldown
+                rate = max(limiter.min_rate, rate * limiter.decrease_factor)
+            else:
+                rate = min(limiter.max_rate, rate + limiter.increase_step)
+            self._rates[domain] = rate
+            return rate
+
+    def pause(self, domain: str, seconds: float) -> None:
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._paused_until[domain] = max(self._paused_until.get(domain, 0.0), until)
+
+    def rate(self, domain: str) -> float:
+        return self._rates.get(domain, self.limiter.initial_rate)
+
+
+class _RedisRateState:
+    """Redis中的共享限速状态，所有爬取任务共用"""
+
+    def __init__(self, limiter: "AdaptiveRateLimiter"):
+        self.limiter = limiter
+        self._acquire = None
+        self._adjust = None
+
+    def _client(self):
+        from ikuyo.core.redis_client import get_redis_connection
+
+        return get_redis_connection()
+
+    def _key(self, domain: str, name: str) -> str:
+        return f"{self.limiter.key_prefix}{domain}:{name}"
+
+    def _scripts(self):
+        if self._acquire is None:
+            client = self._client()
+            self._acquire = client.register_script(_ACQUIRE_SCRIPT)
+            self._adjust = client.register_script(_ADJUST_SCRIPT)
+        return self._acquire, self._adjust
+
+    def acquire(self, domain: str) -> float:
+        acquire, _ = self._scripts()
+        keys = [self._key(domain, "bucket"), self._key(domain, "rate"), self._key(domain, "paused_until")]
+        return float(acquire(keys=keys, args=[self.limiter.initial_rate, self.limiter.burst]))
+
+    def adjust(self, domain: str, direction: str) -> Optional[float]:
+        _, adjust = self._scripts()
+        limiter = self.limiter
+        rate = adjust(
+            keys=[self._key(domain, "rate"), self._key(domain, "cooldown")],
+            args=[
+                direction,
+                limiter.initial_rate,
+                limiter.min_rate,
+                limiter.max_rate,
+                limiter.increase_step,
+                limiter.decrease_factor,
+                limiter.decrease_cooldown,
+            ],
+        )
+        return float(rate) if rate is not None else None
+
+    def pause(self, domain: str, seconds: float) -> None:
+        # 暂停截止时间使用Redis服务器时间，与令牌桶脚本一致
+        client = self._client()
+        seconds_now, micros = client.time()
+        until = seconds_now + micros / 1_000_000 + seconds
+        key = self._key(domain, "paused_until")
+        current = client.get(key)
+        if current is None or float(current) < until:
+            client.set(key, repr(until), px=int(seconds * 1000) + 1000)
+
+    def rate(self, domain: str) -> float:
+        rate = self._client().get(self._key(domain, "rate"))
+        return float(rate) if rate is not None else self.limiter.initial_rate
+
+
+class _DomainWindow:
+    """单个域名最近响应的延迟与错误统计"""
+
+    def __init__(self, size: int):
+        self.latencies = deque(maxlen=size)
+        self.errors = deque(maxlen=size)
+        self.last_adjust = time.monotonic()
+
+    def add(self, latency: Optional[float], error: bool) -> None:
+        if latency is not None:
+            self.latencies.append(latency)
+        self.errors.append(error)
+
+    def error_rate(self) -> float:
+        return sum(self.errors) / len(self.errors) if self.errors else 0.0
+
+    def median_latency(self) -> Optional[float]:
+        return statistics.median(self.latencies) if self.latencies else None
+
+
+class AdaptiveRateLimiter:
+    """
+    自适应限速器
+    - acquire 返回需要等待的秒数（0表示已取得令牌）
+    - observe 记录一次响应或下载异常，按窗口统计决定是否调整允许速率
+    - concurrency 给出当前速率与延迟下本进程应使用的下载槽并发数
+    """
+
+    def __init__(
+        self,
+        max_rate: float = 8.0,
+        min_rate: float = 0.5,
+        initial_rate: Optional[float] = None,
+        burst: float = 4.0,
+        min_concurrency: int = 1,
+        max_concurrency: int = 12,
+        target_latency: float = 3.0,
+        error_threshold: float = 0.1,
+        window: int = 20,
+        min_samples: int = 5,
+        adjust_interval: float = 5.0,
+        increase_step: float = 0.5,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 10.0,
+        max_retry_after: float = 300.0,
+        key_prefix: str = "ikuyo:ratelimit:",
+        use_redis: bool = True,
+        retry_interval: float = 30.0,
+    ):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.initial_rate = min(initial_rate if initial_rate is not None else max_rate / 2, max_rate)
+        self.burst = burst
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.error_threshold = error_threshold
+        self.window = window
+        self.min_samples = min_samples
+        self.adjust_interval = adjust_interval
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.max_retry_after = max_retry_after
+        self.key_prefix = key_prefix
+        self.retry_interval = retry_interval
+        self._local = _LocalRateState(self)
+        self._redis = _RedisRateState(self) if use_redis else None
+        self._redis_disabled_until = 0.0
+        self._windows: Dict[str, _DomainWindow] = {}
+        self._rates: Dict[str, float] = {}
+
+    @classmethod
+    def from_config(cls, rate_config, **defaults) -> "AdaptiveRateLimiter":
+        """由 config.yaml 的 crawler.rate_limit 配置创建，defaults 为配置缺省时使用的值"""
+        options = dict(defaults)
+        for name in (
+            "max_rate",
+            "min_rate",
+            "initial_rate",
+            "burst",
+            "min_concurrency",
+            "max_concurrency",
+            "target_latency",
+            "error_threshold",
+            "window",
+            "min_samples",
+            "adjust_interval",
+            "increase_step",
+            "decrease_factor",
+            "decrease_cooldown",
+            "max_retry_after",
+            "key_prefix",
+            "retry_interval",
+        ):
+            value = rate_config.get(name)
+            if value is not None:
+                options[name] = value
+        options["use_redis"] = rate_config.get("shared", True)
+        return cls(**options)
+
+    def _state(self, action: str, *args):
+        """优先使用Redis共享状态，出错时在 retry_interval 内改用进程内状态"""
+        if self._redis is not None and time.monotonic() >= self._redis_disabled_until:
+            try:
+                return getattr(self._redis, action)(*args)
+            except Exception as e:
+                self._redis_disabled_until = time.monotonic() + self.retry_interval
+                logger.warning(
+                    f"共享限速状态不可用，{self.retry_interval}秒内改用进程内限速: {e}"
+                )
+        return getattr(self._local, action)(*args)
+
+    def acquire(self, domain: str) -> float:
+        return self._state("acquire", domain)
+
+    def rate(self, domain: str) -> float:
+        """本进程最近一次得知的允许速率"""
+        return self._rates.get(domain, self.initial_rate)
+
+    def observe(
+        self,
+        domain: str,
+        latency: Optional[float],
+        error: bool,
+        retry_after: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        记录一次响应
+
+        Args:
+            domain: 域名
+            latency: 下载耗时（秒），下载异常时为None
+            error: 是否为错误（429、5xx或下载异常）
+            retry_after: Retry-After 给出的等待秒数
+
+        Returns:
+            调整后的允许速率，未调整时返回None
+        """
+        window = self._windows.get(domain)
+        if window is None:
+            window = self._windows[domain] = _DomainWindow(self.window)
+        window.add(latency, error)
+
+        if retry_after is not None:
+            self._state("pause", domain, min(retry_after, self.max_retry_after))
+            return self._adjust(domain, window, "down", f"Retry-After {retry_after:.0f}s")
+
+        if time.monotonic() - window.last_adjust < self.adjust_interval:
+            return None
+        if len(window.errors) < self.min_samples:
+            return None
+        error_rate = window.error_rate()
+        median_latency = window.median_latency()
+        if error_rate > self.error_threshold:
+            return self._adjust(domain, window, "down", f"错误率 {error_rate:.0%}")
+        if median_latency is not None and median_latency > self.target_latency:
+            return self._adjust(domain, window, "down", f"延迟中位数 {median_latency:.2f}s")
+        return self._adjust(domain, window, "up", None)
+
+    def _adjust(self, domain: str, window: _DomainWindow, direction: str, reason: Optional[str]):
+        window.last_adjust = time.monotonic()
+        if direction == "down":
+            # 下调后重新积累样本，避免同一批拥塞样本连续触发下调
+            window.errors.clear()
+            window.latencies.clear()
+        previous = self.rate(domain)
+        rate = self._state("adjust", domain, direction)
+        if rate is None:
+            # 其它任务刚下调过（冷却中），同步一次共享速率
+            rate = self._state("rate", domain)
+        self._rates[domain] = rate
+        CRAWLER_ALLOWED_RATE.set(round(rate, 3), domain=domain)
+        if rate != previous:
+            CRAWLER_RATE_ADJUSTMENTS.inc(domain=domain, direction=direction)
+            if reason:
+                logger.info(f"⏬ {domain} 允许速率 {previous:.2f} -> {rate:.2f} 次/秒（{reason}）")
+            else:
+                logger.debug(f"⏫ {domain} 允许速率 {previous:.2f} -> {rate:.2f} 次/秒")
+        return rate
+
+    def concurrency(self, domain: str) -> int:
+        """按 Little 定律由允许速率和延迟中位数估算所需并发，多留一个以吸收波动"""
+        window = self._windows.get(domain)
+        median_latency = window.median_latency() if window else None
+        if median_latency is None:
+            return self.max_concurrency
+        wanted = math.ceil(self.rate(domain) * median_latency) + 1
+        return max(self.min_concurrency, min(self.max_concurrency, wanted))
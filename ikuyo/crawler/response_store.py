@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+爬虫响应存储
+将下载到的页面保存在单个SQLite文件中（默认 data/crawler/responses.db），供重新爬取和回放使用：
+- 按内容寻址：响应体以sha256为键、zlib压缩后只存一份，多个请求返回相同内容时共用
+- 请求以Scrapy请求指纹为键，记录URL、URL类别、状态码、响应头和响应体摘要
+- 不同URL类别（详情页、季度接口、首页等）使用不同的有效期，超过有效期的响应不再命中，
+  回放模式下忽略有效期
+- 多个爬虫子进程可同时读写（WAL）
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bodies (
+    digest TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    fingerprint TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    url_class TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_stored_at ON responses (stored_at);
+"""
+
+# URL类别（按顺序匹配路径），未匹配的归为 default
+URL_CLASSES = (
+    ("detail", re.compile(r"^/Home/Bangumi/\d+")),
+    ("season", re.compile(r"^/Home/BangumiCoverFlowByDayOfWeek")),
+    ("homepage", re.compile(r"^/(Home/?)?$")),
+    ("robots", re.compile(r"^/robots\.txt$")),
+)
+
+# 各类别的默认有效期（秒）
+DEFAULT_TTL = {
+    "detail": 21600,
+    "season": 3600,
+    "homepage": 600,
+    "robots": 86400,
+    "default": 3600,
+}
+
+
+def classify_url(path: str) -> str:
+    """URL路径所属的类别"""
+    for name, pattern in URL_CLASSES:
+        if pattern.match(path):
+            return name
+    return "default"
+
+
+class StoredResponse:
+    """存储中的一条响应"""
+
+    __slots__ = ("url", "url_class", "status", "headers", "body", "stored_at")
+
+    def __init__(self, url: str, url_class: str, status: int, headers: Dict, body: bytes, stored_at: float):
+        self.url = url
+        self.url_class = url_class
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+
+class ResponseStore:
+    """单文件的内容寻址响应存储"""
+
+    def __init__(self, path: str, compress_level: int = 6):
+        self.path = path
+        self.compress_level = compress_level
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, fingerprint: str) -> Optional[StoredResponse]:
+        row = self._conn.execute(
+            "SELECT r.url, r.url_class, r.status, r.headers, b.data, r.stored_at "
+            "FROM responses r JOIN bodies b ON b.digest = r.digest WHERE r.fingerprint = ?",
+            (fingerprint,),
+        ).fetchone()
+        if row is None:
+            return None
+        url, url_class, status, headers, data, stored_at = row
+        return StoredResponse(url, url_class, status, json.loads(headers), zlib.decompress(data), stored_at)
+
+    def put(
+        self,
+        fingerprint: str,
+        url: str,
+        url_class: str,
+        status: int,
+        headers: Dict,
+        body: bytes,
+    ) -> Tuple[str, bool]:
+        """
+        保存一条响应
+
+        Returns:
+            (响应体摘要, 响应体是否为新内容)
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            exists = conn.execute("SELECT 1 FROM bodies WHERE digest = ?", (digest,)).fetchone()
+            if exists is None:
+                conn.execute(
+                    "INSERT INTO bodies (digest, data, size) VALUES (?, ?, ?)",
+                    (digest, zlib.compress(body, self.compress_level), len(body)),
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(fingerprint, url, url_class, status, headers, digest, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (fingerprint, url, url_class, status, json.dumps(headers), digest, time.time()),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return digest, exists is None
+
+    def prune(self, older_than: float) -> int:
+        """删除保存时间早于 older_than（时间戳）的响应及不再被引用的响应体，返回删除的响应数"""
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            deleted = conn.execute("DELETE FROM responses WHERE stored_at < ?", (older_than,)).rowcount
+            if deleted:
+                conn.execute(
+                    "DELETE FROM bodies WHERE digest NOT IN (SELECT DISTINCT digest FROM responses)"
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return deleted
+
+    def stats(self) -> Dict[str, int]:
+        """响应数、响应体数、原始与压缩后的总字节数"""
+        responses = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        bodies, raw, stored = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM bodies"
+        ).fetchone()
+        return {"responses": responses, "bodies": bodies, "raw_bytes": raw, "stored_bytes": stored}
+
+    def close(self) -> None:
+        self._conn.close()
@@ -18,10 +18,22 @@ NEWSPIDER_MODULE = "ikuyo.crawler.spiders"
 # 加载配置
 config = load_config()
 
+# 自适应限速（crawler.rate_limit）启用时由下载中间件按共享速率控制请求间隔和并发，
+# 不再使用固定下载延迟与AutoThrottle
+RATE_LIMIT_ENABLED = bool(
+    hasattr(config, "crawler")
+    and (config.crawler.get("rate_limit") or {}).get("enabled", False)
+)
+
 # 爬虫设置 - 使用默认值避免配置缺失错误
 DOWNLOAD_DELAY = (
     getattr(config.crawler, "download_delay", 1) if hasattr(config, "crawler") else 1
 )
+if RATE_LIMIT_ENABLED:
+    DOWNLOAD_DELAY = 0
+
+# 响应回放（crawler.response_store）：只使用已保存的响应，不访问站点，由任务参数 replay 开启
+RESPONSE_STORE_REPLAY = False
 CONCURRENT_REQUESTS = (
     getattr(config.crawler, "concurrent_requests", 16)
     if hasattr(config, "crawler")
@@ -61,15 +73,18 @@ COOKIES_ENABLED = False
 
 # 启用或禁用下载器中间件
 # 查看 https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-# DOWNLOADER_MIDDLEWARES = {
-#    "ikuyo_scrapy.middlewares.IkuyoScrapyDownloaderMiddleware": 543,
-# }
+DOWNLOADER_MIDDLEWARES = {
+    # 位于HttpCompressionMiddleware(590)之前，命中时在限速之前直接返回已保存的响应
+    "ikuyo.crawler.middlewares.ResponseStoreMiddleware": 585,
+    # 位于RetryMiddleware(550)之后，在429/5xx被转为重试请求前观察到它们
+    "ikuyo.crawler.middlewares.AdaptiveRateLimitMiddleware": 950,
+}
 
 # 启用或禁用扩展
 # 查看 https://docs.scrapy.org/en/latest/topics/extensions.html
-# EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-# }
+EXTENSIONS = {
+    "ikuyo.crawler.extensions.CrawlerMetricsExtension": 500,  # 运行指标（config.yaml: metrics）
+}
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
@@ -93,7 +108,7 @@ ITEM_PIPELINES = {
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
-AUTOTHROTTLE_ENABLED = True
+AUTOTHROTTLE_ENABLED = not RATE_LIMIT_ENABLED
 # The initial download delay
 AUTOTHROTTLE_START_DELAY = 0.5
 # The maximum download delay to be set in case of high latencies
@@ -102,7 +117,7 @@ AUTOTHROTTLE_MAX_DELAY = 10
 # each remote server - 提高到16实现真正的高并发
 AUTOTHROTTLE_TARGET_CONCURRENCY = 16.0
 # Enable showing throttling stats for every response received:
-AUTOTHROTTLE_DEBUG = True  # 开启调试，观察限流效果
+AUTOTHROTTLE_DEBUG = False  # 开启后每个响应输出一行限流日志
 
 # Set settings whose default value is deprecated to a future-proof value.
 FEED_EXPORT_ENCODING = "utf-8"
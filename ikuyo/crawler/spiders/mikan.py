@@ -3,15 +3,19 @@ from datetime import datetime, timezone
 import re
 from urllib.parse import quote, urljoin
 
-from scrapy import Request, Spider
+from scrapy import Request, Spider, signals
 
+from ikuyo.crawler.detail_parser import iter_resource_rows, parse_detail_page
+from ikuyo.crawler.extensions import CRAWLER_PARSE_SECONDS
+from ikuyo.crawler.frontier import CrawlFrontier
 from ikuyo.crawler.items import (
     AnimeItem,
     AnimeSubtitleGroupItem,
     CrawlLogItem,
-    ResourceItem,
+    ResourceRecord,
     SubtitleGroupItem,
 )
+from ikuyo.crawler.stage_timer import StageTimer, timed_callback, timed_iter
 from ikuyo.utils.text_parser import (
     extract_episode_number,
     extract_resolution,
@@ -22,6 +26,10 @@ from ikuyo.utils.text_parser import (
 )
 
 
+def _observe_detail_parse(seconds):
+    CRAWLER_PARSE_SECONDS.observe(seconds, callback="parse_anime_detail")
+
+
 class MikanSpider(Spider):
     name = "mikan"
 
@@ -54,6 +62,12 @@ class MikanSpider(Spider):
         self.progress_reporter = None
         self.start_time = time.time()  # 记录爬虫启动时间
 
+        # 各阶段耗时，由爬虫回调和各Pipeline累计
+        self.stage_timer = StageTimer()
+
+        # 爬取边界（断点续爬），在from_crawler中按配置初始化
+        self.frontier = None
+
         # 设置基础URL
         self.BASE_URL = self.config.get("mikan", {}).get("base_url", "https://mikanani.me")
 
@@ -90,7 +104,84 @@ class MikanSpider(Spider):
         if self.season:
             self.logger.info(f"爬取季度: {self.season}")
 
+    async def start(self):
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        """起始请求；续爬时直接从爬取边界中未完成的请求开始，不再访问起始页"""
+        if self.frontier is not None and self.frontier.seeded:
+            resumed = 0
+            for key, entry in self.frontier.pending_requests():
+                resumed += 1
+                yield Request(
+                    url=entry["url"],
+                    callback=getattr(self, entry["callback"]),
+                    meta=dict(entry["meta"], frontier_key=key),
+                )
+            self.logger.info(
+                f"♻️ 断点续爬: 恢复 {resumed} 个待处理请求，跳过 {self.frontier.done_count} 个已完成请求"
+            )
+            # 不再解析列表页，番剧总数和已处理数从爬取边界恢复
+            self.total_items = self.frontier.total_items
+            self._report_initial_progress(self.frontier.done_detail_count)
+            return
+        for url in self.start_urls:
+            yield Request(url, dont_filter=True)
+
+    def _frontier_key(self, request):
+        """请求在爬取边界中的键，只记录季度接口请求与番剧详情页请求"""
+        callback = getattr(request.callback, "__name__", None)
+        meta = request.meta
+        if callback == "parse_anime_detail" and meta.get("mikan_id"):
+            return f"detail:{meta['mikan_id']}"
+        if callback == "_parse_season_response":
+            return f"season:{meta.get('year')}:{meta.get('season')}"
+        return None
+
+    def _through_frontier(self, outputs, finished_key=None):
+        """
+        经过爬取边界产出回调结果：跳过已完成的请求，新产出的请求在回调结束时记录为待处理，
+        记录成功后将 finished_key（产生这些请求的请求）标记为完成
+
+        Returns:
+            待处理请求是否已记录
+        """
+        if self.frontier is None:
+            yield from outputs
+            return False
+        pending = {}
+        for output in outputs:
+            if isinstance(output, Request):
+                key = self._frontier_key(output)
+                if key is not None:
+                    if self.frontier.is_done(key):
+                        self.crawler.stats.inc_value("frontier/skipped")
+                        continue
+                    output.meta["frontier_key"] = key
+                    pending[key] = {
+                        "url": output.url,
+                        "callback": output.callback.__name__,
+                        "meta": {
+                            name: output.meta[name]
+                            for name in ("mikan_id", "title", "year", "season")
+                            if name in output.meta
+                        },
+                    }
+            yield output
+        recorded = self.frontier.add_pending(pending)
+        if recorded and finished_key:
+            self.frontier.finish(finished_key, self.total_items)
+        return recorded
+
+    @timed_callback("parse.listing")
     def parse(self, response):
+        """解析首页，产出的请求全部记录到爬取边界后，续爬时不再访问首页"""
+        recorded = yield from self._through_frontier(self._parse_start_page(response))
+        if recorded:
+            self.frontier.mark_seeded(self.total_items)
+
+    def _parse_start_page(self, response):
         """解析首页，根据爬取模式选择不同的解析策略"""
         try:
             # 如果是指定的起始URL，直接解析详情页
@@ -186,8 +277,15 @@ class MikanSpider(Spider):
             meta={"year": year, "season": season},
         )
 
+    @timed_callback("parse.listing")
     def _parse_season_response(self, response):
-        """解析季度API响应"""
+        """解析季度API响应，产出的详情页请求全部记录到爬取边界后该季度请求完成"""
+        yield from self._through_frontier(
+            self._parse_season_listing(response), response.meta.get("frontier_key")
+        )
+
+    def _parse_season_listing(self, response):
+        """从季度API响应中提取详情页请求"""
         self.logger.info(f"解析API响应: {response.url}")
 
         try:
@@ -272,6 +370,7 @@ class MikanSpider(Spider):
             self.logger.warning(f"API调用失败: {e}")
             return False
 
+    @timed_callback("parse.listing")
     def _parse_api_response(self, response):
         """解析API响应"""
         year = response.meta["year"]
@@ -380,34 +479,44 @@ class MikanSpider(Spider):
                 meta={"mikan_id": mikan_id, "title": title},
             )
 
+    @timed_callback("parse.detail", on_finish=_observe_detail_parse)
     def parse_anime_detail(self, response):
-        """解析动画详情页面"""
+        """
+        解析动画详情页面（流式产出）
+        依次产出番剧、字幕组，然后每解析一行资源就产出一个ResourceRecord，Pipeline的批量写入与解析交替进行；
+        动画-字幕组关联只保留各字幕组的增量汇总，资源全部产出后再统一产出
+        """
         try:
-            # 现有的解析逻辑
             mikan_id = response.meta.get("mikan_id")
             title = response.meta.get("title")
             self.logger.info(f"🎬 开始解析动画: {title} (ID: {mikan_id})")
 
             current_timestamp = get_current_timestamp()
 
+            # 一次遍历解析树收集详情页全部字段
+            page = parse_detail_page(response.selector.root)
+            subtitle_groups = page["subtitle_groups"]
+            self.logger.info(f"提取到 {len(subtitle_groups)} 个字幕组")
+
             # 创建Anime Item（使用时间戳）
             anime = AnimeItem()
             anime["mikan_id"] = mikan_id
-            anime["title"] = self._extract_title(response)
-            anime["bangumi_id"] = self._extract_bangumi_id(response)
-            anime["broadcast_day"] = self._extract_broadcast_day(response)
-            anime["broadcast_start"] = self._parse_broadcast_start_timestamp(response)
-            anime["official_website"] = self._extract_official_website(response)
-            anime["bangumi_url"] = self._extract_bangumi_url(response)
-            anime["description"] = self._extract_description(response)
+            anime["title"] = page["title"]
+            anime["bangumi_id"] = self._extract_bangumi_id(page["bangumi_url"])
+            anime["broadcast_day"] = page["broadcast_day"]
+            anime["broadcast_start"] = (
+                parse_datetime_to_timestamp(page["broadcast_start"])
+                if page["broadcast_start"]
+                else None
+            )
+            anime["official_website"] = page["official_website"]
+            anime["bangumi_url"] = page["bangumi_url"]
+            anime["description"] = page["description"]
             anime["status"] = "active"
             anime["created_at"] = current_timestamp
             anime["updated_at"] = current_timestamp
-
             yield anime
 
-            # 提取字幕组信息
-            subtitle_groups = self._extract_subtitle_groups(response)
             for group in subtitle_groups:
                 yield SubtitleGroupItem({
                     "id": group["group_id"],
@@ -416,77 +525,45 @@ class MikanSpider(Spider):
                     "created_at": current_timestamp,
                 })
 
-            # 提取资源信息（使用增强解析）
-            resources = self._extract_resources(response, mikan_id, subtitle_groups)
-
-            # 创建动画-字幕组关联
-            anime_subtitle_groups = {}
-
+            # 字幕组ID -> [首次发布时间, 最近更新时间, 资源数]
+            group_stats = {}
+            resource_count = 0
+            resources = timed_iter(
+                self._iter_resources(subtitle_groups, mikan_id, current_timestamp),
+                self.stage_timer,
+                "parse.resources",
+            )
             for resource in resources:
-                # 创建ResourceItem（使用增强字段）
-                yield ResourceItem({
-                    "mikan_id": resource["mikan_id"],
-                    "subtitle_group_id": resource["group_id"],
-                    "episode_number": resource["episode_number"],  # 新增：解析的集数
-                    "title": resource["title"],
-                    "file_size": resource["size"],
-                    "resolution": resource["resolution"],  # 新增：解析的分辨率
-                    "subtitle_type": resource["subtitle_type"],  # 新增：解析的字幕类型
-                    "release_date": resource["release_timestamp"],  # 使用时间戳
-                    "magnet_url": resource["magnet_link"],
-                    "magnet_hash": resource["magnet_hash"],
-                    "torrent_url": resource["torrent_url"],
-                    "play_url": resource["play_url"],
-                    "created_at": resource["created_at"],
-                    "updated_at": current_timestamp,
-                })
-
-                # 收集动画-字幕组关联信息
-                group_id = resource["group_id"]
-                if group_id not in anime_subtitle_groups:
-                    anime_subtitle_groups[group_id] = {
-                        "first_release_date": resource["release_timestamp"],
-                        "last_update_date": resource["release_timestamp"],
-                        "resource_count": 0,
-                    }
-
-                # 更新关联信息
-                if resource["release_timestamp"]:
-                    if (
-                        anime_subtitle_groups[group_id]["first_release_date"] is None
-                        or resource["release_timestamp"]
-                        < anime_subtitle_groups[group_id]["first_release_date"]
-                    ):
-                        anime_subtitle_groups[group_id]["first_release_date"] = resource[
-                            "release_timestamp"
-                        ]
-
-                    if (
-                        anime_subtitle_groups[group_id]["last_update_date"] is None
-                        or resource["release_timestamp"]
-                        > anime_subtitle_groups[group_id]["last_update_date"]
-                    ):
-                        anime_subtitle_groups[group_id]["last_update_date"] = resource[
-                            "release_timestamp"
-                        ]
-
-                anime_subtitle_groups[group_id]["resource_count"] += 1
+                resource_count += 1
+                stats = group_stats.get(resource.subtitle_group_id)
+                if stats is None:
+                    stats = group_stats[resource.subtitle_group_id] = [None, None, 0]
+                release_date = resource.release_date
+                if release_date:
+                    if stats[0] is None or release_date < stats[0]:
+                        stats[0] = release_date
+                    if stats[1] is None or release_date > stats[1]:
+                        stats[1] = release_date
+                stats[2] += 1
+                yield resource
+
+            self.logger.info(f"提取到 {resource_count} 个资源")
 
             # 创建动画-字幕组关联Items
-            for group_id, group_info in anime_subtitle_groups.items():
+            for group_id, (first_release, last_update, count) in group_stats.items():
                 yield AnimeSubtitleGroupItem({
                     "mikan_id": mikan_id,
                     "subtitle_group_id": group_id,
-                    "first_release_date": group_info["first_release_date"],
-                    "last_update_date": group_info["last_update_date"],
-                    "resource_count": group_info["resource_count"],
+                    "first_release_date": first_release,
+                    "last_update_date": last_update,
+                    "resource_count": count,
                     "is_active": 1,
                     "created_at": current_timestamp,
                     "updated_at": current_timestamp,
                 })
 
             # 更新爬取日志
-            self.crawl_log["items_count"] += len(resources)
+            self.crawl_log["items_count"] += resource_count
             self.crawl_log["mikan_id"] = mikan_id
 
             # 更新统计信息
@@ -495,6 +572,11 @@ class MikanSpider(Spider):
             # 更新已处理番剧数量
             self.processed_items += 1
 
+            # 数据全部产出，落库后由批量存储Pipeline记录为已完成
+            frontier_key = response.meta.get("frontier_key")
+            if self.frontier is not None and frontier_key:
+                self.frontier.complete(frontier_key)
+
         except Exception as e:
             self.logger.error(f"解析动画详情失败: {str(e)}")
             self.crawler_stats["failed"] += 1
@@ -505,205 +587,33 @@ class MikanSpider(Spider):
         match = re.search(r"/Home/Bangumi/(\d+)", href)
         return int(match.group(1)) if match else None
 
-    def _extract_title(self, response):
-        """提取标题"""
-        # 从页面title标签提取
-        title = response.css("title::text").get()
-        if title and title.startswith("Mikan Project - "):
-            title = title.replace("Mikan Project - ", "")
-        return title
-
-    def _extract_bangumi_id(self, response):
-        """提取Bangumi ID"""
-        bangumi_url = self._extract_bangumi_url(response)
+    def _extract_bangumi_id(self, bangumi_url):
+        """从Bangumi链接提取Bangumi ID"""
         if bangumi_url:
             match = re.search(r"/subject/(\d+)", bangumi_url)
             return int(match.group(1)) if match else None
         return None
 
-    def _extract_bangumi_url(self, response):
-        """提取Bangumi链接"""
-        bangumi_link = response.css('a[href*="bgm.tv/subject/"]::attr(href)').get()
-        return bangumi_link
-
-    def _extract_broadcast_day(self, response):
-        """提取放送日期"""
-        # 查找包含"放送日期："的文本
-        for text in response.css("*::text").getall():
-            if text and "放送日期：" in text:
-                return text.replace("放送日期：", "").strip()
-        return None
-
-    def _extract_broadcast_start(self, response):
-        """提取放送开始时间"""
-        for text in response.css("*::text").getall():
-            if text and "放送开始：" in text:
-                # 提取冒号后的时间部分
-                time_part = text.replace("放送开始：", "").strip()
-                if time_part:
-                    return time_part
-        return None
-
-    def _extract_official_website(self, response):
-        """提取官方网站"""
-        # 尝试多种方法提取官方网站
-        extraction_methods = [
-            self._find_official_links_by_text,
-            self._find_official_links_in_sections,
-            self._find_external_links,
-            self._find_specific_domains,
-        ]
-
-        for method in extraction_methods:
-            result = method(response)
-            if result:
-                return result
-
-        return None
-
-    def _find_official_links_by_text(self, response):
-        """通过文本查找官方网站链接"""
-        # 查找包含"官方网站"文本的链接
-        official_links = response.xpath(
-            '//a[contains(text(), "官方网站") or contains(following-sibling::text(), "官方网站")]/@href'  # noqa: E501
-        ).getall()
-
-        # 查找在"官方网站"文本附近的链接
-        for text_node in response.xpath('//text()[contains(., "官方网站")]'):
-            parent = text_node.xpath("..")
-            links = parent.xpath(".//a/@href").getall()
-            if links:
-                return links[0]
-
-        return official_links[0] if official_links else None
-
-    def _find_official_links_in_sections(self, response):
-        """在包含官方网站的段落中查找链接"""
-        official_sections = response.xpath('//p[contains(text(), "官方网站")]//a/@href').getall()
-        return official_sections[0] if official_sections else None
-
-    def _find_external_links(self, response):
-        """查找外部链接"""
-        external_links = response.css('a[href^="http"]::attr(href)').getall()
-        # 过滤掉常见的非官方网站
-        exclude_domains = ["bgm.tv", "mikanani.me", "bangumi.tv"]
-        for link in external_links:
-            if not any(domain in link for domain in exclude_domains):
-                return link
-        return None
-
-    def _find_specific_domains(self, response):
-        """查找特定域名的官方网站"""
-        specific_domains = [
-            "aniplex.co.jp",
-            "tbs.co.jp",
-            "mbs.jp",
-            "tokyo-mx.jp",
-            "at-x.com",
-            "animax.co.jp",
-        ]
-        for domain in specific_domains:
-            link = response.css(f'a[href*="{domain}"]::attr(href)').get()
-            if link:
-                return link
-        return None
-
-    def _extract_description(self, response):
-        """提取描述"""
-        # 尝试多种方法提取描述
-        description_selectors = [
-            ".header2-desc::text",  # 概况介绍部分的描述
-            ".bangumi-info p::text",
-            ".description::text",
-            ".summary::text",
-            # 最后才尝试meta description（通常是网站描述，不是动画描述）
-            'meta[name="description"]::attr(content)',
-        ]
-
-        for selector in description_selectors:
-            description = response.css(selector).get()
-            if description and len(description.strip()) > 10:
-                # 过滤掉网站通用描述
-                if "蜜柑计划" not in description and "Mikan Project" not in description:
-                    return description.strip()
-
-        return None
-
-    def _extract_subtitle_groups(self, response):
-        """提取字幕组信息"""
-        subtitle_groups = []
-
-        # 查找所有字幕组div
-        group_elements = response.css("div.subgroup-text")
-
-        for element in group_elements:
-            group_id = element.attrib.get("id")
-            # 提取字幕组名称（第一个链接的文本）
-            group_name = element.css("a::text").get()
-
-            if group_id and group_name:
-                subtitle_groups.append({
-                    "group_id": group_id,
-                    "group_name": group_name.strip(),
-                })
-
-        self.logger.info(f"提取到 {len(subtitle_groups)} 个字幕组")
-        return subtitle_groups
-
-    def _extract_resources(self, response, mikan_id, subtitle_groups):
-        """提取资源信息"""
-        resources = []
-
-        # 查找所有字幕组div
-        group_elements = response.css("div.subgroup-text")
-
-        for group_element in group_elements:
-            group_id = group_element.attrib.get("id")
-            group_name = group_element.css("a::text").get()
-
-            if not group_id or not group_name:
-                continue
-
-            # 查找该字幕组下面的资源表格
+    def _iter_resources(self, subtitle_groups, mikan_id, updated_at):
+        """逐行提取资源信息（生成器），每行产出一个ResourceRecord"""
+        for group in subtitle_groups:
             # 字幕组div后面紧跟着的table就是该字幕组的资源表格
-            resource_table = group_element.xpath(
-                "following-sibling::table[contains(@class, 'table')][1]"
-            )
-
-            if resource_table:
-                # 提取表格中的所有资源行
-                resource_rows = resource_table.css("tbody tr")
-
-                for row in resource_rows:
-                    cols = row.css("td")
-                    if len(cols) >= 4:  # 确保有足够的列
-                        resource = self._parse_resource_row(
-                            cols, mikan_id, group_id, group_name.strip()
-                        )
-                        if resource:
-                            resources.append(resource)
-
-        self.logger.info(f"提取到 {len(resources)} 个资源")
-        return resources
+            if group["table"] is None:
+                continue
+            for row in iter_resource_rows(group["table"]):
+                resource = self._parse_resource_row(row, mikan_id, group["group_id"], updated_at)
+                if resource:
+                    yield resource
 
-    def _parse_resource_row(self, cols, mikan_id, group_id, group_name):
-        """解析资源行 - 增强版"""
+    def _parse_resource_row(self, row, mikan_id, group_id, updated_at):
+        """解析资源行 - 增强版（row 为 iter_resource_rows 产出的原始字段）"""
         try:
             current_timestamp = get_current_timestamp()
 
-            # 提取资源信息
-            # 第1列：标题（包含磁力链接）
-            title_element = cols[0].css("a.magnet-link-wrap")
-            title = title_element.css("::text").get() or cols[0].css("::text").get()
-
-            # 第2列：大小
-            size = cols[1].css("::text").get()
-
-            # 第3列：更新时间
-            date = cols[2].css("::text").get()
-
-            # 第4列：磁力链接（在data-clipboard-text属性中）
-            magnet_link = cols[0].css("a.js-magnet::attr(data-clipboard-text)").get()
+            title = row["title"]
+            size = row["size"]
+            date = row["date"]
+            magnet_link = row["magnet_link"]
 
             # 提取磁力链接的hash值
             magnet_hash = None
@@ -714,15 +624,15 @@ class MikanSpider(Spider):
                 if hash_match:
                     magnet_hash = hash_match.group(1).lower()
 
-            # 第4列：种子下载链接
-            torrent_url = cols[3].css("a::attr(href)").get()
+            # 种子下载链接与在线播放链接
+            torrent_url = row["torrent_href"]
             torrent_url = urljoin(self.BASE_URL, torrent_url) if torrent_url else None
-
-            # 第5列：在线播放链接
-            play_url = cols[4].css("a::attr(href)").get()
+            play_url = row["play_href"]
             play_url = urljoin(self.BASE_URL, play_url) if play_url else None
 
             if title and magnet_link:
+                text_started = time.perf_counter()
+
                 # 使用文本解析器增强信息提取
                 episode_number = extract_episode_number(title)
                 resolution = extract_resolution(title)
@@ -736,36 +646,30 @@ class MikanSpider(Spider):
                 if date:
                     release_timestamp = parse_datetime_to_timestamp(date.strip())
 
-                return {
-                    "mikan_id": mikan_id,
-                    "group_id": group_id,
-                    "group_name": group_name,
-                    "title": title.strip(),
-                    "size": size.strip() if size else None,
-                    "date": date.strip() if date else None,
-                    "release_timestamp": release_timestamp,
-                    "episode_number": episode_number,  # 新增：解析的集数
-                    "resolution": resolution,  # 新增：解析的分辨率
-                    "subtitle_type": subtitle_type,  # 新增：解析的字幕类型
-                    "magnet_link": magnet_link,
-                    "magnet_hash": magnet_hash,
-                    "torrent_url": torrent_url,
-                    "play_url": play_url,
-                    "created_at": current_timestamp,
-                }
+                self.stage_timer.add("parse.title", time.perf_counter() - text_started)
+
+                # 创建ResourceRecord（使用增强字段，ID在此转换为整数）
+                return ResourceRecord(
+                    mikan_id=int(mikan_id),
+                    subtitle_group_id=int(group_id),
+                    episode_number=episode_number,  # 新增：解析的集数
+                    title=title.strip(),
+                    file_size=size.strip() if size else None,
+                    resolution=resolution,  # 新增：解析的分辨率
+                    subtitle_type=subtitle_type,  # 新增：解析的字幕类型
+                    magnet_url=magnet_link,
+                    torrent_url=torrent_url,
+                    play_url=play_url,
+                    magnet_hash=magnet_hash,
+                    release_date=release_timestamp,  # 使用时间戳
+                    created_at=current_timestamp,
+                    updated_at=updated_at,
+                )
         except Exception as e:
             self.logger.warning(f"解析资源行失败: {e}")
 
         return None
 
-    def _parse_broadcast_start_timestamp(self, response):
-        """提取放送开始时间并转换为时间戳"""
-        broadcast_start = self._extract_broadcast_start(response)
-        if broadcast_start:
-            timestamp = parse_datetime_to_timestamp(broadcast_start)
-            return timestamp
-        return None
-
     def _save_crawl_log_to_database(self):
         """（已废弃）直接将爬取日志保存到数据库，现由上层统一处理"""
         pass
@@ -773,6 +677,7 @@ class MikanSpider(Spider):
     def closed(self, reason):
         """爬虫关闭时的回调"""
         self.logger.info(f"爬虫关闭，原因: {reason}")
+        self.logger.info(f"阶段耗时: {self.stage_timer.format_summary()}")
 
         # 更新爬取日志
         current_timestamp = get_current_timestamp()
@@ -784,20 +689,32 @@ class MikanSpider(Spider):
         # 保存爬取日志
         yield self.crawl_log
 
+    def _record_download(self, response, request, spider):
+        """累计下载耗时（Scrapy在request.meta中记录的download_latency）"""
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            self.stage_timer.add("download", latency)
+
+    def _close_frontier(self, spider, reason):
+        """正常结束的任务不再需要续爬，其余情况保留爬取边界供重试时继续（在Pipeline刷新之后调用）"""
+        if self.frontier is not None and reason == "finished":
+            self.frontier.clear()
+
     def _now(self):
         return datetime.now(timezone.utc)
 
-    def _report_initial_progress(self):
-        """报告爬虫的初始进度，在 total_items 确定后调用。"""
+    def _report_initial_progress(self, processed_items=0):
+        """报告爬虫的初始进度，在 total_items 确定后调用；续爬时 processed_items 为已完成的番剧数"""
         if self.progress_reporter:
             processing_speed = 0  # 初始时为0
             estimated_remaining = None  # 初始时无法估计
+            percentage = processed_items / self.total_items * 100 if self.total_items else 0
 
             self.progress_reporter.report_status("running")
             self.progress_reporter.report_progress({
                 "total_items": self.total_items,
-                "processed_items": 0,
-                "percentage": 0,
+                "processed_items": processed_items,
+                "percentage": percentage,
                 "processing_speed": processing_speed,
                 "estimated_remaining": estimated_remaining,
             })
@@ -806,6 +723,19 @@ class MikanSpider(Spider):
     def from_crawler(cls, crawler, *args, **kwargs):
         spider = super().from_crawler(crawler, *args, **kwargs)
         spider.crawler = crawler  # Store the crawler object
+        crawler.signals.connect(spider._record_download, signal=signals.response_received)
+
+        # 爬取边界：同一任务重试时从中断处继续
+        crawler_config = getattr(spider.config, "crawler", {}) or {}
+        spider.frontier = CrawlFrontier.from_config(
+            spider.task_id, crawler_config.get("frontier", {}) or {}
+        )
+        if spider.frontier is not None:
+            crawler.signals.connect(spider._close_frontier, signal=signals.spider_closed)
+        if spider.frontier is not None and spider.frontier.load():
+            spider.logger.info(
+                f"任务 {spider.task_id} 存在未完成的爬取进度，已完成 {spider.frontier.done_count} 个请求"
+            )
 
         # 初始化进度报告器
         if spider.task_id is not None:
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+爬虫阶段计时
+按阶段（下载、页面解析、标题解析、校验、去重、数据库写入等）累计一次爬取任务的耗时，
+任务结束时写入 result_summary 并推送到运行指标
+"""
+
+import functools
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional
+
+
+class StageTimer:
+    """
+    阶段计时器
+    - add 直接累加耗时，适合在热点路径中配合 time.perf_counter 使用
+    - measure 以上下文管理器的形式计时
+    阶段名使用点号表示层级（如 parse.resources 包含于 parse.detail），各阶段分别统计，不做扣减
+    """
+
+    def __init__(self):
+        # 阶段 -> [次数, 总耗时]
+        self._stages: Dict[str, List[float]] = {}
+
+    def add(self, stage: str, seconds: float, count: int = 1) -> None:
+        entry = self._stages.get(stage)
+        if entry is None:
+            self._stages[stage] = [count, seconds]
+        else:
+            entry[0] += count
+            entry[1] += seconds
+
+    @contextmanager
+    def measure(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def totals(self) -> Dict[str, float]:
+        """各阶段总耗时（秒）"""
+        return {stage: total for stage, (_, total) in self._stages.items()}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """各阶段的次数、总耗时及平均耗时，按阶段名排序"""
+        return {
+            stage: {
+                "count": int(count),
+                "total_seconds": round(total, 4),
+                "avg_ms": round(total / count * 1000, 3) if count else 0.0,
+            }
+            for stage, (count, total) in sorted(self._stages.items())
+        }
+
+    def format_summary(self) -> str:
+        """一行文本摘要，按总耗时降序"""
+        ordered = sorted(self._stages.items(), key=lambda item: item[1][1], reverse=True)
+        return ", ".join(
+            f"{stage} {total:.2f}s/{int(count)}次" for stage, (count, total) in ordered
+        )
+
+
+def stage(spider, name: str):
+    """取得爬虫阶段计时上下文，爬虫未启用计时时不做任何事"""
+    timer = getattr(spider, "stage_timer", None)
+    return timer.measure(name) if timer is not None else nullcontext()
+
+
+def timed_stage(name: str):
+    """
+    Pipeline方法装饰器：将方法耗时计入爬虫的阶段计时
+    被装饰方法的最后一个位置参数须为spider
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args):
+            timer = getattr(args[-1], "stage_timer", None)
+            if timer is None:
+                return func(self, *args)
+            with timer.measure(name):
+                return func(self, *args)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_callback(name: str, on_finish: Optional[Callable[[float], None]] = None):
+    """
+    爬虫回调装饰器：只累计回调生成器自身的执行时间
+    生成器让出数据后由Scrapy交给Pipeline处理，该部分时间不计入
+    on_finish 在生成器结束时以累计耗时（秒）调用，用于上报运行指标
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            timer = getattr(self, "stage_timer", None)
+            output = func(self, *args, **kwargs)
+            if timer is None or output is None:
+                return output
+            return timed_iter(output, timer, name, on_finish)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_iter(
+    iterable, timer: StageTimer, name: str, on_finish: Optional[Callable[[float], None]] = None
+):
+    """
+    逐项迭代并只累计取下一项的耗时，调用方处理每一项的时间不计入
+    可嵌套使用，如回调整体计入 parse.detail，其中的资源行迭代再单独计入 parse.resources
+    """
+    iterator = iter(iterable)
+    elapsed = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed += time.perf_counter() - start
+            yield item
+    finally:
+        timer.add(name, elapsed)
+        if on_finish is not None:
+            on_finish(elapsed)
@@ -1,7 +1,9 @@
+import argparse
 import sys
 import os
 import json
 import logging
+import time
 import traceback
 
 # Add project root to Python path
@@ -22,7 +24,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_spider(task_id: int, parameters: dict):
+def run_spider(task_id: int, parameters: dict, profiler=None):
     """Runs a single Scrapy spider."""
     try:
         logger.info(f"Starting Scrapy spider for task {task_id} in new process.")
@@ -35,6 +37,9 @@ def run_spider(task_id: int, parameters: dict):
         settings.set("LOG_LEVEL", parameters.get("log_level", "INFO"))
         settings.set("LOG_STDOUT", False) # Ensure Scrapy logs don't go to stdout
         settings.set("LOG_ENABLED", True) # Ensure logging is enabled
+        if parameters.get("replay"):
+            # Replay stored responses only, without touching the site
+            settings.set("RESPONSE_STORE_REPLAY", True)
 
         # Prepare spider arguments
         spider_kwargs = {
@@ -55,30 +60,114 @@ def run_spider(task_id: int, parameters: dict):
         logger.info(f"Scrapy spider arguments: {spider_kwargs}")
 
         process = CrawlerProcess(settings)
-        process.crawl(MikanSpider, **spider_kwargs)
-        process.start()  # This will block until the spider finishes
+        crawler = process.create_crawler(MikanSpider)
+        process.crawl(crawler, **spider_kwargs)
+        if profiler:
+            profiler.start()
+        try:
+            process.start()  # This will block until the spider finishes
+        finally:
+            if profiler:
+                profiler.stop()
 
         logger.info(f"Scrapy spider for task {task_id} finished.")
-        return {"success": True, "message": f"Spider for task {task_id} completed."}
+        result = {"success": True, "message": f"Spider for task {task_id} completed."}
+        stage_timer = getattr(crawler.spider, "stage_timer", None)
+        if stage_timer is not None:
+            result["stages"] = stage_timer.summary()
+        return result
 
     except Exception as e:
         logger.error(f"Error running spider for task {task_id}: {e}")
         logger.error(traceback.format_exc())
         return {"success": False, "error": str(e), "traceback": traceback.format_exc()}
 
+class Profiler:
+    """
+    Profiles the crawl and writes a report when stopped.
+    Uses pyinstrument when requested and installed, otherwise cProfile.
+    """
+
+    def __init__(self, output: str, backend: str = "cprofile"):
+        self.output = output
+        self.backend = backend
+        if backend == "pyinstrument":
+            try:
+                import pyinstrument
+            except ImportError:
+                logger.warning("pyinstrument is not installed, falling back to cProfile")
+                self.backend = "cprofile"
+            else:
+                self._profiler = pyinstrument.Profiler()
+        if self.backend == "cprofile":
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+
+    def start(self):
+        if self.backend == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.output)), exist_ok=True)
+        if self.backend == "pyinstrument":
+            self._profiler.stop()
+            with open(self.output, "w", encoding="utf-8") as f:
+                f.write(self._profiler.output_html())
+            # Report goes to stderr; stdout is reserved for the JSON result
+            sys.stderr.write(self._profiler.output_text(unicode=True))
+        else:
+            import pstats
+
+            self._profiler.disable()
+            self._profiler.dump_stats(self.output)
+            stats = pstats.Stats(self._profiler, stream=sys.stderr)
+            stats.sort_stats("cumulative").print_stats(40)
+        logger.info(f"Profile report written to {self.output}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run a single Mikan spider for a crawler task.")
+    parser.add_argument("task_id", type=int, help="crawler task id")
+    parser.add_argument("parameters", help="task parameters as JSON")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="OUTPUT",
+        help="profile the crawl; report path defaults to data/profiles/task_<id>_<time>.prof "
+        "(.html for pyinstrument)",
+    )
+    parser.add_argument(
+        "--profiler",
+        choices=["cprofile", "pyinstrument"],
+        default="cprofile",
+        help="profiler backend used with --profile",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        logger.error("Usage: python run_single_spider.py <task_id> <json_parameters>")
-        sys.exit(1)
+    args = parse_args()
 
-    task_id = int(sys.argv[1])
+    task_id = args.task_id
     try:
-        parameters = json.loads(sys.argv[2])
+        parameters = json.loads(args.parameters)
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON parameters: {e}")
         sys.exit(1)
 
-    result = run_spider(task_id, parameters)
+    profiler = None
+    if args.profile is not None:
+        extension = "html" if args.profiler == "pyinstrument" else "prof"
+        output = args.profile or os.path.join(
+            "data", "profiles", f"task_{task_id}_{time.strftime('%Y%m%d_%H%M%S')}.{extension}"
+        )
+        profiler = Profiler(output, args.profiler)
+
+    result = run_spider(task_id, parameters, profiler)
 
     # Output result as JSON to stdout for parent process to capture
     print(json.dumps(result))